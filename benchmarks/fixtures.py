@@ -0,0 +1,200 @@
+import itertools
+import os
+import threading
+import time
+import wave
+import numpy as np
+import pandas as pd
+from src.config import SAMPLE_RATE, BENCHMARK_DIR, BENCHMARK_SEED
+from search.catalog import MobileCatalog
+from speech_to_text.audio_frames import AudioClip, SAMPLE_WIDTH_BYTES
+from speech_to_text.stt_transcriber import Transcriber
+
+# Vocabulary for synthetic catalogs, shaped like the shipped dataset so searches stay realistic.
+BRANDS = ("SAMSUNG", "APPLE", "Xiaomi", "realme", "OPPO", "vivo", "POCO", "OnePlus",
+          "Google", "MOTOROLA", "Nokia", "Infinix")
+SERIES = ("Galaxy", "iPhone", "Redmi", "Narzo", "Reno", "Y", "X", "Nord", "Pixel", "Moto G", "C", "Hot")
+SUFFIXES = ("", " Pro", " Lite", " Plus", " Ultra", " Max", " 5G", " Neo")
+COLORS = ("Black", "Blue", "Green", "Silver", "Gold", "Purple", "White", "Red")
+STORAGE_GB = (32, 64, 128, 256, 512)
+RAM_GB = (2, 3, 4, 6, 8, 12)
+BATTERY_MAH = (3000, 4000, 4500, 5000, 6000)
+CAMERA_MP = (8, 12, 13, 48, 50, 64, 108, 200)
+
+# Questions a customer might ask; fixture transcripts and tool-loop prompts cycle through these.
+CUSTOMER_QUERIES = (
+    "Do you have any Samsung phones under 20000?",
+    "I want an iPhone with at least 128 GB of storage.",
+    "Which phones have a rating above 4.5?",
+    "Show me OnePlus Nord phones.",
+    "I'm looking for a phone between 10000 and 15000 with a big battery.",
+    "The Redmi I bought last week keeps overheating, what can I replace it with?",
+    "Are there any Pixel phones in stock?",
+    "What is the cheapest 5G phone you sell?",
+)
+
+# Fake API script for the tool loop: one tool call, then a spoken answer of a few sentences.
+TOOL_LOOP_SCRIPT = [
+    {"tool_calls": [{"name": "search_mobiles", "arguments": {"brand": "Samsung", "max_price": 20000}}]},
+    {"content": "I found several Samsung phones within your budget. The Galaxy models start at a little over "
+                "ten thousand and come with at least sixty four gigabytes of storage. Would you like me to "
+                "compare the two best rated ones for you?"},
+]
+
+
+def make_synthetic_catalog(rows: int, directory: str = BENCHMARK_DIR, seed: int = BENCHMARK_SEED) -> MobileCatalog:
+    """
+    Writes (once) a synthetic mobiles CSV of `rows` rows in the raw dataset format.
+    The same rows and seed always give the same file, so runs on different machines or
+    revisions search identical data. The CSV is compiled into the columnar catalog by the normal
+    ingestion stage the first time the returned catalog is used.
+    Returns:
+        MobileCatalog: A catalog over the synthetic CSV, ready for `set_catalog`.
+    """
+    catalog_dir = os.path.join(directory, f"catalog_{rows}_{seed}")
+    csv_path = os.path.join(catalog_dir, "mobiles.csv")
+    if not os.path.exists(csv_path):
+        os.makedirs(catalog_dir, exist_ok=True)
+        started = time.perf_counter()
+        # Written under a temporary name so an interrupted run never leaves a truncated catalog.
+        synthetic_mobiles_frame(rows, seed).to_csv(csv_path + ".tmp", index=False)
+        os.replace(csv_path + ".tmp", csv_path)
+        print(f"Generated synthetic catalog {csv_path} ({rows} rows) in {time.perf_counter() - started:.1f} s.")
+    return MobileCatalog(csv_path, os.path.join(catalog_dir, "mobiles_catalog.bin"))
+
+
+def synthetic_mobiles_frame(rows: int, seed: int = BENCHMARK_SEED) -> pd.DataFrame:
+    """Returns `rows` random phones with the raw CSV columns the ingestion stage reads."""
+    rng = np.random.default_rng(seed)
+    brand = rng.integers(len(BRANDS), size=rows)
+    series = np.where(rng.random(rows) < 0.7, brand, rng.integers(len(SERIES), size=rows))
+    number = rng.integers(1, 60, size=rows)
+    suffix = rng.integers(len(SUFFIXES), size=rows)
+    color = rng.integers(len(COLORS), size=rows)
+    storage = rng.choice(STORAGE_GB, size=rows, p=(0.1, 0.25, 0.35, 0.2, 0.1))
+    ram = rng.choice(RAM_GB, size=rows)
+
+    model_names = [f"{SERIES[s]} {n}{SUFFIXES[x]}" for s, n, x in zip(series, number, suffix)]
+    price = np.round(np.clip(rng.lognormal(np.log(15000), 0.7, size=rows), 999, 199999), -1)
+    rating = np.round(rng.uniform(3.0, 4.9, size=rows), 1)
+    rating[rng.random(rows) < 0.05] = np.nan  # Unrated phones, as in the real data.
+    return pd.DataFrame({
+        "Brand": np.asarray(BRANDS)[brand],
+        "Title": [f"{BRANDS[b]} {m} ({COLORS[c]}, {s} GB)" for b, m, c, s in zip(brand, model_names, color, storage)],
+        "Model Name": model_names,
+        "Price": price,
+        "Rating": rating,
+        "No_of_Ratings": rng.integers(0, 300000, size=rows),
+        "Display_size_inches": np.round(rng.uniform(5.0, 7.0, size=rows), 2),
+        "Internal Storage": [f"{s} GB" for s in storage],
+        "Battery Capacity": [f"{b} mAh" for b in rng.choice(BATTERY_MAH, size=rows)],
+        "Primary Camera": [f"{a}MP + {b}MP" for a, b in zip(rng.choice(CAMERA_MP, size=rows), rng.choice((2, 5, 8), size=rows))],
+        "Secondary Camera": [f"{a}MP Front Camera" for a in rng.choice((5, 8, 16, 32), size=rows)],
+        "Other Display Features": [f"{r} GB RAM" for r in ram],
+    })
+
+
+def make_fixture_wavs(count: int, directory: str = BENCHMARK_DIR, seed: int = BENCHMARK_SEED,
+                      utterances_per_call: int = 3) -> list:
+    """
+    Writes (once) `count` recorded-call fixtures: each a WAV of a few voiced utterances
+    separated by pauses, over low background noise, at SAMPLE_RATE.
+    Returns:
+        list: The WAV paths, in order.
+    """
+    fixture_dir = os.path.join(directory, f"calls_{seed}")
+    os.makedirs(fixture_dir, exist_ok=True)
+    paths = []
+    for index in range(count):
+        path = os.path.join(fixture_dir, f"call_{index:04d}.wav")
+        if not os.path.exists(path):
+            clip = synthetic_call(np.random.default_rng((seed, index)), utterances_per_call)
+            clip.write_wav(path + ".tmp")
+            os.replace(path + ".tmp", path)
+        paths.append(path)
+    return paths
+
+
+def synthetic_call(rng: np.random.Generator, utterances: int, sample_rate: int = SAMPLE_RATE) -> AudioClip:
+    """
+    Synthesizes speech-like audio: harmonic 'voiced' tones with a syllable-rate envelope,
+    which the voice-activity detector treats like a talker.
+    """
+    parts = [_noise(rng, rng.uniform(0.4, 0.8), sample_rate)]
+    for _ in range(utterances):
+        seconds = rng.uniform(1.5, 3.5)
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        pitch = rng.uniform(100, 220)
+        voiced = sum(np.sin(2 * np.pi * pitch * k * t) / k for k in range(1, 6))
+        envelope = 0.55 + 0.45 * np.sin(2 * np.pi * rng.uniform(3, 5) * t)
+        parts.append((0.2 * 32767 * voiced / 2.3 * envelope).astype(np.int16) + _noise(rng, seconds, sample_rate))
+        parts.append(_noise(rng, rng.uniform(1.0, 1.6), sample_rate))
+    return AudioClip(np.concatenate(parts), sample_rate)
+
+
+def _noise(rng: np.random.Generator, seconds: float, sample_rate: int) -> np.ndarray:
+    return rng.normal(0, 60, int(seconds * sample_rate)).astype(np.int16)
+
+
+class FixtureTranscriber(Transcriber):
+    """
+    Stand-in speech-to-text backend for benchmarks: returns scripted transcripts in turn and
+    takes `real_time_factor` seconds per second of audio, like a local model on a known machine.
+    """
+
+    name = "fixture"
+
+    def __init__(self, transcripts: tuple = CUSTOMER_QUERIES, real_time_factor: float = 0.1):
+        super().__init__()
+        self.real_time_factor = real_time_factor
+        self._transcripts = itertools.cycle(transcripts)
+        self._lock = threading.Lock()
+
+    def _decode(self, clips: list) -> list:
+        time.sleep(self.real_time_factor * sum(clip.duration_seconds for clip in clips))
+        with self._lock:
+            return [next(self._transcripts) for _ in clips]
+
+
+class _Voice:
+    id = "silent"
+    name = "Silent"
+    languages = []
+
+
+class SilentEngine:
+    """
+    Stand-in for a pyttsx3 engine (pass as `Speaker(engine_factory=SilentEngine)`): renders
+    silence as long as the text would take to say, spending `real_time_factor` seconds of
+    work per second of speech.
+    """
+
+    def __init__(self, words_per_second: float = 2.5, real_time_factor: float = 0.05, sample_rate: int = 22050):
+        self.words_per_second = words_per_second
+        self.real_time_factor = real_time_factor
+        self.sample_rate = sample_rate
+        self._pending = []
+
+    def getProperty(self, name: str):
+        return [_Voice()] if name == 'voices' else None
+
+    def setProperty(self, name: str, value):
+        pass
+
+    def say(self, text: str):
+        self._pending.append((text, None))
+
+    def save_to_file(self, text: str, path: str):
+        self._pending.append((text, path))
+
+    def runAndWait(self):
+        pending, self._pending = self._pending, []
+        for text, path in pending:
+            seconds = max(len(text.split()), 1) / self.words_per_second
+            time.sleep(self.real_time_factor * seconds)
+            if path:
+                with wave.open(path, "wb") as writer:
+                    writer.setnchannels(1)
+                    writer.setsampwidth(SAMPLE_WIDTH_BYTES)
+                    writer.setframerate(self.sample_rate)
+                    writer.writeframes(bytes(int(seconds * self.sample_rate) * SAMPLE_WIDTH_BYTES))
@@ -0,0 +1,330 @@
+import argparse
+import asyncio
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from src.config import (BENCHMARK_DIR, BENCHMARK_CATALOG_ROWS, BENCHMARK_SEED, BENCHMARK_REGRESSION_TOLERANCE,
+                        LLM_STREAM_RESPONSES)
+from src.tracing import TRACER, LatencyHistogram
+from prompts.fake_together_server import FakeTogetherServer
+from prompts.together_client import TogetherClient, set_together_client
+from prompts.llm_analyzer import analyze_with_llama3, analysis_failed, TOOL_RESULT_CACHE, RESPONSE_CACHE
+from search.catalog import set_catalog
+from search.ingest import build_catalog
+from search.data_searcher import search_mobiles
+from speech_to_text.audio_frames import AudioClip
+from speech_to_text.stt_transcriber import set_transcriber
+from benchmarks.fixtures import (make_synthetic_catalog, make_fixture_wavs, FixtureTranscriber, SilentEngine,
+                                 CUSTOMER_QUERIES, TOOL_LOOP_SCRIPT)
+
+SUITES = ("search", "tool_loop", "pipeline", "batch")
+
+# Search mix: single predicates of each kind (text, numeric range) and the combinations the LLM sends.
+SEARCH_QUERIES = {
+    "brand": {"brand": "Samsung"},
+    "title": {"title": "Pro"},
+    "price_range": {"min_price": 10000, "max_price": 20000},
+    "rating": {"min_rating": 4.5},
+    "brand_price": {"brand": "Apple", "max_price": 60000},
+    "brand_title_price": {"brand": "OnePlus", "title": "Nord", "max_price": 30000},
+    "storage_rating_price": {"max_price": 8000, "min_storage_gb": 64, "min_rating": 4.0},
+    "no_match": {"brand": "Sony"},
+}
+
+# Metrics compared against a baseline, and whether a larger value is worse.
+COMPARED_METRICS = {"p95_ms": True, "elapsed_ms": True, "throughput_per_s": False}
+_NOISE_FLOOR_MS = 0.05  # Latency differences below this are timer noise, not regressions.
+
+
+def measure(func, iterations: int, concurrency: int = 1, warmup: int = 2) -> dict:
+    """
+    Calls func(i) for i in range(iterations), with up to `concurrency` calls in flight.
+    Returns:
+        dict: Latency percentiles (ms) and calls per second.
+    """
+    for i in range(warmup):
+        func(i)
+    histogram = LatencyHistogram()
+
+    def timed(i):
+        started = time.perf_counter()
+        func(i)
+        return (time.perf_counter() - started) * 1000
+
+    started = time.perf_counter()
+    if concurrency <= 1:
+        for i in range(iterations):
+            histogram.add(timed(i))
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="bench") as pool:
+            for duration_ms in pool.map(timed, range(iterations)):
+                histogram.add(duration_ms)
+    elapsed = time.perf_counter() - started
+    return {**histogram.summary(), "throughput_per_s": round(iterations / elapsed, 2)}
+
+
+@contextlib.contextmanager
+def _quiet(verbose: bool):
+    """Silences the agent's progress prints while it is being timed."""
+    if verbose:
+        yield
+        return
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        yield
+
+
+def _make_analyze(warm_caches: bool):
+    """analyze_with_llama3, starting every call with cold caches unless `warm_caches`."""
+    def analyze(text: str, on_sentence=None) -> str:
+        if not warm_caches:
+            TOOL_RESULT_CACHE.clear()
+            RESPONSE_CACHE.clear()
+        return analyze_with_llama3(text, on_sentence=on_sentence)
+    return analyze
+
+
+def _record_stages(results: dict, suite: str):
+    """Adds the per-stage span percentiles the tracer collected during a suite."""
+    for name, stats in TRACER.summary().items():
+        results[f"{suite}/stage/{name}"] = stats
+    TRACER.reset()
+
+
+def bench_search(results: dict, args):
+    for rows in args.rows:
+        catalog = make_synthetic_catalog(rows, args.dir, args.seed)
+        if not os.path.exists(catalog.artifact_path):
+            started = time.perf_counter()
+            with _quiet(args.verbose):
+                build_catalog(catalog.csv_path, catalog.artifact_path)
+            print(f"Compiled the {rows} row catalog in {time.perf_counter() - started:.1f} s.")
+        set_catalog(catalog)
+        started = time.perf_counter()
+        with _quiet(args.verbose):
+            catalog.snapshot()
+        results[f"search/rows={rows}/catalog_load"] = {"elapsed_ms": round((time.perf_counter() - started) * 1000, 3)}
+        for name, kwargs in SEARCH_QUERIES.items():
+            results[f"search/rows={rows}/{name}"] = measure(lambda i: search_mobiles(**kwargs), args.iterations)
+        print(f"search: {rows} rows done.")
+
+
+def bench_tool_loop(results: dict, args):
+    analyze = _make_analyze(args.warm_caches)
+    failures = []
+
+    def call(i: int):
+        reply = analyze(CUSTOMER_QUERIES[i % len(CUSTOMER_QUERIES)], (lambda sentence: None) if args.stream else None)
+        if analysis_failed(reply):
+            failures.append(reply)
+
+    TRACER.reset()
+    with _quiet(args.verbose):
+        stats = measure(call, args.iterations, args.concurrency)
+    results["tool_loop/analyze"] = {**stats, "failures": len(failures)}
+    _record_stages(results, "tool_loop")
+    if failures:
+        print(f"tool_loop: {len(failures)} calls failed, e.g. {failures[0]!r}")
+    print("tool_loop: done.")
+
+
+def bench_pipeline(results: dict, args):
+    # The audio stack is only needed by this suite and the batch suite.
+    from src.pipeline import AgentPipeline
+    from speech_to_text.stream_recorder import StreamingRecorder
+    from text_to_speech.tts_speaker import Speaker, NullSink
+
+    wav_paths = deque(make_fixture_wavs(args.calls, args.dir, args.seed))
+    recorder = StreamingRecorder()
+    utterances = deque()
+
+    def record() -> AudioClip:
+        # Fixture calls go through the same VAD path as the microphone, one after another.
+        while not utterances:
+            wav_paths.rotate(-1)
+            utterances.extend(recorder.process_clip(AudioClip.from_wav_file(wav_paths[-1])))
+        return utterances.popleft()
+
+    sink = NullSink()
+    speaker = Speaker(sink=sink, engine_factory=lambda: SilentEngine(real_time_factor=args.tts_rtf))
+    set_transcriber(FixtureTranscriber(real_time_factor=args.stt_rtf))
+    pipeline = AgentPipeline(None,
+                             record=record,
+                             analyze=_make_analyze(args.warm_caches),
+                             speak=lambda text, voice_option: speaker.speak(text),
+                             stream_responses=args.stream,
+                             max_utterances=args.utterances,
+                             stop_recording=None)
+    TRACER.reset()
+    started = time.perf_counter()
+    with _quiet(args.verbose):
+        asyncio.run(pipeline.run())
+    elapsed = time.perf_counter() - started
+    speaker.close()
+    results["pipeline/run"] = {
+        "count": pipeline.utterances_recorded,
+        "elapsed_ms": round(elapsed * 1000, 1),
+        "throughput_per_s": round(pipeline.utterances_recorded / elapsed, 2),
+        "replies_spoken": pipeline.replies_spoken,
+        "audio_seconds_played": round(sink.seconds_played, 1),
+    }
+    _record_stages(results, "pipeline")
+    print("pipeline: done.")
+
+
+def bench_batch(results: dict, args):
+    from src.main import run_automation
+
+    wav_paths = make_fixture_wavs(args.calls, args.dir, args.seed)
+    input_path = os.path.join(args.dir, "batch_input.jsonl")
+    output_path = os.path.join(args.dir, "batch_results.jsonl")
+    with open(input_path, "w", encoding="utf-8") as f:
+        for path in wav_paths:
+            f.write(json.dumps({"id": os.path.basename(path), "audio": os.path.abspath(path)}) + "\n")
+    if os.path.exists(output_path):
+        os.remove(output_path)  # Start from scratch rather than resuming the previous run.
+
+    set_transcriber(FixtureTranscriber(real_time_factor=args.stt_rtf))
+    TRACER.reset()
+    started = time.perf_counter()
+    with _quiet(args.verbose):
+        run_automation("batch", "default", batch_input=input_path, batch_output=output_path,
+                       concurrency=args.concurrency)
+    elapsed = time.perf_counter() - started
+
+    histogram = LatencyHistogram()
+    failures = 0
+    with open(output_path, encoding="utf-8") as f:
+        for line in f:
+            record = json.loads(line)
+            histogram.add(record["latency_ms"])
+            failures += not record["ok"]
+    results["batch/call"] = {**histogram.summary(), "elapsed_ms": round(elapsed * 1000, 1),
+                             "throughput_per_s": round(histogram.count / elapsed, 2), "failures": failures}
+    _record_stages(results, "batch")
+    print("batch: done.")
+
+
+BENCHMARKS = {"search": bench_search, "tool_loop": bench_tool_loop, "pipeline": bench_pipeline, "batch": bench_batch}
+
+
+def print_results(results: dict):
+    print(f"\n{'benchmark':<52}{'count':>7}{'p50 ms':>11}{'p95 ms':>11}{'p99 ms':>11}{'per s':>10}")
+    for name, stats in results.items():
+        if "p50_ms" in stats:
+            line = f"{name:<52}{stats['count']:>7}{stats['p50_ms']:>11.3f}{stats['p95_ms']:>11.3f}{stats['p99_ms']:>11.3f}"
+        else:
+            line = f"{name:<52}{stats.get('count', 1):>7}{'total ' + format(stats['elapsed_ms'], '.1f'):>33}"
+        if "throughput_per_s" in stats:
+            line += f"{stats['throughput_per_s']:>10.1f}"
+        print(line)
+
+
+def compare_with_baseline(results: dict, baseline: dict, tolerance: float) -> list:
+    """
+    Compares p95 latency, elapsed time and throughput with an earlier results file.
+    Returns:
+        list: One message per metric that got worse by more than `tolerance`.
+    """
+    regressions = []
+    for name, stats in results.items():
+        previous = baseline.get(name)
+        if not previous:
+            continue
+        for metric, larger_is_worse in COMPARED_METRICS.items():
+            old, new = previous.get(metric), stats.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = change > tolerance if larger_is_worse else change < -tolerance
+            if worse and not (metric.endswith("_ms") and new - old < _NOISE_FLOOR_MS):
+                regressions.append(f"{name} {metric}: {old} -> {new} ({change:+.0%})")
+    return regressions
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmark catalog search, the LLM tool loop, the voice pipeline and batch mode against "
+                    "local stand-ins (fake Together API, fixture WAVs, scripted STT, silent TTS).")
+    parser.add_argument("--suites", default=",".join(SUITES), help=f"Comma-separated suites to run: {', '.join(SUITES)}.")
+    parser.add_argument("--rows", default=",".join(map(str, BENCHMARK_CATALOG_ROWS)),
+                        help="Comma-separated synthetic catalog sizes for the search suite.")
+    parser.add_argument("--iterations", type=int, default=200, help="Timed calls per search query and tool-loop run.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Tool-loop calls (and batch calls) in flight at once.")
+    parser.add_argument("--utterances", type=int, default=24, help="Utterances driven through the voice pipeline.")
+    parser.add_argument("--calls", type=int, default=32, help="Fixture calls (WAVs) for the pipeline and batch suites.")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Seconds the fake API waits before each response.")
+    parser.add_argument("--llm-jitter", type=float, default=0.05, help="Up to this many extra seconds, at random, per response.")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed tokens.")
+    parser.add_argument("--script", help="JSON file with the fake API's scripted replies (default: one search, then an answer).")
+    parser.add_argument("--stt-rtf", type=float, default=0.1, help="Real-time factor of the stand-in transcriber.")
+    parser.add_argument("--tts-rtf", type=float, default=0.05, help="Real-time factor of the stand-in TTS engine.")
+    parser.add_argument("--stream", action=argparse.BooleanOptionalAction, default=LLM_STREAM_RESPONSES,
+                        help="Stream LLM responses sentence by sentence.")
+    parser.add_argument("--warm-caches", action="store_true", help="Keep the tool and response caches between calls.")
+    parser.add_argument("--seed", type=int, default=BENCHMARK_SEED, help="Seed for generated catalogs, audio and API latency.")
+    parser.add_argument("--dir", default=BENCHMARK_DIR, help="Where generated fixtures are kept between runs.")
+    parser.add_argument("--output", help="Results JSON file (default: <dir>/results.json).")
+    parser.add_argument("--baseline", help="Earlier results JSON to compare with; exits with 1 on regressions.")
+    parser.add_argument("--tolerance", type=float, default=BENCHMARK_REGRESSION_TOLERANCE,
+                        help="Relative change that counts as a regression.")
+    parser.add_argument("--verbose", action="store_true", help="Show the agent's own output while it is timed.")
+    args = parser.parse_args(argv)
+    args.rows = [int(rows) for rows in args.rows.split(",") if rows]
+    suites = [suite.strip() for suite in args.suites.split(",") if suite.strip()]
+    unknown = set(suites) - set(SUITES)
+    if unknown:
+        parser.error(f"Unknown suites: {', '.join(sorted(unknown))}. Choose from: {', '.join(SUITES)}.")
+    os.makedirs(args.dir, exist_ok=True)
+
+    script = TOOL_LOOP_SCRIPT
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+
+    # Spans are only aggregated in memory; they give the per-stage breakdown of every suite.
+    TRACER.enabled = True
+    TRACER.export_path = None
+    results = {}
+    with FakeTogetherServer(script, latency_seconds=args.llm_latency, token_delay_seconds=args.token_delay,
+                            latency_jitter_seconds=args.llm_jitter, seed=args.seed) as server:
+        set_together_client(TogetherClient(api_url=server.url, api_key="benchmark"))
+        for suite in suites:
+            if suite != "search":
+                # The LLM suites search the smallest catalog; the search suite covers the larger ones.
+                set_catalog(make_synthetic_catalog(min(args.rows), args.dir, args.seed))
+            BENCHMARKS[suite](results, args)
+
+    print_results(results)
+    output_path = args.output or os.path.join(args.dir, "results.json")
+    with open(output_path, "w", encoding="utf-8") as f:
+        json.dump({
+            "meta": {
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "args": {name: value for name, value in vars(args).items() if name not in ("baseline", "output")},
+            },
+            "results": results,
+        }, f, indent=2)
+    print(f"\nResults written to {output_path}.")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            regressions = compare_with_baseline(results, json.load(f)["results"], args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regressions against {args.baseline} (tolerance {args.tolerance:.0%}):")
+            for regression in regressions:
+                print(f"  {regression}")
+            return 1
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
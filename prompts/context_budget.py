@@ -0,0 +1,184 @@
+import json
+import re
+import threading
+
+CHARS_PER_TOKEN = 4          # Rough average for English text with the Llama 3 tokenizer
+MESSAGE_OVERHEAD_TOKENS = 4  # Role header and separators the chat template adds around each message
+SNIPPET_CHARS = 160          # How much of each folded message is kept in the history excerpts
+EXCERPTS_PREFIX = "Truncated excerpts of the earlier conversation:"
+
+# Tools whose schema is only sent when the request mentions something they can help with.
+# Tools not listed here are always sent.
+TOOL_KEYWORDS = {
+    "search_mobiles": re.compile(
+        r"\b(?:phones?|mobiles?|smartphones?|handsets?|iphone|galaxy|pixel|price|cost|cheap|expensive|budget|"
+        r"afford|storage|\d+\s?gb|ram\b|rating|rated|reviews?|brands?|models?|cameras?|battery|display|screen|"
+        r"buy|purchase|recommend|suggest|compare|stock|available|apple|samsung|google|xiaomi|redmi|oneplus|"
+        r"nokia|motorola|realme|vivo|oppo|poco|infinix|tecno|iqoo)",
+        re.IGNORECASE),
+}
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximates the token count of text without loading a tokenizer."""
+    return -(-len(text) // CHARS_PER_TOKEN) if text else 0
+
+
+def message_tokens(message: dict) -> int:
+    """Approximate tokens one chat message adds to the prompt, including tool-call arguments."""
+    tokens = MESSAGE_OVERHEAD_TOKENS + estimate_tokens(message.get("content") or "")
+    for tool_call in message.get("tool_calls") or []:
+        arguments = tool_call["function"].get("arguments") or ""
+        if not isinstance(arguments, str):
+            arguments = json.dumps(arguments)
+        tokens += estimate_tokens(tool_call["function"]["name"]) + estimate_tokens(arguments)
+    return tokens
+
+
+def tools_tokens(tools: list) -> int:
+    """Approximate tokens taken by the tool schemas sent with a request."""
+    return estimate_tokens(json.dumps(tools)) if tools else 0
+
+
+def truncate_text(text: str, max_tokens: int) -> str:
+    """Shortens text to about `max_tokens`, cutting at a line break where possible."""
+    max_chars = max_tokens * CHARS_PER_TOKEN
+    if len(text) <= max_chars:
+        return text
+    cut = text.rfind("\n", 0, max_chars)
+    if cut < max_chars // 2:
+        cut = max_chars
+    return f"{text[:cut]}\n...[truncated {len(text) - cut} characters]"
+
+
+def select_tools(tool_schemas: list, texts: list) -> list:
+    """
+    Picks the tool schemas relevant to a request.
+    Args:
+        tool_schemas (list): All tool schemas, in their canonical order.
+        texts (list): The request text plus any recent context worth matching against.
+    Returns:
+        list: The relevant schemas, keeping the canonical order so the payload stays byte-stable.
+    """
+    combined = "\n".join(text for text in texts if text)
+    selected = []
+    for tool in tool_schemas:
+        pattern = TOOL_KEYWORDS.get(tool["function"]["name"])
+        if pattern is None or pattern.search(combined):
+            selected.append(tool)
+    return selected
+
+
+def _snippet(text: str) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= SNIPPET_CHARS else text[:SNIPPET_CHARS].rstrip() + "..."
+
+
+def split_excerpts(history: list) -> tuple:
+    """
+    Separates the excerpts message left by `compact_history` from the messages after it.
+    Returns:
+        tuple: (excerpts text or None, the remaining history messages).
+    """
+    if history and history[0].get("role") == "system" and (history[0].get("content") or "").startswith(EXCERPTS_PREFIX):
+        return history[0]["content"], history[1:]
+    return None, history
+
+
+def compact_history(history: list, budget_tokens: int) -> int:
+    """
+    Keeps stored conversation history within budget by folding the oldest exchanges into one
+    message of truncated excerpts, in place. This is not a real summary: each folded message
+    keeps only its first SNIPPET_CHARS characters, which costs no extra model call.
+
+    Compaction goes down to half the budget at once, so the start of the prompt (which
+    provider-side prompt caching matches on) only changes every few turns rather than on each one.
+    Returns:
+        int: The number of messages folded into the excerpts (0 if the history already fits).
+    """
+    total = sum(message_tokens(message) for message in history)
+    if total <= budget_tokens:
+        return 0
+
+    has_excerpts = split_excerpts(history)[0] is not None
+    start = 1 if has_excerpts else 0
+    fold_end = start
+    remaining = total
+    # Fold whole user/assistant exchanges, always keeping the latest one verbatim.
+    while fold_end < len(history) - 2 and remaining > budget_tokens // 2:
+        remaining -= message_tokens(history[fold_end]) + message_tokens(history[fold_end + 1])
+        fold_end += 2
+    if fold_end == start:
+        return 0
+
+    lines = history[0]["content"][len(EXCERPTS_PREFIX):].strip().splitlines() if has_excerpts else []
+    for message in history[start:fold_end]:
+        speaker = "The customer said" if message.get("role") == "user" else "I replied"
+        lines.append(f"{speaker}: {_snippet(message.get('content'))}")
+    # The excerpts get at most a quarter of the budget; the oldest lines go first.
+    while len(lines) > 1 and estimate_tokens("\n".join(lines)) > budget_tokens // 4:
+        lines.pop(0)
+
+    history[:fold_end] = [{"role": "system", "content": f"{EXCERPTS_PREFIX}\n" + "\n".join(lines)}]
+    return fold_end - start
+
+
+def fit_to_budget(messages: list, budget_tokens: int) -> int:
+    """
+    Replaces tool outputs from earlier tool rounds of the current request with a short stub,
+    oldest first, until the prompt fits the budget. The latest round of tool results is kept.
+    Returns:
+        int: The approximate number of tokens saved.
+    """
+    total = sum(message_tokens(message) for message in messages)
+    if total <= budget_tokens:
+        return 0
+    last_round = max((i for i, m in enumerate(messages) if m.get("tool_calls")), default=len(messages))
+    saved = 0
+    for message in messages[:last_round]:
+        if total - saved <= budget_tokens:
+            break
+        if message.get("role") != "tool" or (message.get("content") or "").startswith("[earlier tool output"):
+            continue
+        before = message_tokens(message)
+        message["content"] = f"[earlier tool output omitted: {len(message.get('content') or '')} characters]"
+        saved += before - message_tokens(message)
+    return saved
+
+
+class TokenMeter:
+    """Accumulates estimated prompt sizes and the usage the API reports, across all requests."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.estimated_prompt_tokens = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.cached_prompt_tokens = 0
+
+    def record(self, estimated_prompt_tokens: int, usage: dict = None):
+        usage = usage or {}
+        with self._lock:
+            self.requests += 1
+            self.estimated_prompt_tokens += estimated_prompt_tokens
+            self.prompt_tokens += usage.get("prompt_tokens") or 0
+            self.completion_tokens += usage.get("completion_tokens") or 0
+            self.cached_prompt_tokens += cached_tokens(usage)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "requests": self.requests,
+                "estimated_prompt_tokens": self.estimated_prompt_tokens,
+                "prompt_tokens": self.prompt_tokens,
+                "completion_tokens": self.completion_tokens,
+                "cached_prompt_tokens": self.cached_prompt_tokens,
+                "avg_prompt_tokens": round(self.prompt_tokens / self.requests, 1) if self.requests else None,
+            }
+
+
+def cached_tokens(usage: dict) -> int:
+    """Prompt tokens the provider served from its prompt cache, if it reports them."""
+    details = usage.get("prompt_tokens_details") or {}
+    return details.get("cached_tokens") or usage.get("cached_tokens") or 0
@@ -0,0 +1,213 @@
+import json
+import random
+import re
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from prompts.context_budget import estimate_tokens, message_tokens, tools_tokens
+
+DEFAULT_SCRIPT = [
+    {"content": "Thank you for calling our store. I am happy to help you find the right phone today. Let me know what you are looking for."}
+]
+
+
+class FakeTogetherServer:
+    """
+    Local stand-in for the Together chat completions endpoint, for offline runs and tests.
+
+    Replies follow a script: the n-th assistant turn of a conversation (counted from the request's
+    messages, so concurrent conversations never interfere) gets `script[n]`, and the last entry is
+    repeated once the script runs out. An entry is either {"content": "..."} or
+    {"tool_calls": [{"name": "...", "arguments": {...}}]}. Requests with "stream": true receive
+    server-sent events with one delta per word, otherwise a regular JSON completion.
+
+Each response waits `latency_seconds`, plus a uniformly random extra of up to
+`latency_jitter_seconds` drawn from a generator seeded with `seed`, so benchmark runs see
+realistic but reproducible variation.
+
+    The first requests can be made to fail with `error_statuses` (e.g. [503, 429]: the first
+    request gets a 503, the second a 429, later ones their scripted reply), to exercise retries.
+
+    Point the agent at it with TOGETHER_API_URL=<server.url> or `set_together_client`.
+    """
+
+    def __init__(self, script: list = None, host: str = "127.0.0.1", port: int = 0,
+                 latency_seconds: float = 0.0, token_delay_seconds: float = 0.0,
+                 latency_jitter_seconds: float = 0.0, seed: int = 0, error_statuses: list = None):
+        self.script = script or DEFAULT_SCRIPT
+        self.latency_seconds = latency_seconds
+        self.token_delay_seconds = token_delay_seconds
+        self.latency_jitter_seconds = latency_jitter_seconds
+        self.error_statuses = list(error_statuses or [])
+        self.requests_served = 0
+        self._lock = threading.Lock()
+        self._random = random.Random(seed)
+        self._httpd = ThreadingHTTPServer((host, port), self._make_handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def start(self) -> "FakeTogetherServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="fake-together", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def reply_for(self, payload: dict) -> dict:
+        """Picks the scripted reply for the conversation in `payload`."""
+        turn = sum(1 for message in payload.get("messages", []) if message.get("role") == "assistant")
+        return self.script[min(turn, len(self.script) - 1)]
+
+    def response_delay(self) -> float:
+        """Seconds to wait before answering the next request."""
+        if not self.latency_jitter_seconds:
+            return self.latency_seconds
+        with self._lock:
+            return self.latency_seconds + self._random.uniform(0, self.latency_jitter_seconds)
+
+    def _make_handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"  # Keep-alive, like the real API.
+            disable_nagle_algorithm = True  # Small streamed chunks would otherwise stall on delayed ACKs.
+
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                with server._lock:
+                    server.requests_served += 1
+                    error_status = server.error_statuses.pop(0) if server.error_statuses else None
+                if error_status:
+                    return self._send_error(error_status)
+                reply = server.reply_for(payload)
+                delay = server.response_delay()
+                if delay:
+                    time.sleep(delay)
+                usage = _usage(payload, reply)
+                if payload.get("stream"):
+                    self._send_stream(reply, usage)
+                else:
+                    self._send_json(reply, usage)
+
+            def _send_json(self, reply: dict, usage: dict):
+                message = {"role": "assistant", "content": reply.get("content")}
+                if reply.get("tool_calls"):
+                    message["tool_calls"] = _tool_calls(reply)
+                body = json.dumps({
+                    "id": "fake-completion",
+                    "object": "chat.completion",
+                    "choices": [{"index": 0, "message": message,
+                                 "finish_reason": "tool_calls" if reply.get("tool_calls") else "stop"}],
+                    "usage": usage,
+                }).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_error(self, status: int):
+                body = json.dumps({"error": {"message": f"Simulated error {status}."}}).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_stream(self, reply: dict, usage: dict):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Transfer-Encoding", "chunked")
+                self.end_headers()
+                for delta in _stream_deltas(reply):
+                    self._send_event({"id": "fake-completion", "object": "chat.completion.chunk",
+                                      "choices": [{"index": 0, "delta": delta, "finish_reason": None}]})
+                    if server.token_delay_seconds:
+                        time.sleep(server.token_delay_seconds)
+                self._send_event({"id": "fake-completion", "object": "chat.completion.chunk",
+                                  "choices": [{"index": 0, "delta": {},
+                                               "finish_reason": "tool_calls" if reply.get("tool_calls") else "stop"}],
+                                  "usage": usage})
+                self._send_chunk(b"data: [DONE]\n\n")
+                self._send_chunk(b"")
+
+            def _send_event(self, event: dict):
+                self._send_chunk(b"data: " + json.dumps(event).encode("utf-8") + b"\n\n")
+
+            def _send_chunk(self, data: bytes):
+                self.wfile.write(f"{len(data):X}\r\n".encode("ascii") + data + b"\r\n")
+                self.wfile.flush()
+
+        return Handler
+
+
+def _tool_calls(reply: dict) -> list:
+    return [{
+        "id": f"call_{index}",
+        "type": "function",
+        "function": {"name": call["name"], "arguments": json.dumps(call.get("arguments", {}))},
+    } for index, call in enumerate(reply["tool_calls"])]
+
+
+def _usage(payload: dict, reply: dict) -> dict:
+    """Approximate token usage, shaped like the real API's."""
+    prompt_tokens = sum(message_tokens(m) for m in payload.get("messages", [])) + tools_tokens(payload.get("tools"))
+    completion_tokens = estimate_tokens(reply.get("content") or "") + estimate_tokens(json.dumps(reply.get("tool_calls") or ""))
+    return {"prompt_tokens": prompt_tokens, "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens}
+
+
+def _stream_deltas(reply: dict):
+    """Splits a scripted reply into OpenAI-style streaming deltas."""
+    if reply.get("tool_calls"):
+        for index, call in enumerate(_tool_calls(reply)):
+            yield {"tool_calls": [{"index": index, "id": call["id"], "type": "function",
+                                   "function": {"name": call["function"]["name"], "arguments": ""}}]}
+            arguments = call["function"]["arguments"]
+            # Arguments arrive in fragments, as they do from the real endpoint.
+            for start in range(0, len(arguments), 8):
+                yield {"tool_calls": [{"index": index, "function": {"arguments": arguments[start:start + 8]}}]}
+    if reply.get("content"):
+        for word in re.findall(r"\S+\s*", reply["content"]):
+            yield {"content": word}
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run a local stand-in for the Together chat completions API.")
+    parser.add_argument("--port", type=int, default=8765, help="Port to listen on.")
+    parser.add_argument("--script", help="JSON file with the list of scripted replies.")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds to wait before each response.")
+    parser.add_argument("--latency-jitter", type=float, default=0.0, help="Up to this many extra seconds, at random, per response.")
+    parser.add_argument("--token-delay", type=float, default=0.0, help="Seconds between streamed tokens.")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the latency jitter.")
+    args = parser.parse_args()
+
+    script = None
+    if args.script:
+        with open(args.script) as f:
+            script = json.load(f)
+    fake = FakeTogetherServer(script, port=args.port, latency_seconds=args.latency, token_delay_seconds=args.token_delay,
+                              latency_jitter_seconds=args.latency_jitter, seed=args.seed)
+    print(f"Fake Together API listening on {fake.url} (Ctrl+C to stop)")
+    try:
+        fake._httpd.serve_forever()
+    except KeyboardInterrupt:
+        fake.stop()
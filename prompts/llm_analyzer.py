@@ -1,12 +1,33 @@
 import requests
 import json # For handling JSON tool calls
-from src.config import TOGETHER_API_KEY, TOGETHER_API_URL, LLAMA_MODEL, LLM_MAX_TOKENS, LLM_TEMPERATURE, LLM_MAX_TOOL_CALL_TURNS
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from src.config import (LLAMA_MODEL, LLM_MAX_TOKENS, LLM_TEMPERATURE, LLM_MAX_TOOL_CALL_TURNS,
+                        TOOL_MAX_PARALLEL_CALLS, TOOL_CALL_TIMEOUT_SECONDS, TOOL_QUEUE_TIMEOUT_SECONDS,
+                        LLM_CONTEXT_BUDGET_TOKENS, LLM_HISTORY_BUDGET_TOKENS, LLM_TOOL_OUTPUT_MAX_TOKENS,
+                        LLM_SELECT_RELEVANT_TOOLS, RESPONSE_CACHE_ENABLED)
 from search.data_searcher import search_mobiles
+from search.catalog import get_catalog
+from prompts.tool_cache import ToolResultCache, canonicalize_tool_args
+from prompts.response_cache import SemanticResponseCache
+from src.tracing import TRACER, run_in_context
+from prompts.together_client import get_together_client
+from prompts.streaming import StreamedMessage, SentenceSplitter, iter_sse_events
+from prompts.context_budget import (TokenMeter, cached_tokens, compact_history, fit_to_budget, message_tokens,
+                                    select_tools, split_excerpts, tools_tokens, truncate_text)
 
 AVAILABLE_TOOLS = {
     "search_mobiles": search_mobiles
 }
 
+# Seconds each tool may run, once a worker starts it, before its call is answered with a timeout error
+# (default: TOOL_CALL_TIMEOUT_SECONDS).
+TOOL_TIMEOUTS = {
+    "search_mobiles": 5
+}
+
+
 LLM_TOOL_SCHEMA = [
     {
         "type": "function",
@@ -59,31 +80,52 @@ LLM_TOOL_SCHEMA = [
 ]
 
 
-def call_together_api(messages: list, tools: list = None):
-    """Internal helper to call Together AI API."""
-    if not TOGETHER_API_KEY or TOGETHER_API_KEY == "YOUR_TOGETHER_API_KEY_HERE":
+TOOL_PARAMETERS = {tool["function"]["name"]: tool["function"]["parameters"]["properties"] for tool in LLM_TOOL_SCHEMA}
+
+def _catalog_version():
+    """
+    Version of the data behind the tools, or None if the catalog can't be loaded. It includes
+    the catalog instance, because a catalog swapped in with `set_catalog` restarts its version count.
+    """
+    try:
+        catalog = get_catalog()
+        return catalog.instance_id, catalog.snapshot().version
+    except Exception:
+        return None
+
+
+# Shared across turns and customers; flushed whenever the catalog reloads.
+TOOL_RESULT_CACHE = ToolResultCache(_catalog_version)
+
+# Final answers to first questions of a conversation, matched by similarity; also flushed on catalog reloads.
+RESPONSE_CACHE = SemanticResponseCache(_catalog_version)
+
+# Prompt and completion tokens of every request sent to the API.
+TOKEN_METER = TokenMeter()
+
+
+def _post_to_together(messages: list, tools: list = None, stream: bool = False) -> requests.Response:
+    """Sends a chat completion request through the shared keep-alive client."""
+    client = get_together_client()
+    if not client.api_key or client.api_key == "YOUR_TOGETHER_API_KEY_HERE":
         raise ValueError("TOGETHER_API_KEY is not set or is a placeholder.")
 
-    headers = {
-        "Authorization": f"Bearer {TOGETHER_API_KEY}",
-        "Content-Type": "application/json"
-    }
-    
     payload = {
         "model": LLAMA_MODEL,
         "messages": messages,
         "max_tokens": LLM_MAX_TOKENS,
-        "temperature": LLM_TEMPERATURE,
-        "tools": tools
+        "temperature": LLM_TEMPERATURE
     }
+    if tools:
+        payload["tools"] = tools
+    if stream:
+        payload["stream"] = True
 
     try:
-        response = requests.post(TOGETHER_API_URL, headers=headers, json=payload)
-        response.raise_for_status()
-        return response.json()
+        return client.post(payload, stream=stream)
     except requests.exceptions.HTTPError as errh:
         print(f"Http Error: {errh}")
-        print(f"Response: {response.text}")
+        print(f"Response: {errh.response.text if errh.response is not None else ''}")
         raise requests.exceptions.RequestException(f"Together API HTTP Error: {errh}")
     except requests.exceptions.ConnectionError as errc:
         print(f"Error Connecting: {errc}")
@@ -99,74 +141,253 @@ def call_together_api(messages: list, tools: list = None):
         raise
 
 
-def analyze_with_llama3(text_input: str) -> str:
+def call_together_api(messages: list, tools: list = None):
+    """Internal helper to call Together AI API."""
+    return _post_to_together(messages, tools).json()
+
+
+def call_together_api_stream(messages: list, tools: list = None, on_content=None, on_usage=None) -> dict:
+    """
+    Calls Together AI API in streaming mode, reporting content as it is generated.
+    Args:
+        messages (list): The conversation so far.
+        tools (list, optional): Tool schemas the model may call.
+        on_content (callable, optional): Called with each new piece of content text.
+        on_usage (callable, optional): Called with the token usage, if the stream reports it.
+    Returns:
+        dict: The assembled assistant message (content and/or tool_calls).
+    """
+    accumulator = StreamedMessage()
+    with _post_to_together(messages, tools, stream=True) as response:
+        for event in iter_sse_events(response):
+            content = accumulator.add(event)
+            if content and on_content:
+                on_content(content)
+    if accumulator.usage and on_usage:
+        on_usage(accumulator.usage)
+    return accumulator.message()
+
+
+def execute_tool_call(tool_call: dict) -> dict:
+    """
+    Runs one tool call requested by the LLM, serving repeated calls from the tool result cache.
+    Args:
+        tool_call (dict): A tool call from the LLM message ('id' and 'function' with name/arguments).
+    Returns:
+        dict: The 'tool' role message carrying the output (or an error description) for the LLM.
+    """
+    function_name = tool_call["function"]["name"]
+    function_args = tool_call["function"]["arguments"]
+    tool_call_id = tool_call["id"]
+
+    # One print per call keeps the lines of concurrently running calls together.
+    print(f"  Tool Name: {function_name}\n  Tool Args: {json.dumps(function_args, indent=2)}")
+
+    if function_name in AVAILABLE_TOOLS:
+        try:
+            canonical_args = canonicalize_tool_args(function_args, TOOL_PARAMETERS.get(function_name))
+            with TRACER.span(f"tool.{function_name}") as span:
+                tool_output, cache_hit = TOOL_RESULT_CACHE.call(function_name, AVAILABLE_TOOLS[function_name], canonical_args)
+                span.set(cached=cache_hit)
+            print(f"  Tool Output{' (cached)' if cache_hit else ''}: {tool_output}")
+            # The full result stays cached; only what is sent back to the model is capped.
+            content = truncate_text(tool_output, LLM_TOOL_OUTPUT_MAX_TOKENS)
+        except Exception as e:
+            content = f"Error executing tool '{function_name}': {e}"
+            print(f"  {content}")
+    else:
+        content = f"Error: Tool '{function_name}' not found."
+        print(f"  {content}")
+
+    return {
+        "role": "tool",
+        "tool_call_id": tool_call_id,
+        "content": content
+    }
+
+
+# Shared by all conversations so the number of tool threads stays bounded.
+_TOOL_EXECUTOR = ThreadPoolExecutor(max_workers=TOOL_MAX_PARALLEL_CALLS, thread_name_prefix="tool-call")
+
+
+class _ToolRun:
+    """One submitted tool call, recording when a worker actually started running it."""
+
+    def __init__(self, tool_call: dict):
+        self.tool_call = tool_call
+        self.started = threading.Event()
+        self.started_at = None
+        self._call = run_in_context(execute_tool_call)
+        self.future = _TOOL_EXECUTOR.submit(self._run)
+
+    def _run(self) -> dict:
+        self.started_at = time.monotonic()
+        self.started.set()
+        return self._call(self.tool_call)
+
+
+def execute_tool_calls(tool_calls: list) -> list:
+    """
+    Runs all tool calls of one LLM message concurrently.
+
+    Each call is isolated: an exception or a call exceeding its tool's timeout only turns that
+    call's result into an error message. A timed-out tool keeps running in the background, but
+    the conversation no longer waits for it. The timeout counts from when a worker starts the
+    call, so time spent queued behind other sessions' calls is not charged to the tool; the
+    queueing itself is bounded by TOOL_QUEUE_TIMEOUT_SECONDS.
+    Args:
+        tool_calls (list): The 'tool_calls' of an assistant message.
+    Returns:
+        list: One 'tool' role message per call, in the order the calls were requested.
+    """
+    submitted = time.monotonic()
+    runs = [_ToolRun(tool_call) for tool_call in tool_calls]
+    results = []
+    for run in runs:
+        function_name = run.tool_call["function"]["name"]
+        timeout = TOOL_TIMEOUTS.get(function_name, TOOL_CALL_TIMEOUT_SECONDS)
+        try:
+            if not run.started.wait(timeout=max(0.0, submitted + TOOL_QUEUE_TIMEOUT_SECONDS - time.monotonic())):
+                run.future.cancel()
+                content = f"Error: Tool '{function_name}' could not start, all tool workers are busy."
+            else:
+                results.append(run.future.result(timeout=max(0.0, run.started_at + timeout - time.monotonic())))
+                continue
+        except FutureTimeoutError:
+            content = f"Error: Tool '{function_name}' timed out after {timeout} seconds."
+        except Exception as e:
+            content = f"Error executing tool '{function_name}': {e}"
+        print(f"  {content}")
+        results.append({"role": "tool", "tool_call_id": run.tool_call["id"], "content": content})
+    return results
+
+
+SYSTEM_PROMPT = "You are an AI assistant for an electronics store. Your primary task is to analyze customer feedback from call recordings. You can also answer questions about available mobile phones by using the provided `search_mobiles` tool. Your response must be in the first person, as if you are directly speaking to the customer. Address the customer directly. Do not summarize; instead, directly convey the information or analysis. Avoid using any special characters such as asterisks, hyphens, bullet points, or other formatting symbols. Present your response as plain text. If you use the tool, I will tell the customer the results clearly myself."
+
+
+def _report_tokens(messages: list, tools: list, history_count: int, usage: dict = None) -> int:
+    """Prints the approximate size of a request by part, and the usage the API reported for it."""
+    system_tokens = message_tokens(messages[0])
+    schema_tokens = tools_tokens(tools)
+    history_tokens = sum(message_tokens(m) for m in messages[1:1 + history_count])
+    turn_tokens = sum(message_tokens(m) for m in messages[1 + history_count:])
+    estimate = system_tokens + schema_tokens + history_tokens + turn_tokens
+    print(f"Prompt ~{estimate} tokens (system {system_tokens}, tools {schema_tokens}, "
+          f"history {history_tokens}, this request {turn_tokens}).")
+    if usage:
+        print(f"Together usage: {usage.get('prompt_tokens')} prompt ({cached_tokens(usage)} cached) + "
+              f"{usage.get('completion_tokens')} completion tokens.")
+    TOKEN_METER.record(estimate, usage)
+    return estimate
+
+
+# Starts of the replies `analyze_with_llama3` returns when no real answer could be produced.
+_FAILURE_PREFIXES = ("Error:", "Error contacting Together API", "Configuration Error",
+                     "An unexpected error occurred", "Maximum tool call turns reached", "No analysis")
+
+
+def analysis_failed(analysis_text: str) -> bool:
+    """Tells whether a reply from `analyze_with_llama3` is a failure that shouldn't be spoken."""
+    return analysis_text.startswith(_FAILURE_PREFIXES)
+
+
+def analyze_with_llama3(text_input: str, on_sentence=None, history: list = None) -> str:
     """
     Sends transcribed text to Together API for Llama 3 analysis,
     handling potential tool calls for data searching.
     Args:
         text_input (str): The text to be analyzed by Llama 3.
+        on_sentence (callable, optional): If given, the response is streamed and this is called
+                                          with each complete sentence as soon as it is generated.
+        history (list, optional): Earlier user/assistant messages of the same conversation. The new
+                                  exchange is appended to it when a final answer is produced.
     Returns:
         str: The analysis text from Llama 3 or an error message.
     """
     print("Initiating Llama 3 analysis...")
 
+    user_message = {"role": "user", "content": f"Customer feedback: \"{text_input}\""}
+    splitter = SentenceSplitter() if on_sentence else None
+
+    # Only questions that open a conversation are cached; later answers depend on the history.
+    use_response_cache = RESPONSE_CACHE_ENABLED and not history
+    if use_response_cache:
+        with TRACER.span("response_cache.lookup") as span:
+            cached_answer = RESPONSE_CACHE.lookup(text_input)
+            span.set(hit=cached_answer is not None)
+        if cached_answer is not None:
+            if splitter:
+                for sentence in splitter.feed(cached_answer) + [splitter.flush()]:
+                    if sentence:
+                        on_sentence(sentence)
+            if history is not None:
+                history.append(user_message)
+                history.append({"role": "assistant", "content": cached_answer})
+            print("Llama 3 Analysis (cached):\n", cached_answer)
+            return cached_answer
+
+    if history:
+        folded = compact_history(history, LLM_HISTORY_BUDGET_TOKENS)
+        if folded:
+            print(f"Folded {folded} earlier messages into truncated excerpts to keep the conversation within budget.")
+    # The system prompt and history come first and stay byte-identical between turns, so the
+    # provider can reuse its cached prefill for them. Excerpts of folded history join the system
+    # prompt rather than becoming a second system message.
+    excerpts, recent_history = split_excerpts(history or [])
     messages = [
-        {"role": "system", "content": "You are an AI assistant for an electronics store. Your primary task is to analyze customer feedback from call recordings. You can also answer questions about available mobile phones by using the provided `search_mobiles` tool. Your response must be in the first person, as if you are directly speaking to the customer. Address the customer directly. Do not summarize; instead, directly convey the information or analysis. Avoid using any special characters such as asterisks, hyphens, bullet points, or other formatting symbols. Present your response as plain text. If you use the tool, I will tell the customer the results clearly myself."},
-        {"role": "user", "content": f"Customer feedback: \"{text_input}\""}
+        {"role": "system", "content": f"{SYSTEM_PROMPT}\n\n{excerpts}" if excerpts else SYSTEM_PROMPT},
+        *recent_history,
+        user_message
     ]
+    history_count = len(recent_history)
+
+    # Choose the tools once per request; changing them between turns would invalidate the cached prefix.
+    if LLM_SELECT_RELEVANT_TOOLS:
+        recent_user_text = next((m.get("content") for m in reversed(history or []) if m.get("role") == "user"), "")
+        tools = select_tools(LLM_TOOL_SCHEMA, [text_input, recent_user_text])
+    else:
+        tools = LLM_TOOL_SCHEMA
+
+    def emit_sentences(content: str):
+        for sentence in splitter.feed(content):
+            on_sentence(sentence)
 
     for i in range(LLM_MAX_TOOL_CALL_TURNS):
         try:
             print(f"\n--- LLM Turn {i+1} ---")
             print("Sending messages to Llama 3...")
-            response_json = call_together_api(messages, tools=LLM_TOOL_SCHEMA)
-            choice = response_json.get("choices", [{}])[0]
-            message = choice.get("message", {})
-            
+            fit_to_budget(messages, LLM_CONTEXT_BUDGET_TOKENS - tools_tokens(tools))
+            usage = {}
+            with TRACER.span("llm.turn", turn=i + 1, streamed=bool(splitter), tools=len(tools)) as span:
+                if splitter:
+                    message = call_together_api_stream(messages, tools=tools, on_content=emit_sentences, on_usage=usage.update)
+                    remainder = splitter.flush()
+                    if remainder:
+                        on_sentence(remainder)
+                else:
+                    response_json = call_together_api(messages, tools=tools)
+                    usage = response_json.get("usage") or {}
+                    choice = response_json.get("choices", [{}])[0]
+                    message = choice.get("message", {})
+                span.set(prompt_tokens=_report_tokens(messages, tools, history_count, usage),
+                         tool_calls=len(message.get("tool_calls") or []))
+
             # If the LLM wants to call a tool
             if message.get("tool_calls"):
                 print("Llama 3 requested a tool call.")
                 messages.append(message)
 
-                for tool_call in message["tool_calls"]:
-                    function_name = tool_call["function"]["name"]
-                    function_args = tool_call["function"]["arguments"]
-                    tool_call_id = tool_call["id"]
-
-                    print(f"  Tool Name: {function_name}")
-                    print(f"  Tool Args: {json.dumps(function_args, indent=2)}")
-
-                    if function_name in AVAILABLE_TOOLS:
-                        try:
-                            
-                            tool_output = AVAILABLE_TOOLS[function_name](**function_args)
-                            print(f"  Tool Output: {tool_output}")
-                            messages.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "content": tool_output
-                            })
-                        except Exception as e:
-                            tool_error_msg = f"Error executing tool '{function_name}': {e}"
-                            print(f"  {tool_error_msg}")
-                            messages.append({
-                                "role": "tool",
-                                "tool_call_id": tool_call_id,
-                                "content": tool_error_msg
-                            })
-                    else:
-                        tool_error_msg = f"Error: Tool '{function_name}' not found."
-                        print(f"  {tool_error_msg}")
-                        messages.append({
-                            "role": "tool",
-                            "tool_call_id": tool_call_id,
-                            "content": tool_error_msg
-                        })
+                messages.extend(execute_tool_calls(message["tool_calls"]))
                 continue 
 
             elif message.get("content"):
                 analysis_text = message["content"].strip()
                 print("Llama 3 Analysis (Final):\n", analysis_text)
+                if use_response_cache:
+                    RESPONSE_CACHE.store(text_input, analysis_text)
+                if history is not None:
+                    history.append(user_message)
+                    history.append({"role": "assistant", "content": analysis_text})
                 return analysis_text
             else:
                 print("Error: No content or tool calls in Llama 3 response.")
@@ -0,0 +1,187 @@
+import re
+import threading
+import time
+import zlib
+import numpy as np
+from src.config import RESPONSE_CACHE_MAX_ENTRIES, RESPONSE_CACHE_TTL_SECONDS, RESPONSE_CACHE_SIMILARITY_THRESHOLD
+
+HASHED_FEATURES = 2 ** 11  # Dimensions of the hashed TF-IDF space
+_TOKEN_RE = re.compile(r"[a-z]+|\d+(?:\.\d+)?")
+_NUMBER_RE = re.compile(r"\d+(?:\.\d+)?$")
+
+# Filler that carries no meaning for matching ("do you have", "I'm looking for", ...). Negations
+# and comparison words ("not", "under", "more") are deliberately kept.
+STOPWORDS = frozenset("""
+    a an the do does did you your yours have has had any some i im me my we us our is are am was were be
+    been want wanted need needed looking look for to of please can could would will shall like show tell
+    get got there here what which with about on in at it its this that these those just also really hi
+    hello hey kindly let know okay ok so and or
+""".split())
+
+# Words customers use interchangeably, mapped onto one form before vectorizing.
+SYNONYMS = {
+    "budget": "cheap", "affordable": "cheap", "inexpensive": "cheap", "cheapest": "cheap", "cheaper": "cheap",
+    "lowcost": "cheap", "mobile": "phone", "smartphone": "phone", "handset": "phone", "cellphone": "phone",
+    "cell": "phone", "costly": "expensive", "priciest": "expensive", "pricey": "expensive",
+    "rupee": "rs", "inr": "rs", "dollar": "usd",
+}
+
+
+def normalize_query(text: str) -> list:
+    """Lower-cases, tokenizes, drops filler words and maps plurals and synonyms onto one form."""
+    tokens = []
+    for token in _TOKEN_RE.findall(text.lower().replace("low cost", "lowcost")):
+        if token in STOPWORDS:
+            continue
+        if len(token) > 3 and token.endswith("s") and not token.endswith("ss") and not token[0].isdigit():
+            token = token[:-1]
+        tokens.append(SYNONYMS.get(token, token))
+    return tokens
+
+
+class SemanticResponseCache:
+    """
+    Thread-safe cache of final answers, looked up by similarity of the customer's question.
+
+    Questions are normalized and embedded as hashed unigram + bigram TF-IDF vectors, with the IDF
+    taken from the questions currently in the cache. A lookup scores every entry at once with
+    vectorized cosine similarity and returns the best answer at or above `threshold`. Numbers in
+    the question must match exactly, so "under 10000" is never answered with the "under 20000" reply.
+
+    Entries expire after `ttl_seconds`, the least recently used entry is evicted beyond
+    `max_entries`, and everything is dropped when `version_fn` (the catalog instance and
+    version) changes.
+    """
+
+    def __init__(self,
+                 version_fn,
+                 max_entries: int = RESPONSE_CACHE_MAX_ENTRIES,
+                 ttl_seconds: float = RESPONSE_CACHE_TTL_SECONDS,
+                 threshold: float = RESPONSE_CACHE_SIMILARITY_THRESHOLD,
+                 features: int = HASHED_FEATURES):
+        self.version_fn = version_fn
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.threshold = threshold
+        self.features = features
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._tf = np.zeros((max_entries, features), dtype=np.float32)
+        self._tf_squared = np.zeros((max_entries, features), dtype=np.float32)
+        self._doc_freq = np.zeros(features, dtype=np.float32)
+        self._signatures = np.zeros(max_entries, dtype=np.int64)
+        self._created = np.zeros(max_entries)
+        self._last_used = np.zeros(max_entries)
+        self._used = np.zeros(max_entries, dtype=bool)
+        self._answers = [None] * max_entries
+        self._version = None
+        self._lock = threading.Lock()
+
+    def vectorize(self, text: str) -> tuple:
+        """
+        Embeds a question.
+        Returns:
+            tuple: (sublinear term-frequency vector, signature of the numbers in the question).
+        """
+        tokens = normalize_query(text)
+        terms = tokens + [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        counts = np.zeros(self.features, dtype=np.float32)
+        for term in terms:
+            counts[zlib.crc32(term.encode("utf-8")) % self.features] += 1
+        nonzero = counts > 0
+        counts[nonzero] = 1 + np.log(counts[nonzero])
+        numbers = " ".join(sorted(t for t in tokens if _NUMBER_RE.match(t)))
+        return counts, zlib.crc32(numbers.encode("utf-8"))
+
+    def lookup(self, text: str) -> str | None:
+        """Returns the cached answer to the most similar earlier question, or None."""
+        version = self.version_fn()
+        if version is None:
+            return None
+        query, signature = self.vectorize(text)
+        now = time.monotonic()
+        with self._lock:
+            self._sync_version(version)
+            self._expire(now)
+            candidates = self._used & (self._signatures == signature)
+            if not query.any() or not candidates.any():
+                self.misses += 1
+                return None
+            # cos(q*idf, d*idf) = sum(q d idf^2) / (|q*idf| |d*idf|), two matrix-vector products over all entries.
+            idf = np.log((1 + self._used.sum()) / (1 + self._doc_freq)) + 1
+            idf_squared = (idf * idf).astype(np.float32)
+            dot = self._tf @ (query * idf_squared)
+            norms = np.sqrt(self._tf_squared @ idf_squared) * np.sqrt((query * query) @ idf_squared)
+            similarity = np.where(candidates, dot / np.maximum(norms, 1e-12), -1.0)
+            best = int(np.argmax(similarity))
+            if similarity[best] < self.threshold:
+                self.misses += 1
+                return None
+            self._last_used[best] = now
+            self.hits += 1
+            print(f"Response cache hit (similarity {similarity[best]:.2f}).")
+            return self._answers[best]
+
+    def store(self, text: str, answer: str):
+        """Caches the final answer to a question."""
+        version = self.version_fn()
+        if version is None:
+            return
+        vector, signature = self.vectorize(text)
+        if not vector.any():
+            return
+        now = time.monotonic()
+        with self._lock:
+            self._sync_version(version)
+            free = np.flatnonzero(~self._used)
+            if len(free):
+                slot = int(free[0])
+            else:
+                slot = int(np.argmin(self._last_used))
+                self._remove(slot)
+                self.evictions += 1
+            self._tf[slot] = vector
+            self._tf_squared[slot] = vector * vector
+            self._doc_freq += vector > 0
+            self._signatures[slot] = signature
+            self._created[slot] = self._last_used[slot] = now
+            self._used[slot] = True
+            self._answers[slot] = answer
+
+    def clear(self):
+        with self._lock:
+            for slot in np.flatnonzero(self._used):
+                self._remove(int(slot))
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": int(self._used.sum()),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _sync_version(self, version):
+        if version != self._version:
+            for slot in np.flatnonzero(self._used):
+                self._remove(int(slot))
+            self._version = version
+
+    def _expire(self, now: float):
+        for slot in np.flatnonzero(self._used & (now - self._created > self.ttl_seconds)):
+            self._remove(int(slot))
+            self.expirations += 1
+
+    def _remove(self, slot: int):
+        self._doc_freq -= self._tf[slot] > 0
+        self._tf[slot] = 0
+        self._tf_squared[slot] = 0
+        self._used[slot] = False
+        self._answers[slot] = None
@@ -0,0 +1,104 @@
+import json
+import re
+import requests
+
+# A sentence ends at ., ! or ? (optionally followed by closing quotes/brackets) and then whitespace.
+# Requiring the whitespace keeps prices and ratings like "4.5" or "$1.299" in one piece.
+_SENTENCE_END_RE = re.compile(r"[.!?]+[\"')\]]*\s+")
+
+
+def iter_sse_events(response: requests.Response):
+    """
+    Yields the decoded JSON events of a server-sent-events chat completion stream.
+    Raises:
+        requests.exceptions.RequestException: If the server reports an error inside the stream.
+    """
+    finished = False
+    for line in response.iter_lines(decode_unicode=True):
+        # After [DONE] the body is still read to its end; a partly read response can't go back
+        # to the keep-alive pool and would cost a new connection per streamed turn.
+        if finished or not line or not line.startswith("data:"):
+            continue  # Blank separators, comments and non-data fields.
+        data = line[len("data:"):].strip()
+        if data == "[DONE]":
+            finished = True
+            continue
+        event = json.loads(data)
+        if event.get("error"):
+            raise requests.exceptions.RequestException(f"Together API stream error: {event['error']}")
+        yield event
+
+
+class StreamedMessage:
+    """
+    Reassembles an assistant message from streamed chat completion deltas.
+
+    Content deltas are concatenated; tool-call deltas are merged by their `index`, with the id and
+    function name arriving first and the JSON arguments string arriving in fragments.
+    """
+
+    def __init__(self):
+        self.content_parts = []
+        self.tool_calls = {}
+        self.finish_reason = None
+        self.usage = None  # Token usage, sent by the API with the final chunk.
+
+    def add(self, event: dict) -> str:
+        """
+        Merges one stream event into the message.
+        Returns:
+            str: The new content text carried by this event ('' if none).
+        """
+        self.usage = event.get("usage") or self.usage
+        choice = (event.get("choices") or [{}])[0]
+        self.finish_reason = choice.get("finish_reason") or self.finish_reason
+        delta = choice.get("delta") or {}
+
+        for fragment in delta.get("tool_calls") or []:
+            call = self.tool_calls.setdefault(fragment.get("index", 0), {
+                "id": None, "type": "function", "function": {"name": "", "arguments": ""}
+            })
+            if fragment.get("id"):
+                call["id"] = fragment["id"]
+            function = fragment.get("function") or {}
+            if function.get("name"):
+                call["function"]["name"] += function["name"]
+            if function.get("arguments"):
+                call["function"]["arguments"] += function["arguments"]
+
+        content = delta.get("content") or ""
+        if content:
+            self.content_parts.append(content)
+        return content
+
+    def message(self) -> dict:
+        """Returns the assembled message in the same shape as a non-streamed response message."""
+        message = {"role": "assistant", "content": "".join(self.content_parts)}
+        if self.tool_calls:
+            message["tool_calls"] = [self.tool_calls[index] for index in sorted(self.tool_calls)]
+        return message
+
+
+class SentenceSplitter:
+    """Buffers streamed text and releases it one complete sentence at a time."""
+
+    def __init__(self):
+        self._buffer = ""
+
+    def feed(self, text: str) -> list:
+        """Adds streamed text and returns any sentences it completed."""
+        self._buffer += text
+        sentences = []
+        start = 0
+        for match in _SENTENCE_END_RE.finditer(self._buffer):
+            sentence = self._buffer[start:match.end()].strip()
+            if sentence:
+                sentences.append(sentence)
+            start = match.end()
+        self._buffer = self._buffer[start:]
+        return sentences
+
+    def flush(self) -> str:
+        """Returns whatever is left once the stream has ended."""
+        remainder, self._buffer = self._buffer.strip(), ""
+        return remainder
@@ -0,0 +1,120 @@
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from src.config import (TOGETHER_API_KEY, TOGETHER_API_URL, LLM_CONNECT_TIMEOUT_SECONDS, LLM_READ_TIMEOUT_SECONDS,
+                        LLM_MAX_RETRIES, LLM_RETRY_BACKOFF_SECONDS, LLM_RETRY_MAX_BACKOFF_SECONDS, LLM_HTTP_POOL_SIZE)
+
+# Status codes worth retrying: rate limiting and transient server-side failures.
+RETRYABLE_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class TogetherClient:
+    """
+    Keep-alive HTTP client for the Together chat completions endpoint.
+
+    One pooled `requests.Session` is reused for every turn and customer, so TCP/TLS handshakes are
+    paid once per connection instead of once per request. Every request has connect/read timeouts,
+    and 429/5xx responses or connection failures are retried a bounded number of times with
+    jittered exponential backoff (honouring `Retry-After` when the server sends it). A read timeout
+    is not retried: the request reached the server, which may still be generating (and billing)
+    the first answer, and waiting another full read timeout would only double the customer's wait.
+    """
+
+    def __init__(self,
+                 api_url: str = TOGETHER_API_URL,
+                 api_key: str = TOGETHER_API_KEY,
+                 connect_timeout: float = LLM_CONNECT_TIMEOUT_SECONDS,
+                 read_timeout: float = LLM_READ_TIMEOUT_SECONDS,
+                 max_retries: int = LLM_MAX_RETRIES,
+                 backoff_seconds: float = LLM_RETRY_BACKOFF_SECONDS,
+                 max_backoff_seconds: float = LLM_RETRY_MAX_BACKOFF_SECONDS,
+                 pool_size: int = LLM_HTTP_POOL_SIZE,
+                 session: requests.Session = None):
+        self.api_url = api_url
+        self.api_key = api_key
+        self.timeout = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_seconds = backoff_seconds
+        self.max_backoff_seconds = max_backoff_seconds
+        self.session = session or self._make_session(pool_size)
+        self.session.headers.update({
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        })
+
+    @staticmethod
+    def _make_session(pool_size: int) -> requests.Session:
+        session = requests.Session()
+        # Retries are handled in post() so they can use jitter and apply to POST requests.
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        session.mount("https://", adapter)
+        session.mount("http://", adapter)
+        return session
+
+    def post(self, payload: dict, stream: bool = False) -> requests.Response:
+        """
+        POSTs a JSON payload to the API, retrying transient failures.
+        Args:
+            payload (dict): The request body.
+            stream (bool): Whether to leave the response body unread for streaming.
+        Returns:
+            requests.Response: A successful (2xx) response.
+        Raises:
+            requests.exceptions.HTTPError: For non-retryable statuses or when retries are exhausted.
+            requests.exceptions.ConnectionError: When retries are exhausted.
+            requests.exceptions.ReadTimeout: When the server accepted the request but didn't answer in time.
+        """
+        attempt = 0
+        while True:
+            try:
+                response = self.session.post(self.api_url, json=payload, timeout=self.timeout, stream=stream)
+            except requests.exceptions.ConnectionError as e:  # Includes ConnectTimeout, but not ReadTimeout.
+                if attempt >= self.max_retries:
+                    raise
+                delay = self._backoff(attempt)
+                print(f"Together API request failed ({e.__class__.__name__}); retrying in {delay:.2f}s...")
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES or attempt >= self.max_retries:
+                    response.raise_for_status()
+                    return response
+                delay = self._backoff(attempt, response.headers.get("Retry-After"))
+                print(f"Together API returned {response.status_code}; retrying in {delay:.2f}s...")
+                response.close()
+            attempt += 1
+            time.sleep(delay)
+
+    def _backoff(self, attempt: int, retry_after: str = None) -> float:
+        if retry_after:
+            try:
+                return min(float(retry_after), self.max_backoff_seconds)
+            except ValueError:
+                pass
+        # "Full jitter": a random delay up to the exponential cap spreads out concurrent retries.
+        cap = min(self.max_backoff_seconds, self.backoff_seconds * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def close(self):
+        self.session.close()
+
+
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
+
+def get_together_client() -> TogetherClient:
+    """Returns the process-wide client, so every turn and session shares one connection pool."""
+    global _shared_client
+    if _shared_client is None:
+        with _shared_client_lock:
+            if _shared_client is None:
+                _shared_client = TogetherClient()
+    return _shared_client
+
+
+def set_together_client(client: TogetherClient):
+    """Replaces the process-wide client (e.g. to point the agent at a local stub server)."""
+    global _shared_client
+    with _shared_client_lock:
+        _shared_client = client
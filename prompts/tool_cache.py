@@ -0,0 +1,128 @@
+import json
+import threading
+import time
+from collections import OrderedDict
+from src.config import TOOL_CACHE_MAX_ENTRIES, TOOL_CACHE_TTL_SECONDS
+
+
+def canonicalize_tool_args(arguments, properties: dict = None) -> dict:
+    """
+    Normalizes LLM tool-call arguments so equivalent calls compare equal.
+
+    JSON-string arguments are decoded, null/empty values dropped, strings stripped, and values
+    coerced to the JSON-schema type declared in `properties` ("800" -> 800.0). The case of strings
+    is kept, because these arguments are what the tool runs with; only the cache key ignores it.
+    Args:
+        arguments (dict | str): The arguments as returned by the model.
+        properties (dict, optional): The tool's JSON-schema parameter properties.
+    Returns:
+        dict: The canonical arguments, safe to pass to the tool.
+    Raises:
+        ValueError: If the arguments are not a JSON object or a value cannot be coerced.
+    """
+    if isinstance(arguments, str):
+        arguments = json.loads(arguments) if arguments.strip() else {}
+    if not isinstance(arguments, dict):
+        raise ValueError(f"Tool arguments must be a JSON object, got {type(arguments).__name__}.")
+
+    properties = properties or {}
+    canonical = {}
+    for name, value in arguments.items():
+        if isinstance(value, str):
+            value = value.strip()
+            if value.lower() in ("", "null", "none"):
+                value = None
+        if value is None:
+            continue
+        kind = properties.get(name, {}).get("type")
+        if kind == "number":
+            value = float(value)
+        elif kind == "integer":
+            number = float(value)
+            value = int(number) if number.is_integer() else number
+        canonical[name] = value
+    return canonical
+
+
+class ToolResultCache:
+    """
+    Thread-safe LRU cache with TTL for tool results, keyed on canonicalized arguments.
+
+    Entries are tied to a data version supplied by `version_fn` (e.g. the catalog version); the
+    whole cache is dropped as soon as that version changes. When `version_fn` returns None the
+    data source is unavailable and calls bypass the cache.
+    """
+
+    def __init__(self, version_fn, max_entries: int = TOOL_CACHE_MAX_ENTRIES, ttl_seconds: float = TOOL_CACHE_TTL_SECONDS):
+        self.version_fn = version_fn
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._version = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def make_key(tool_name: str, canonical_args: dict) -> str:
+        """
+        Builds the cache key, ignoring letter case in string arguments (the search tools match
+        case-insensitively). Strings with a backslash are kept as they are, since regex escapes
+        like \\W and \\w differ only by case.
+        """
+        keyed = {name: value.lower() if isinstance(value, str) and "\\" not in value else value
+                 for name, value in canonical_args.items()}
+        return tool_name + ":" + json.dumps(keyed, sort_keys=True)
+
+    def call(self, tool_name: str, func, canonical_args: dict):
+        """
+        Returns the cached result for this call or runs `func(**canonical_args)` and caches it.
+        Returns:
+            tuple: (result, hit) where hit tells whether the result came from the cache.
+        """
+        version = self.version_fn()
+        if version is None:
+            return func(**canonical_args), False
+
+        key = self.make_key(tool_name, canonical_args)
+        now = time.monotonic()
+        with self._lock:
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            entry = self._entries.get(key)
+            if entry is not None and now - entry[1] <= self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0], True
+            self.misses += 1
+
+        # Run the tool outside the lock so concurrent sessions are not serialized on one call.
+        result = func(**canonical_args)
+        if isinstance(result, str) and result.startswith("Error"):
+            return result, False
+        with self._lock:
+            if version == self._version:
+                self._entries[key] = (result, time.monotonic())
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.evictions += 1
+        return result, False
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        """Returns hit/miss counters and the current hit rate."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,97 @@
+import itertools
+import os
+import threading
+from collections import namedtuple
+from src.config import MOBILES_CSV_PATH, MOBILES_CATALOG_PATH
+from search.columnar import ColumnarTable
+from search.ingest import build_catalog, load_catalog
+from search.numeric_index import NumericIndex
+from search.text_index import TextIndex
+
+# An immutable view of one catalog version. Tools grab a snapshot once per call so the table and
+# its indexes always agree, even if the catalog reloads concurrently.
+CatalogSnapshot = namedtuple("CatalogSnapshot", ["version", "table", "text_index", "numeric_index"])
+_catalog_ids = itertools.count(1)  # Tells catalog instances apart; their versions all start at 1.
+
+
+class MobileCatalog:
+    """
+    Long-lived, in-memory view of the normalized mobiles catalog shared by the search tools.
+
+    The catalog is memory-mapped from the binary file compiled by `search.ingest`, which is
+    stamped with the modification time of the CSV it was built from and rebuilt whenever it is
+    missing or the CSV's time differs (newer or older, e.g. a restored backup). Every access checks the
+    CSV's modification time and transparently reloads when it has changed, so the catalog
+    can live for the whole process and be shared across turns and sessions.
+    """
+
+    def __init__(self, csv_path: str = MOBILES_CSV_PATH, artifact_path: str = MOBILES_CATALOG_PATH):
+        self.csv_path = csv_path
+        self.artifact_path = artifact_path
+        self.instance_id = next(_catalog_ids)
+        self._snapshot = None
+        self._mtime = None
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> int:
+        """Increments every time the catalog is (re)loaded; 0 before the first load."""
+        return self._snapshot.version if self._snapshot else 0
+
+    def snapshot(self) -> CatalogSnapshot:
+        """
+        Returns the current catalog version, (re)loading it if the source CSV changed on disk.
+        Returns:
+            CatalogSnapshot: The memory-mapped table together with its indexes.
+        Raises:
+            FileNotFoundError: If the dataset file does not exist.
+        """
+        mtime = os.stat(self.csv_path).st_mtime_ns
+        if mtime != self._mtime:
+            with self._lock:
+                # Re-read under the lock: another thread may have loaded a newer file meanwhile.
+                mtime = os.stat(self.csv_path).st_mtime_ns
+                if mtime != self._mtime:
+                    self._load(mtime)
+        return self._snapshot
+
+    def table(self) -> ColumnarTable:
+        """Returns the current memory-mapped catalog table."""
+        return self.snapshot().table
+
+    def _load(self, mtime: int):
+        if not self._artifact_is_fresh(mtime):
+            build_catalog(self.csv_path, self.artifact_path)
+            os.utime(self.artifact_path, ns=(mtime, mtime))
+        # The previous snapshot is simply dropped: its mapping stays valid for any caller still holding it.
+        table = load_catalog(self.artifact_path)
+        self._snapshot = CatalogSnapshot(self.version + 1, table, TextIndex(table), NumericIndex(table))
+        self._mtime = mtime
+        print(f"Loaded mobiles catalog from {self.artifact_path} ({table.rows} rows, version {self.version}).")
+
+    def _artifact_is_fresh(self, csv_mtime: int) -> bool:
+        try:
+            return os.stat(self.artifact_path).st_mtime_ns == csv_mtime
+        except FileNotFoundError:
+            return False
+
+
+_shared_catalog = None
+_shared_catalog_lock = threading.Lock()
+
+
+def get_catalog() -> MobileCatalog:
+    """Returns the process-wide catalog instance, creating it on first use."""
+    global _shared_catalog
+    if _shared_catalog is None:
+        with _shared_catalog_lock:
+            if _shared_catalog is None:
+                _shared_catalog = MobileCatalog()
+    return _shared_catalog
+
+
+def set_catalog(catalog: MobileCatalog):
+    """Replaces the process-wide catalog (e.g. with a synthetic catalog in benchmarks)."""
+    global _shared_catalog
+    with _shared_catalog_lock:
+        _shared_catalog = catalog
@@ -0,0 +1,201 @@
+import json
+import mmap
+import os
+import struct
+import numpy as np
+
+# File layout (all integers little-endian):
+#   8 bytes   magic
+#   4 bytes   header length H
+#   H bytes   JSON header: row count, per-column dtype/offset, string table offsets
+#   ...       8-byte aligned sections: float64 numeric columns, int32 string codes,
+#             uint32 string table offsets and the UTF-8 string table blob.
+# String columns are dictionary encoded into one shared table; code -1 means missing.
+MAGIC = b"MOBCAT\x00\x01"
+_ALIGNMENT = 8
+NA_CODE = -1
+_COLUMN_DTYPES = {"numeric": np.dtype("<f8"), "string": np.dtype("<i4")}
+
+
+class StringTable:
+    """Dictionary of distinct strings stored as an offsets array plus one UTF-8 blob."""
+
+    def __init__(self, offsets: np.ndarray, blob: memoryview):
+        self._offsets = offsets
+        self._blob = blob
+        self._decoded = None
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, code: int) -> str:
+        if self._decoded is not None:
+            return self._decoded[code]
+        start, end = int(self._offsets[code]), int(self._offsets[code + 1])
+        return bytes(self._blob[start:end]).decode("utf-8")
+
+    def values(self) -> list:
+        """Decodes (once) and returns every string in the table, indexed by code."""
+        if self._decoded is None:
+            self._decoded = [self[code] for code in range(len(self))]
+        return self._decoded
+
+
+class ColumnarTable:
+    """
+    Read-only, memory-mapped view of a file written by `write_columnar`.
+
+    Numeric columns and string codes are zero-copy numpy views onto the mapping, so pages are
+    only faulted in for the columns a query touches and are shared between processes that map
+    the same file. Opening a file without the catalog magic or with a header that does not
+    match the file's contents raises ValueError.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, "rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buffer = memoryview(self._mmap)
+        if bytes(buffer[:len(MAGIC)]) != MAGIC:
+            raise ValueError(f"{path} is not a mobiles catalog file.")
+        # Sections that do not fit the file make numpy raise ValueError; a short blob must be
+        # checked by hand because slicing a memoryview silently clamps.
+        try:
+            (header_length,) = struct.unpack_from("<I", buffer, len(MAGIC))
+            header_start = len(MAGIC) + 4
+            if header_start + header_length > len(buffer):
+                raise ValueError("header runs past the end of the file")
+            header = json.loads(bytes(buffer[header_start:header_start + header_length]).decode("utf-8"))
+
+            self.rows = header["rows"]
+            self._columns = {}
+            for name, spec in header["columns"].items():
+                if spec["kind"] not in _COLUMN_DTYPES or np.dtype(spec["dtype"]) != _COLUMN_DTYPES[spec["kind"]]:
+                    raise ValueError(f"column '{name}' has an unknown kind or dtype")
+                self._columns[name] = (spec["kind"], np.frombuffer(buffer, dtype=spec["dtype"], count=self.rows, offset=spec["offset"]))
+            table = header["strings"]
+            offsets = np.frombuffer(buffer, dtype="<u4", count=table["count"] + 1, offset=table["offsets"])
+            blob_end = table["blob"] + table["blob_length"]
+            if blob_end > len(buffer) or int(offsets[-1]) != table["blob_length"]:
+                raise ValueError("string table runs past the end of the file")
+        except (KeyError, TypeError, ValueError, struct.error) as e:
+            raise ValueError(f"{path} has a corrupt catalog header: {e}") from e
+        self.strings = StringTable(offsets, buffer[table["blob"]:blob_end])
+        self._distinct_codes = {}
+
+    @property
+    def column_names(self) -> list:
+        return list(self._columns)
+
+    def numeric(self, name: str) -> np.ndarray:
+        """Returns a float64 column (NaN for missing values)."""
+        kind, values = self._columns[name]
+        if kind != "numeric":
+            raise KeyError(f"Column '{name}' is not numeric.")
+        return values
+
+    def codes(self, name: str) -> np.ndarray:
+        """Returns the int32 dictionary codes of a string column (NA_CODE for missing values)."""
+        kind, values = self._columns[name]
+        if kind != "string":
+            raise KeyError(f"Column '{name}' is not a string column.")
+        return values
+
+    def distinct_codes(self, name: str) -> np.ndarray:
+        """Returns the distinct non-missing codes used by a string column."""
+        if name not in self._distinct_codes:
+            codes = np.unique(self.codes(name))
+            self._distinct_codes[name] = codes[codes != NA_CODE]
+        return self._distinct_codes[name]
+
+    def value(self, name: str, row: int):
+        """Returns a single decoded cell: str/None for string columns, float for numeric ones."""
+        kind, values = self._columns[name]
+        if kind == "numeric":
+            return float(values[row])
+        code = int(values[row])
+        return None if code == NA_CODE else self.strings[code]
+
+
+def _pad(f):
+    remainder = f.tell() % _ALIGNMENT
+    if remainder:
+        f.write(b"\x00" * (_ALIGNMENT - remainder))
+
+
+def write_columnar(path: str, numeric_columns: dict, string_columns: dict):
+    """
+    Writes columns to the compact binary catalog format.
+    Args:
+        path (str): Destination file. It is replaced atomically.
+        numeric_columns (dict): Column name -> sequence of floats (NaN for missing).
+        string_columns (dict): Column name -> sequence of str or None.
+    """
+    rows = None
+    for values in list(numeric_columns.values()) + list(string_columns.values()):
+        if rows is None:
+            rows = len(values)
+        elif len(values) != rows:
+            raise ValueError("All catalog columns must have the same length.")
+    rows = rows or 0
+
+    lookup, table = {}, []
+    encoded = {}
+    for name, values in string_columns.items():
+        codes = np.empty(rows, dtype="<i4")
+        for i, value in enumerate(values):
+            if value is None or (isinstance(value, float) and np.isnan(value)):
+                codes[i] = NA_CODE
+                continue
+            code = lookup.get(value)
+            if code is None:
+                code = lookup[value] = len(table)
+                table.append(value)
+            codes[i] = code
+        encoded[name] = codes
+    payloads = [s.encode("utf-8") for s in table]
+    offsets = np.zeros(len(payloads) + 1, dtype="<u4")
+    np.cumsum([len(p) for p in payloads], out=offsets[1:])
+
+    # Lay out every section first so the header can record absolute offsets.
+    sections = []
+    for name, values in numeric_columns.items():
+        sections.append((name, "numeric", np.asarray(values, dtype="<f8")))
+    for name, codes in encoded.items():
+        sections.append((name, "string", codes))
+    sections.append(("__offsets__", None, offsets))
+    sections.append(("__blob__", None, np.frombuffer(b"".join(payloads), dtype=np.uint8)))
+
+    def header_for(base: int):
+        position, columns, table_spec = base, {}, {"count": len(table)}
+        for name, kind, array in sections:
+            position += (-position) % _ALIGNMENT
+            if kind is not None:
+                columns[name] = {"kind": kind, "dtype": array.dtype.str, "offset": position}
+            elif name == "__offsets__":
+                table_spec["offsets"] = position
+            else:
+                table_spec["blob"] = position
+                table_spec["blob_length"] = array.nbytes
+            position += array.nbytes
+        return json.dumps({"rows": rows, "columns": columns, "strings": table_spec}).encode("utf-8")
+
+    # The header's own length shifts the data offsets; iterate until it is stable.
+    header = header_for(len(MAGIC) + 4)
+    while True:
+        candidate = header_for(len(MAGIC) + 4 + len(header))
+        if len(candidate) == len(header):
+            header = candidate
+            break
+        header = candidate
+
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header)))
+        f.write(header)
+        for _, _, array in sections:
+            _pad(f)
+            f.write(array.tobytes())
+    os.replace(tmp_path, path)
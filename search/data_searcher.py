@@ -1,6 +1,20 @@
-import pandas as pd
 import os
+import numpy as np
 from src.config import MOBILES_CSV_PATH
+from search.catalog import get_catalog
+from search.numeric_index import as_bound
+
+def _format_number(value: float) -> str:
+    """Formats a catalog number for the tool summary, dropping '.0' and showing 'N/A' for missing values."""
+    if np.isnan(value):
+        return "N/A"
+    return f"{value:g}"
+
+def _first_rows(rows: np.ndarray, k: int) -> np.ndarray:
+    """Returns the k smallest row ids (catalog order) without sorting the whole result set."""
+    if len(rows) > k:
+        rows = np.partition(rows, k - 1)[:k]
+    return np.sort(rows)
 
 def search_mobiles(min_price: float = None, 
                    max_price: float = None, 
@@ -24,40 +38,66 @@ def search_mobiles(min_price: float = None,
     Returns:
         str: A string summary of matching mobile phones or a message if none are found.
     """
-    if not os.path.exists(MOBILES_CSV_PATH):
-        return f"Error: Mobiles dataset not found at {MOBILES_CSV_PATH}. Please ensure the file exists."
+    catalog = get_catalog()
+    if not os.path.exists(catalog.csv_path):
+        return f"Error: Mobiles dataset not found at {catalog.csv_path}. Please ensure the file exists."
 
     try:
-        df = pd.read_csv(MOBILES_CSV_PATH)
+        snapshot = catalog.snapshot()
     except Exception as e:
         return f"Error reading mobiles dataset: {e}"
+    table = snapshot.table
+
+    # Each predicate resolves to a row-id set straight from an index: numeric ranges by binary
+    # search over sorted columns, text by posting-list intersection. Ranges on the same column are
+    # merged so min/max pairs cost a single lookup. Bounds are coerced up front because the LLM
+    # often sends numbers as strings; a non-numeric bound raises ValueError.
+    ranges = {}
+    for column, low, high in (('price', min_price, max_price),
+                              ('storage_gb', min_storage_gb, max_storage_gb),
+                              ('rating', min_rating, None)):
+        if low is not None or high is not None:
+            ranges[column] = (as_bound(low), as_bound(high))
+    texts = {column: pattern for column, pattern in (('brand', brand), ('title', title)) if pattern}
+
+    # Numeric counts are known up front, so only text sets need materializing to plan the query.
+    candidate_sets = [(snapshot.numeric_index.count(column, low, high), 'range', column)
+                      for column, (low, high) in ranges.items()]
+    text_rows = {column: snapshot.text_index.contains(column, pattern) for column, pattern in texts.items()}
+    candidate_sets += [(len(rows), 'text', column) for column, rows in text_rows.items()]
+    candidate_sets.sort(key=lambda entry: entry[0])
+
+    if not candidate_sets:
+        matches = np.arange(table.rows)
+    else:
+        # Start from the most selective set and narrow it down; no intermediate tables are built.
+        _, kind, column = candidate_sets[0]
+        matches = snapshot.numeric_index.range(column, *ranges[column]) if kind == 'range' else text_rows[column]
+        for _, kind, column in candidate_sets[1:]:
+            if len(matches) == 0:
+                break
+            if kind == 'range':
+                low, high = ranges[column]
+                values = table.numeric(column)[matches]
+                keep = np.ones(len(matches), dtype=bool)
+                if low is not None:
+                    keep &= values >= low
+                if high is not None:
+                    keep &= values <= high
+                matches = matches[keep]
+            else:
+                matches = matches[np.isin(matches, text_rows[column], assume_unique=True)]
 
-    filtered_df = df.copy()
-    if min_price is not None:
-        filtered_df = filtered_df[filtered_df['price'] >= min_price]
-    if max_price is not None:
-        filtered_df = filtered_df[filtered_df['price'] <= max_price]
-    if brand:
-        filtered_df = filtered_df[filtered_df['brand'].str.contains(brand, case=False, na=False)]
-    if title:
-        filtered_df = filtered_df[filtered_df['title'].str.contains(title, case=False, na=False)]
-    if min_storage_gb is not None:
-        filtered_df = filtered_df[filtered_df['storage_gb'] >= min_storage_gb]
-    if max_storage_gb is not None:
-        filtered_df = filtered_df[filtered_df['storage_gb'] <= max_storage_gb]
-    if min_rating is not None:
-        filtered_df = filtered_df[filtered_df['rating'] >= min_rating]
-
-    if filtered_df.empty:
+    if len(matches) == 0:
         return "No mobile phones found matching the specified criteria."
     else:
         results = []
-        for index, row in filtered_df.head(5).iterrows():
-            results.append(f"{row['title']} ({row['brand']}): ${row['price']}, {row['storage_gb']}GB, Rating: {row['rating']}")
+        for row in _first_rows(matches, 5):
+            results.append(f"{table.value('title', row)} ({table.value('brand', row)}): ${_format_number(table.value('price', row))}, {_format_number(table.value('storage_gb', row))}GB, Rating: {_format_number(table.value('rating', row))}")
         
-        summary = f"Found {len(filtered_df)} matching phones. Here are a few:\n" + "\n".join(results)
-        if len(filtered_df) > 5:
-            summary += f"\n...and {len(filtered_df) - 5} more."
+        summary = f"Found {len(matches)} matching phones. Here are a few:\n" + "\n".join(results)
+        if len(matches) > 5:
+            summary += f"\n...and {len(matches) - 5} more."
         return summary
 
 # Example usage (for testing this module directly)
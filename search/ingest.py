@@ -0,0 +1,167 @@
+import re
+import numpy as np
+import pandas as pd
+from src.config import MOBILES_CSV_PATH, MOBILES_CATALOG_PATH
+from search.columnar import ColumnarTable, write_columnar
+
+# Normalized catalog schema: column name -> dtype. Everything the search tools query lives here,
+# already parsed, so no tool has to touch the raw free-text columns again.
+CATALOG_SCHEMA = {
+    "title": "string",
+    "brand": "string",
+    "model_name": "string",
+    "price": "float64",
+    "rating": "float64",
+    "num_ratings": "float64",
+    "storage_gb": "float64",
+    "ram_gb": "float64",
+    "battery_mah": "float64",
+    "display_inches": "float64",
+    "rear_camera_mp": "float64",
+    "front_camera_mp": "float64",
+}
+STRING_COLUMNS = [name for name, dtype in CATALOG_SCHEMA.items() if dtype == "string"]
+NUMERIC_COLUMNS = [name for name, dtype in CATALOG_SCHEMA.items() if dtype != "string"]
+
+# Raw CSV columns that map one-to-one onto normalized columns.
+RAW_COLUMN_MAP = {
+    "Title": "title",
+    "Brand": "brand",
+    "Model Name": "model_name",
+    "Price": "price",
+    "Rating": "rating",
+    "No_of_Ratings": "num_ratings",
+    "Display_size_inches": "display_inches",
+}
+# Raw free-text columns that only feed derived numeric columns.
+RAW_DERIVED_COLUMNS = ["Internal Storage", "Battery Capacity", "Primary Camera",
+                       "Secondary Camera", "Other Display Features", "Other Features"]
+
+_UNIT_TO_GB = {"KB": 1 / (1024 * 1024), "MB": 1 / 1024, "GB": 1.0, "TB": 1024.0}
+_STORAGE_RE = re.compile(r"(\d+(?:\.\d+)?)(?:\s*\+\s*(\d+(?:\.\d+)?))?\s*(KB|MB|GB|TB)", re.IGNORECASE)
+_RAM_RE = re.compile(r"(\d+(?:\.\d+)?)\s*(KB|MB|GB|TB)\s+(?:LP)?(?:DDR\w*\s+)?RAM\b", re.IGNORECASE)
+_NUMBER_RE = re.compile(r"-?\d+(?:\.\d+)?")
+_MAH_RE = re.compile(r"(\d+(?:\.\d+)?)\s*mAh", re.IGNORECASE)
+_MP_RE = re.compile(r"(\d+(?:\.\d+)?)\s*MP", re.IGNORECASE)
+
+
+def parse_number(value) -> float:
+    """Parses numeric cells, tolerating currency symbols and thousands separators ('₹12,999')."""
+    if isinstance(value, (int, float, np.number)):
+        return float(value)
+    if not isinstance(value, str):
+        return np.nan
+    match = _NUMBER_RE.search(value.replace(",", ""))
+    return float(match.group(0)) if match else np.nan
+
+
+def parse_storage_gb(value) -> float:
+    """Parses storage strings like '128 GB', '32 MB', '1 TB' or '32+3 GB' into gigabytes."""
+    if not isinstance(value, str):
+        return np.nan
+    match = _STORAGE_RE.search(value)
+    if not match:
+        return np.nan
+    amount = float(match.group(1)) + float(match.group(2) or 0)
+    return amount * _UNIT_TO_GB[match.group(3).upper()]
+
+
+def parse_ram_gb(value) -> float:
+    """
+    Parses explicit '<n> GB RAM' mentions (ignoring 'Turbo'/'Extended' RAM) into gigabytes.
+    When several are given, as in '13GB RAM (8GB LPDDR4x RAM + Up to 5GB ...)', the smallest
+    one is the physical RAM.
+    """
+    if not isinstance(value, str):
+        return np.nan
+    sizes = [float(amount) * _UNIT_TO_GB[unit.upper()] for amount, unit in _RAM_RE.findall(value)]
+    return min(sizes) if sizes else np.nan
+
+
+def parse_battery_mah(value) -> float:
+    """Parses battery strings like '5000 mAh' into a number."""
+    if not isinstance(value, str):
+        return np.nan
+    match = _MAH_RE.search(value)
+    return float(match.group(1)) if match else np.nan
+
+
+def parse_camera_mp(value) -> float:
+    """Returns the highest-resolution sensor in strings like '50MP (OIS) + 8MP + 2MP'."""
+    if not isinstance(value, str):
+        return np.nan
+    values = [float(mp) for mp in _MP_RE.findall(value)]
+    return max(values) if values else np.nan
+
+
+def normalize_mobiles(raw_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converts the raw mobiles CSV into the normalized catalog schema.
+    Args:
+        raw_df (pd.DataFrame): The dataset as read from the shipped CSV.
+    Returns:
+        pd.DataFrame: A frame with exactly the CATALOG_SCHEMA columns and dtypes.
+    """
+    df = pd.DataFrame(index=raw_df.index)
+    for raw_name, name in RAW_COLUMN_MAP.items():
+        df[name] = raw_df[raw_name] if raw_name in raw_df else np.nan
+
+    df["storage_gb"] = raw_df.get("Internal Storage", pd.Series(index=raw_df.index, dtype=object)).map(parse_storage_gb)
+    df["battery_mah"] = raw_df.get("Battery Capacity", pd.Series(index=raw_df.index, dtype=object)).map(parse_battery_mah)
+    df["rear_camera_mp"] = raw_df.get("Primary Camera", pd.Series(index=raw_df.index, dtype=object)).map(parse_camera_mp)
+    df["front_camera_mp"] = raw_df.get("Secondary Camera", pd.Series(index=raw_df.index, dtype=object)).map(parse_camera_mp)
+
+    # RAM has no dedicated column; it only shows up in titles or feature blurbs, and most
+    # listings in the shipped dataset never state it, so ram_gb is missing for nearly all rows.
+    ram_text = df["title"].fillna("").astype(str)
+    for raw_name in ("Other Display Features", "Other Features"):
+        if raw_name in raw_df:
+            ram_text = ram_text + " | " + raw_df[raw_name].fillna("").astype(str)
+    df["ram_gb"] = ram_text.map(parse_ram_gb)
+
+    for name in NUMERIC_COLUMNS:
+        if not pd.api.types.is_numeric_dtype(df[name]):  # Only text cells need parsing.
+            df[name] = df[name].map(parse_number)
+        df[name] = pd.to_numeric(df[name], errors="coerce")
+    return df[list(CATALOG_SCHEMA)].astype(CATALOG_SCHEMA).reset_index(drop=True)
+
+
+def build_catalog(csv_path: str = MOBILES_CSV_PATH, output_path: str = MOBILES_CATALOG_PATH) -> pd.DataFrame:
+    """
+    Runs the ingestion stage: reads the raw CSV once and compiles it into the binary catalog file.
+    Args:
+        csv_path (str): Path to the raw mobiles CSV.
+        output_path (str): Where to write the catalog file.
+    Returns:
+        pd.DataFrame: The normalized catalog that was written.
+    """
+    usecols = lambda name: name in RAW_COLUMN_MAP or name in RAW_DERIVED_COLUMNS
+    df = normalize_mobiles(pd.read_csv(csv_path, usecols=usecols))
+    save_catalog(df, output_path)
+    print(f"Built mobiles catalog {output_path} from {csv_path} ({len(df)} rows).")
+    return df
+
+
+def save_catalog(df: pd.DataFrame, output_path: str):
+    """Writes a normalized catalog frame in the compact binary columnar format."""
+    write_columnar(
+        output_path,
+        numeric_columns={name: df[name].to_numpy(dtype=np.float64, na_value=np.nan) for name in NUMERIC_COLUMNS},
+        string_columns={name: df[name].astype(object).where(df[name].notna(), None).tolist() for name in STRING_COLUMNS},
+    )
+
+
+def load_catalog(path: str = MOBILES_CATALOG_PATH) -> ColumnarTable:
+    """Memory-maps a catalog file written by `save_catalog`."""
+    return ColumnarTable(path)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Compile the raw mobiles CSV into the binary columnar catalog.")
+    parser.add_argument("--csv", default=MOBILES_CSV_PATH, help="Path to the raw mobiles CSV.")
+    parser.add_argument("--output", default=MOBILES_CATALOG_PATH, help="Path of the catalog file to write.")
+    args = parser.parse_args()
+
+    build_catalog(args.csv, args.output)
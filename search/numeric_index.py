@@ -0,0 +1,79 @@
+import threading
+import numpy as np
+from search.columnar import ColumnarTable
+
+# Numeric columns that get a sorted index for range predicates.
+NUMERIC_INDEX_COLUMNS = ("price", "storage_gb", "rating", "ram_gb", "battery_mah",
+                         "display_inches", "rear_camera_mp", "front_camera_mp")
+
+
+def as_bound(value) -> float | None:
+    """
+    Converts a range bound to a float, so numeric strings from tool calls ("800") compare as numbers.
+    Raises:
+        ValueError: If the bound is not a number.
+    """
+    if value is None:
+        return None
+    try:
+        bound = float(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"Range bound {value!r} is not a number.") from None
+    if np.isnan(bound):
+        raise ValueError(f"Range bound {value!r} is not a number.")
+    return bound
+
+
+class _SortedColumn:
+    """Non-missing values of one column in ascending order, with their row ids."""
+
+    def __init__(self, values: np.ndarray):
+        rows = np.flatnonzero(~np.isnan(values))
+        order = np.argsort(values[rows], kind="stable")
+        self.rows = rows[order]
+        self.values = values[self.rows]
+
+    def bounds(self, low: float = None, high: float = None) -> tuple:
+        """Binary-searches the slice of sorted positions with low <= value <= high."""
+        low, high = as_bound(low), as_bound(high)
+        start = 0 if low is None else int(np.searchsorted(self.values, low, side="left"))
+        end = len(self.values) if high is None else int(np.searchsorted(self.values, high, side="right"))
+        return start, max(start, end)
+
+
+class NumericIndex:
+    """
+    Sorted per-column indexes answering inclusive range predicates by binary search.
+
+    Both the match count (for query planning) and the matching row ids come straight from two
+    `searchsorted` calls, with no per-row comparisons. Missing values never match a range, just
+    like NaN comparisons. Column indexes are built lazily the first time a column is queried.
+    """
+
+    def __init__(self, table: ColumnarTable, columns=NUMERIC_INDEX_COLUMNS):
+        self.table = table
+        self.columns = tuple(name for name in columns if name in table.column_names)
+        self._sorted = {}
+        self._lock = threading.Lock()
+
+    def _column(self, column: str) -> _SortedColumn:
+        sorted_column = self._sorted.get(column)
+        if sorted_column is None:
+            if column not in self.columns:
+                raise KeyError(f"Column '{column}' is not numerically indexed.")
+            with self._lock:
+                sorted_column = self._sorted.get(column)
+                if sorted_column is None:
+                    sorted_column = self._sorted[column] = _SortedColumn(self.table.numeric(column))
+        return sorted_column
+
+    def count(self, column: str, low: float = None, high: float = None) -> int:
+        """Returns how many rows satisfy low <= value <= high."""
+        start, end = self._column(column).bounds(low, high)
+        return end - start
+
+    def range(self, column: str, low: float = None, high: float = None) -> np.ndarray:
+        """Returns the row ids with low <= value <= high, in value order (not row order)."""
+        sorted_column = self._column(column)
+        start, end = sorted_column.bounds(low, high)
+        return sorted_column.rows[start:end]
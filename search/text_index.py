@@ -0,0 +1,138 @@
+import bisect
+import re
+import threading
+import numpy as np
+from search.columnar import ColumnarTable, NA_CODE
+
+# Columns that get a text index. Brand and title back search_mobiles; model names are indexed
+# for tools that look phones up by model.
+TEXT_INDEX_COLUMNS = ("brand", "title", "model_name")
+NGRAM_SIZE = 3
+_REGEX_METACHARACTERS = set(".^$*+?{}[]\\|()")
+_TOKEN_RE = re.compile(r"\w+")
+# Characters that re.IGNORECASE treats as an ASCII letter although str.lower() does not.
+_ASCII_CASE_EQUIVALENTS = str.maketrans({"\u0130": "i", "\u0131": "i", "\u017f": "s"})
+
+
+def normalize_text(text: str) -> str:
+    """Case-folds text the same way for indexing and querying."""
+    return text.translate(_ASCII_CASE_EQUIVALENTS).lower()
+
+
+def tokenize(text: str) -> list:
+    """Splits normalized text into word tokens (e.g. 'galaxy', 's24', '5g')."""
+    return _TOKEN_RE.findall(normalize_text(text))
+
+
+def ngrams(text: str, n: int = NGRAM_SIZE) -> set:
+    """Returns the set of character n-grams of normalized text."""
+    text = normalize_text(text)
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class _ColumnIndex:
+    """Inverted indexes for one dictionary-encoded string column."""
+
+    def __init__(self, table: ColumnarTable, column: str):
+        codes = table.codes(column)
+        strings = table.strings
+        self.distinct = table.distinct_codes(column)
+
+        # Posting lists are built over distinct dictionary codes, then mapped to rows through a
+        # CSR-style layout, so repeated values (brands especially) are indexed once.
+        gram_postings, token_postings = {}, {}
+        for code in self.distinct.tolist():
+            value = strings[code]
+            for gram in ngrams(value):
+                gram_postings.setdefault(gram, []).append(code)
+            for token in set(tokenize(value)):
+                token_postings.setdefault(token, []).append(code)
+        self.gram_postings = {gram: np.array(posting, dtype=np.int32) for gram, posting in gram_postings.items()}
+        self.token_postings = {token: np.array(posting, dtype=np.int32) for token, posting in token_postings.items()}
+        self.vocabulary = sorted(self.token_postings)
+
+        valid_rows = np.flatnonzero(codes != NA_CODE)
+        order = valid_rows[np.argsort(codes[valid_rows], kind="stable")]
+        self._rows_by_code = order
+        self._sorted_codes = codes[order]
+
+    def rows_for_codes(self, codes) -> np.ndarray:
+        """Returns the sorted row ids whose value is one of `codes`."""
+        if len(codes) == 0:
+            return np.empty(0, dtype=np.int64)
+        codes = np.asarray(codes)
+        starts = np.searchsorted(self._sorted_codes, codes, side="left")
+        ends = np.searchsorted(self._sorted_codes, codes, side="right")
+        rows = np.concatenate([self._rows_by_code[s:e] for s, e in zip(starts, ends)])
+        rows.sort()
+        return rows
+
+
+class TextIndex:
+    """
+    N-gram and token inverted indexes over the catalog's text columns.
+
+    Substring queries intersect the posting lists of the query's n-grams and then verify the few
+    surviving candidates, so matching cost depends on the number of candidate values rather than on
+    the catalog size. Column indexes are built lazily the first time a column is queried.
+    """
+
+    def __init__(self, table: ColumnarTable, columns=TEXT_INDEX_COLUMNS):
+        self.table = table
+        self.columns = tuple(name for name in columns if name in table.column_names)
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def _index(self, column: str) -> _ColumnIndex:
+        index = self._indexes.get(column)
+        if index is None:
+            if column not in self.columns:
+                raise KeyError(f"Column '{column}' is not text indexed.")
+            with self._lock:
+                index = self._indexes.get(column)
+                if index is None:
+                    index = self._indexes[column] = _ColumnIndex(self.table, column)
+        return index
+
+    def contains(self, column: str, pattern: str) -> np.ndarray:
+        """
+        Returns sorted row ids whose value matches `pattern` case-insensitively, with the same
+        semantics as `Series.str.contains(pattern, case=False, na=False)` (patterns are regexes).
+        """
+        index = self._index(column)
+        return index.rows_for_codes(self._matching_codes(index, pattern))
+
+    def prefix(self, column: str, prefix: str) -> np.ndarray:
+        """Returns sorted row ids having any token that starts with `prefix` (e.g. 'galax')."""
+        index = self._index(column)
+        prefix = normalize_text(prefix)
+        start = bisect.bisect_left(index.vocabulary, prefix)
+        postings = []
+        for token in index.vocabulary[start:]:
+            if not token.startswith(prefix):
+                break
+            postings.append(index.token_postings[token])
+        codes = np.unique(np.concatenate(postings)) if postings else []
+        return index.rows_for_codes(codes)
+
+    def _matching_codes(self, index: _ColumnIndex, pattern: str) -> list:
+        regex = re.compile(pattern, flags=re.IGNORECASE)
+        candidates = index.distinct
+        # Only plain ASCII literals can be narrowed by n-grams (re's case-insensitive matching of
+        # other scripts, e.g. final sigma, differs from str.lower()); real regexes are checked
+        # against every distinct value, which is still far fewer than the number of rows.
+        if len(pattern) >= NGRAM_SIZE and pattern.isascii() and not _REGEX_METACHARACTERS.intersection(pattern):
+            postings = []
+            for gram in ngrams(pattern):
+                posting = index.gram_postings.get(gram)
+                if posting is None:
+                    return []
+                postings.append(posting)
+            postings.sort(key=len)
+            candidates = postings[0]
+            for posting in postings[1:]:
+                candidates = np.intersect1d(candidates, posting, assume_unique=True)
+                if len(candidates) == 0:
+                    return []
+        strings = self.table.strings
+        return [code for code in candidates.tolist() if regex.search(strings[code])]
@@ -0,0 +1,62 @@
+import io
+import wave
+import numpy as np
+
+SAMPLE_WIDTH_BYTES = 2  # All audio is handled as mono 16-bit PCM.
+
+
+class AudioClip:
+    """
+    One utterance of mono 16-bit PCM audio held in memory.
+
+    Clips travel directly from capture to transcription; writing them to disk is only an optional
+    debug step (`write_wav`). Because each clip owns its own buffer, concurrent sessions never
+    share a temporary file.
+    """
+
+    __slots__ = ("samples", "sample_rate")
+
+    def __init__(self, samples: np.ndarray, sample_rate: int):
+        samples = np.asarray(samples)
+        if samples.ndim > 1:
+            samples = samples[:, 0] if samples.shape[1] >= 1 else samples.reshape(-1)
+        self.samples = np.ascontiguousarray(samples, dtype=np.int16)
+        self.sample_rate = sample_rate
+
+    @property
+    def duration_seconds(self) -> float:
+        return len(self.samples) / self.sample_rate
+
+    @property
+    def pcm(self) -> memoryview:
+        """Zero-copy view of the raw little-endian PCM bytes."""
+        return memoryview(self.samples).cast("B")
+
+    @classmethod
+    def from_wav_bytes(cls, data: bytes) -> "AudioClip":
+        """Decodes an in-memory WAV file (e.g. an uploaded recording)."""
+        return cls._from_wave(wave.open(io.BytesIO(data), "rb"))
+
+    @classmethod
+    def from_wav_file(cls, path: str) -> "AudioClip":
+        """Reads a WAV file from disk (e.g. recorded fixtures or archived calls)."""
+        return cls._from_wave(wave.open(path, "rb"))
+
+    @classmethod
+    def _from_wave(cls, reader) -> "AudioClip":
+        with reader:
+            if reader.getsampwidth() != SAMPLE_WIDTH_BYTES:
+                raise ValueError(f"Expected 16-bit PCM audio, got {8 * reader.getsampwidth()}-bit.")
+            samples = np.frombuffer(reader.readframes(reader.getnframes()), dtype="<i2")
+            channels = reader.getnchannels()
+            if channels > 1:
+                samples = samples.reshape(-1, channels)[:, 0]
+            return cls(samples, reader.getframerate())
+
+    def write_wav(self, path: str):
+        """Writes the clip as a WAV file (debug sink)."""
+        with wave.open(path, "wb") as writer:
+            writer.setnchannels(1)
+            writer.setsampwidth(SAMPLE_WIDTH_BYTES)
+            writer.setframerate(self.sample_rate)
+            writer.writeframes(self.pcm)
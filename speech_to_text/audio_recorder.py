@@ -1,28 +1,79 @@
+import os
+import time
 import sounddevice as sd
-import soundfile as sf
-import numpy as np
-from src.config import RECORD_DURATION_SECONDS, SAMPLE_RATE
+from src.config import RECORD_DURATION_SECONDS, SAMPLE_RATE, AUDIO_DEBUG_DIR
+from speech_to_text.audio_frames import AudioClip
+from speech_to_text.stream_recorder import StreamingRecorder
 
-def record_audio(filename: str) -> bool:
+def record_audio() -> AudioClip | None:
     """
     Records audio from the microphone for a specified duration.
-    Args:
-        filename (str): The path to save the recorded audio file.
     Returns:
-        bool: True if recording was successful, False otherwise.
+        AudioClip | None: The recorded audio held in memory, or None if recording failed.
     """
     print(f"Recording customer feedback for {RECORD_DURATION_SECONDS} seconds...")
     try:
         # Record audio
-        audio_data = sd.rec(int(RECORD_DURATION_SECONDS * SAMPLE_RATE), 
-                            samplerate=SAMPLE_RATE, 
-                            channels=1, 
+        audio_data = sd.rec(int(RECORD_DURATION_SECONDS * SAMPLE_RATE),
+                            samplerate=SAMPLE_RATE,
+                            channels=1,
                             dtype='int16')
         sd.wait()
-        sf.write(filename, audio_data, SAMPLE_RATE)
-        print(f"Recording saved to {filename}")
-        return True
+        clip = AudioClip(audio_data, SAMPLE_RATE)
+        print(f"Recorded {clip.duration_seconds:.1f} seconds of audio.")
+        save_debug_copy(clip)
+        return clip
     except Exception as e:
         print(f"Error during recording: {e}")
         print("Please ensure your microphone is connected and working.")
-        return False
+        return None
+
+_streaming_recorder = None
+
+def record_utterance() -> AudioClip | None:
+    """
+    Waits for the customer to say something and stop talking, using voice-activity detection
+    on a continuously open microphone stream.
+    Returns:
+        AudioClip | None: The utterance held in memory, or None if capture failed or was stopped.
+    """
+    global _streaming_recorder
+    try:
+        if _streaming_recorder is None:
+            _streaming_recorder = StreamingRecorder(SAMPLE_RATE)
+        clip = _streaming_recorder.next_utterance()
+    except Exception as e:
+        print(f"Error during recording: {e}")
+        print("Please ensure your microphone is connected and working.")
+        stop_recording()
+        return None
+    if clip is not None:
+        print(f"Captured a {clip.duration_seconds:.1f} second utterance.")
+        save_debug_copy(clip)
+    return clip
+
+def stop_recording():
+    """Closes the streaming microphone capture, if open."""
+    global _streaming_recorder
+    recorder, _streaming_recorder = _streaming_recorder, None
+    if recorder is not None:
+        recorder.stop()
+
+def pause_recording():
+    """Stops listening while the agent's reply plays, so it doesn't transcribe its own voice."""
+    if _streaming_recorder is not None:
+        _streaming_recorder.pause()
+
+def resume_recording():
+    """Starts listening again after `pause_recording`."""
+    if _streaming_recorder is not None:
+        _streaming_recorder.resume()
+
+def save_debug_copy(clip: AudioClip):
+    """Writes the clip to AUDIO_DEBUG_DIR when that debug sink is enabled."""
+    if not AUDIO_DEBUG_DIR:
+        return
+    os.makedirs(AUDIO_DEBUG_DIR, exist_ok=True)
+    filename = os.path.join(AUDIO_DEBUG_DIR, f"customer_recording_{time.strftime('%Y%m%d_%H%M%S')}_{time.monotonic_ns()}.wav")
+    clip.write_wav(filename)
+    print(f"Debug copy of the recording saved to {filename}")
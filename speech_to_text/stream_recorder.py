@@ -0,0 +1,118 @@
+import threading
+from collections import deque
+import numpy as np
+from src.config import SAMPLE_RATE, VAD_FRAME_MS, VAD_RING_BUFFER_SECONDS
+from speech_to_text.audio_frames import AudioClip
+from speech_to_text.vad import RingBuffer, UtteranceSegmenter
+
+
+class StreamingRecorder:
+    """
+    Continuous microphone capture that yields one AudioClip per spoken utterance.
+
+    The audio callback only copies each block into a ring buffer; the consumer thread drains it
+    through the voice-activity segmenter. Because the stream stays open between utterances,
+    nothing the customer says while the previous turn is being transcribed or analyzed is lost.
+
+    `feed` is the single entry point for audio: the microphone callback uses it, and so does
+    `process_clip`, which runs recorded WAV fixtures through the same path without a sound device.
+
+    While paused (the agent's own reply is playing) new audio is ignored, so the speakers'
+    output is never picked up as a customer utterance. Audio captured before the pause is kept:
+    an utterance the customer was still speaking is ended at the pause and transcribed.
+    """
+
+    def __init__(self, sample_rate: int = SAMPLE_RATE, segmenter: UtteranceSegmenter = None):
+        self.sample_rate = sample_rate
+        self.segmenter = segmenter or UtteranceSegmenter(sample_rate)
+        self.block_size = int(sample_rate * VAD_FRAME_MS / 1000)
+        self.ring = RingBuffer(int(sample_rate * VAD_RING_BUFFER_SECONDS))
+        self.status_errors = 0
+        self._ready = deque()
+        self._data_available = threading.Event()
+        self._stopped = threading.Event()
+        self._paused = threading.Event()
+        self._flush_pending = False
+        self._stream = None
+
+    def feed(self, samples: np.ndarray):
+        """Queues captured samples for voice-activity detection. Safe to call from the audio thread."""
+        if self._paused.is_set():
+            return
+        self.ring.write(samples)
+        self._data_available.set()
+
+    def start(self):
+        """Opens the microphone stream."""
+        import sounddevice as sd  # Only live capture needs an audio device.
+
+        self._stopped.clear()
+        self._stream = sd.InputStream(samplerate=self.sample_rate,
+                                      channels=1,
+                                      dtype='int16',
+                                      blocksize=self.block_size,
+                                      callback=self._callback)
+        self._stream.start()
+        print("Listening for customer feedback (speak at any time)...")
+
+    def stop(self):
+        """Closes the microphone stream and releases any thread waiting in `next_utterance`."""
+        self._stopped.set()
+        self._data_available.set()
+        if self._stream is not None:
+            self._stream.close()
+            self._stream = None
+
+    def pause(self):
+        """Stops listening (while a reply plays), ending any utterance that was in progress."""
+        self._paused.set()
+        # The segmenter belongs to the consumer thread, so it is flushed there on the next drain.
+        self._flush_pending = True
+        self._data_available.set()
+
+    def resume(self):
+        """Starts listening again after `pause`."""
+        self._paused.clear()
+
+    def next_utterance(self) -> AudioClip | None:
+        """
+        Blocks until the customer finishes an utterance.
+        Returns:
+            AudioClip | None: The utterance, or None once the recorder has been stopped.
+        """
+        if self._stream is None and not self._stopped.is_set():
+            self.start()
+        while not self._ready:
+            if self._stopped.is_set():
+                return None
+            self._data_available.wait(timeout=0.5)
+            self._data_available.clear()
+            self._drain()
+        return self._ready.popleft()
+
+    def process_clip(self, clip: AudioClip) -> list:
+        """
+        Runs a recorded clip through the live capture path block by block.
+        Returns:
+            list: The AudioClips of every utterance found in the recording.
+        """
+        for start in range(0, len(clip.samples), self.block_size):
+            self.feed(clip.samples[start:start + self.block_size])
+            self._drain()
+        self._ready.extend(self.segmenter.flush())
+        clips = list(self._ready)
+        self._ready.clear()
+        return clips
+
+    def _callback(self, indata, frames, time_info, status):
+        if status:
+            self.status_errors += 1
+        self.feed(indata[:, 0])
+
+    def _drain(self):
+        samples = self.ring.read()
+        if len(samples):
+            self._ready.extend(self.segmenter.process(samples))
+        if self._flush_pending:
+            self._flush_pending = False
+            self._ready.extend(self.segmenter.flush())
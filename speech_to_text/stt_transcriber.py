@@ -1,34 +1,221 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+import numpy as np
 import speech_recognition as sr
-# from src.config import WHISPER_MODEL # No longer needed for SpeechRecognition
+from src.config import STT_BACKEND, WHISPER_MODEL, STT_LANGUAGE
+from speech_to_text.audio_frames import AudioClip, SAMPLE_WIDTH_BYTES
+from src.tracing import TRACER
 
-def transcribe_audio(audio_path: str) -> str | None:
+WHISPER_SAMPLE_RATE = 16000
+WHISPER_WINDOW_SECONDS = 30  # Whisper decodes fixed 30 s windows; shorter clips are padded.
+
+
+class Transcriber(ABC):
+    """
+    Speech-to-text backend. Backends are created once and reused for every utterance, so any
+    model they need is loaded a single time (`load`) and stays warm.
+
+    Every call reports the real-time factor (processing time / audio duration) per utterance;
+    when utterances are decoded as a batch, the batch time is shared out by duration.
     """
-    Transcribes an audio file to text using the SpeechRecognition library.
+
+    name = "base"
+
+    def __init__(self):
+        self.utterances = 0
+        self.audio_seconds = 0.0
+        self.processing_seconds = 0.0
+
+    def load(self):
+        """Loads models ahead of the first utterance. Backends without a local model do nothing."""
+
+    def transcribe(self, clip: AudioClip) -> str | None:
+        return self.transcribe_batch([clip])[0]
+
+    def transcribe_batch(self, clips: list) -> list:
+        """
+        Transcribes several queued utterances at once. If decoding the batch fails, its clips are
+        retried one at a time, so a single bad clip doesn't cost the others their transcripts.
+        Returns:
+            list: The text for each clip, in order, with None where nothing was recognized.
+        """
+        started = time.perf_counter()
+        with TRACER.span("stt.transcribe", backend=self.name, clips=len(clips),
+                         audio_seconds=round(sum(clip.duration_seconds for clip in clips), 2)):
+            try:
+                texts = self._decode(clips)
+            except Exception as e:
+                print(f"Error during transcription: {e}")
+                texts = [self._decode_alone(clip) for clip in clips] if len(clips) > 1 else [None]
+        self._report(clips, time.perf_counter() - started)
+        return texts
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.name,
+            "utterances": self.utterances,
+            "audio_seconds": round(self.audio_seconds, 2),
+            "real_time_factor": round(self.processing_seconds / self.audio_seconds, 3) if self.audio_seconds else None,
+        }
+
+    @abstractmethod
+    def _decode(self, clips: list) -> list:
+        """Returns the text (or None) for each clip; every backend implements this."""
+
+    def _decode_alone(self, clip: AudioClip) -> str | None:
+        try:
+            return self._decode([clip])[0]
+        except Exception as e:
+            print(f"Error during transcription: {e}")
+            return None
+
+    def _report(self, clips: list, elapsed: float):
+        total_audio = sum(clip.duration_seconds for clip in clips) or 1e-9
+        self.utterances += len(clips)
+        self.audio_seconds += total_audio
+        self.processing_seconds += elapsed
+        batch_note = f" (batch of {len(clips)})" if len(clips) > 1 else ""
+        for clip in clips:
+            share = elapsed * clip.duration_seconds / total_audio
+            print(f"[{self.name}] {clip.duration_seconds:.1f} s utterance transcribed in {share:.2f} s, "
+                  f"real-time factor {share / max(clip.duration_seconds, 1e-9):.2f}{batch_note}")
+
+
+class GoogleTranscriber(Transcriber):
+    """Google Web Speech API via SpeechRecognition. Needs network access; clips are sent one at a time."""
+
+    name = "google"
+
+    def __init__(self):
+        super().__init__()
+        self.recognizer = sr.Recognizer()
+
+    def _decode(self, clips: list) -> list:
+        return [self._recognize(clip) for clip in clips]
+
+    def _recognize(self, clip: AudioClip) -> str | None:
+        # Hand the clip's PCM buffer straight to the recognizer: no WAV round-trip and no copy.
+        # AudioData only passes the frames to audioop/wave, which accept any bytes-like buffer.
+        audio_data = sr.AudioData(clip.pcm, clip.sample_rate, SAMPLE_WIDTH_BYTES)
+        try:
+            print("Transcribing audio using Google Web Speech API...")
+            transcription = self.recognizer.recognize_google(audio_data)
+            print("Transcription complete.")
+            print(f"Transcription: {transcription}")
+            return transcription
+        except sr.UnknownValueError:
+            print("Speech Recognition could not understand audio")
+            return None
+        except sr.RequestError as e:
+            print(f"Could not request results from Google Web Speech API service; {e}")
+            return None
+
+
+class WhisperTranscriber(Transcriber):
+    """
+    Local, offline transcription with OpenAI Whisper on the CPU.
+
+    Utterances up to 30 s (the VAD's maximum) are padded to Whisper's window and decoded
+    together in one batched forward pass; longer recordings fall back to sliding-window
+    transcription one at a time.
+    """
+
+    name = "whisper"
+
+    def __init__(self, model_name: str = WHISPER_MODEL, language: str = STT_LANGUAGE):
+        super().__init__()
+        self.model_name = model_name
+        self.language = language
+        self._model = None
+        self._lock = threading.Lock()  # One decode at a time; the model is shared by all callers.
+
+    def load(self):
+        with self._lock:
+            if self._model is None:
+                import whisper  # Optional dependency, only needed for this backend.
+
+                started = time.perf_counter()
+                self._model = whisper.load_model(self.model_name, device="cpu")
+                print(f"Loaded Whisper '{self.model_name}' model in {time.perf_counter() - started:.1f} s.")
+
+    def _decode(self, clips: list) -> list:
+        import torch
+        import whisper
+
+        self.load()
+        audio = [_to_whisper_input(clip) for clip in clips]
+        texts = [None] * len(clips)
+        windowed = [i for i, samples in enumerate(audio) if len(samples) <= WHISPER_WINDOW_SECONDS * WHISPER_SAMPLE_RATE]
+        with self._lock:
+            if windowed:
+                mels = torch.stack([whisper.log_mel_spectrogram(whisper.pad_or_trim(audio[i]), self._model.dims.n_mels)
+                                    for i in windowed])
+                options = whisper.DecodingOptions(language=self.language, fp16=False, without_timestamps=True)
+                for i, result in zip(windowed, whisper.decode(self._model, mels.to(self._model.device), options)):
+                    texts[i] = result.text.strip()
+            for i in sorted(set(range(len(clips))) - set(windowed)):
+                texts[i] = self._model.transcribe(audio[i], language=self.language, fp16=False)["text"].strip()
+        for text in texts:
+            if text:
+                print(f"Transcription: {text}")
+        return [text or None for text in texts]
+
+
+def _to_whisper_input(clip: AudioClip) -> np.ndarray:
+    """Converts a clip to the float32 16 kHz waveform Whisper expects."""
+    samples = clip.samples.astype(np.float32) / 32768.0
+    if clip.sample_rate != WHISPER_SAMPLE_RATE:
+        target_length = int(len(samples) * WHISPER_SAMPLE_RATE / clip.sample_rate)
+        samples = np.interp(np.linspace(0, len(samples) - 1, target_length), np.arange(len(samples)), samples)
+    return samples.astype(np.float32)
+
+
+TRANSCRIBER_BACKENDS = {
+    GoogleTranscriber.name: GoogleTranscriber,
+    WhisperTranscriber.name: WhisperTranscriber,
+}
+
+_transcriber = None
+_transcriber_lock = threading.Lock()
+
+def get_transcriber() -> Transcriber:
+    """Returns the process-wide transcriber for STT_BACKEND, creating it on first use."""
+    global _transcriber
+    with _transcriber_lock:
+        if _transcriber is None:
+            if STT_BACKEND not in TRANSCRIBER_BACKENDS:
+                raise ValueError(f"Unknown STT_BACKEND '{STT_BACKEND}'. Choose from: {', '.join(TRANSCRIBER_BACKENDS)}.")
+            _transcriber = TRANSCRIBER_BACKENDS[STT_BACKEND]()
+        return _transcriber
+
+def set_transcriber(transcriber: Transcriber):
+    """Replaces the process-wide transcriber (e.g. with a preloaded or stand-in backend)."""
+    global _transcriber
+    with _transcriber_lock:
+        _transcriber = transcriber
+
+def transcribe_audio(audio: AudioClip | str) -> str | None:
+    """
+    Transcribes audio to text with the configured backend.
     Args:
-        audio_path (str): The path to the audio file.
+        audio (AudioClip | str): The in-memory recording, or the path to a WAV file.
     Returns:
         str | None: The transcribed text if successful, None otherwise.
     """
-    recognizer = sr.Recognizer()
-    
     try:
-        with sr.AudioFile(audio_path) as source:
+        if not isinstance(audio, AudioClip):
             print("Reading audio file...")
-            audio_data = recognizer.record(source) # read the entire audio file
-
-        print("Transcribing audio using Google Web Speech API...")
-        # You can specify other recognizers like recognizer.recognize_sphinx for offline
-        transcription = recognizer.recognize_google(audio_data) 
-        
-        print("Transcription complete.")
-        print(f"Transcription: {transcription}")
-        return transcription
-    except sr.UnknownValueError:
-        print("Speech Recognition could not understand audio")
-        return None
-    except sr.RequestError as e:
-        print(f"Could not request results from Google Web Speech API service; {e}")
-        return None
+            audio = AudioClip.from_wav_file(audio)
+        return get_transcriber().transcribe(audio)
     except Exception as e:
         print(f"Error during transcription: {e}")
         return None
+
+def transcribe_audio_batch(clips: list) -> list:
+    """Transcribes several queued utterances in one call; see `Transcriber.transcribe_batch`."""
+    try:
+        return get_transcriber().transcribe_batch(clips)
+    except Exception as e:
+        print(f"Error during transcription: {e}")
+        return [None] * len(clips)
@@ -0,0 +1,189 @@
+import threading
+from collections import deque
+import numpy as np
+from src.config import (VAD_FRAME_MS, VAD_ENERGY_THRESHOLD_DB, VAD_NOISE_MARGIN_DB, VAD_MAX_ZERO_CROSSING_RATE,
+                        VAD_SPEECH_START_MS, VAD_END_SILENCE_MS, VAD_PRE_ROLL_MS, VAD_MIN_UTTERANCE_MS,
+                        VAD_MAX_UTTERANCE_SECONDS)
+from speech_to_text.audio_frames import AudioClip
+
+
+def frame_features(frames: np.ndarray) -> tuple:
+    """
+    Computes per-frame energy and zero-crossing rate for a 2-D (frames x samples) int16 array.
+    Returns:
+        tuple: (energy in dBFS, fraction of adjacent samples that change sign), one value per frame.
+    """
+    x = frames.astype(np.float32) / 32768.0
+    energy_db = 10.0 * np.log10(np.mean(x * x, axis=1) + 1e-10)
+    zero_crossing_rate = np.mean(np.signbit(x[:, 1:]) != np.signbit(x[:, :-1]), axis=1)
+    return energy_db, zero_crossing_rate
+
+
+class EnergyVAD:
+    """
+    Lightweight voice-activity detector working on whole blocks of frames at once.
+
+    A frame is speech when its energy clears both an absolute threshold and the tracked noise
+    floor by a margin. Frames with a very high zero-crossing rate (hiss, fans) only count when
+    they are clearly louder than that threshold.
+    """
+
+    def __init__(self,
+                 threshold_db: float = VAD_ENERGY_THRESHOLD_DB,
+                 noise_margin_db: float = VAD_NOISE_MARGIN_DB,
+                 max_zero_crossing_rate: float = VAD_MAX_ZERO_CROSSING_RATE):
+        self.threshold_db = threshold_db
+        self.noise_margin_db = noise_margin_db
+        self.max_zero_crossing_rate = max_zero_crossing_rate
+        self.noise_floor_db = None
+
+    def classify(self, frames: np.ndarray) -> np.ndarray:
+        """Returns a boolean speech decision per frame."""
+        energy_db, zero_crossing_rate = frame_features(frames)
+        threshold = self.threshold_db
+        if self.noise_floor_db is not None:
+            threshold = max(threshold, self.noise_floor_db + self.noise_margin_db)
+        speech = (energy_db > threshold) & (
+            (zero_crossing_rate < self.max_zero_crossing_rate) | (energy_db > threshold + self.noise_margin_db))
+
+        # Track the background level from the frames judged to be silence.
+        if not speech.all():
+            background = float(np.median(energy_db[~speech]))
+            if self.noise_floor_db is None:
+                self.noise_floor_db = background
+            else:
+                self.noise_floor_db = 0.9 * self.noise_floor_db + 0.1 * background
+        return speech
+
+
+class UtteranceSegmenter:
+    """
+    Turns a continuous sample stream into utterances using voice-activity decisions.
+
+    An utterance starts after VAD_SPEECH_START_MS of consecutive speech (keeping VAD_PRE_ROLL_MS
+    of audio before it so word onsets aren't clipped) and ends after VAD_END_SILENCE_MS of
+    silence, or when it reaches VAD_MAX_UTTERANCE_SECONDS.
+    """
+
+    def __init__(self,
+                 sample_rate: int,
+                 vad: EnergyVAD = None,
+                 frame_ms: int = VAD_FRAME_MS,
+                 speech_start_ms: int = VAD_SPEECH_START_MS,
+                 end_silence_ms: int = VAD_END_SILENCE_MS,
+                 pre_roll_ms: int = VAD_PRE_ROLL_MS,
+                 min_utterance_ms: int = VAD_MIN_UTTERANCE_MS,
+                 max_utterance_seconds: float = VAD_MAX_UTTERANCE_SECONDS):
+        self.sample_rate = sample_rate
+        self.vad = vad or EnergyVAD()
+        self.frame_length = int(sample_rate * frame_ms / 1000)
+        self.start_frames = max(1, speech_start_ms // frame_ms)
+        self.end_frames = max(1, end_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_utterance_ms // frame_ms)
+        self.max_frames = int(max_utterance_seconds * 1000 // frame_ms)
+        self._pending = np.empty(0, dtype=np.int16)
+        self._pre_roll = deque(maxlen=pre_roll_ms // frame_ms + self.start_frames)
+        self._utterance = []
+        self._in_speech = False
+        self._speech_run = 0
+        self._silence_run = 0
+        self._speech_frames = 0
+
+    def process(self, samples: np.ndarray) -> list:
+        """
+        Consumes a block of int16 samples of any length.
+        Returns:
+            list: The AudioClips of utterances completed by this block.
+        """
+        samples = np.concatenate([self._pending, np.asarray(samples, dtype=np.int16)])
+        usable = len(samples) - len(samples) % self.frame_length
+        self._pending = samples[usable:]
+        if usable == 0:
+            return []
+        frames = samples[:usable].reshape(-1, self.frame_length)
+        decisions = self.vad.classify(frames)
+
+        completed = []
+        for frame, is_speech in zip(frames, decisions.tolist()):
+            if not self._in_speech:
+                self._pre_roll.append(frame)
+                self._speech_run = self._speech_run + 1 if is_speech else 0
+                if self._speech_run >= self.start_frames:
+                    self._in_speech = True
+                    self._utterance = list(self._pre_roll)
+                    self._pre_roll.clear()
+                    self._speech_frames = self._speech_run
+                    self._silence_run = 0
+                continue
+
+            self._utterance.append(frame)
+            if is_speech:
+                self._speech_frames += 1
+                self._silence_run = 0
+            else:
+                self._silence_run += 1
+            if self._silence_run >= self.end_frames or len(self._utterance) >= self.max_frames:
+                clip = self._finish_utterance()
+                if clip is not None:
+                    completed.append(clip)
+        return completed
+
+    def flush(self) -> list:
+        """Ends the stream, returning an utterance that was still in progress."""
+        clip = self._finish_utterance() if self._in_speech else None
+        self._pending = np.empty(0, dtype=np.int16)
+        self._pre_roll.clear()
+        return [clip] if clip is not None else []
+
+    def _finish_utterance(self):
+        frames, speech_frames = self._utterance, self._speech_frames
+        self._utterance, self._in_speech = [], False
+        self._speech_run = self._silence_run = self._speech_frames = 0
+        if speech_frames < self.min_speech_frames:
+            return None
+        return AudioClip(np.concatenate(frames), self.sample_rate)
+
+
+class RingBuffer:
+    """
+    Fixed-capacity int16 sample buffer between the audio callback and the VAD consumer.
+
+    Writes never block or allocate; if the consumer falls behind, the oldest samples are
+    overwritten and counted in `overruns`.
+    """
+
+    def __init__(self, capacity: int):
+        self._data = np.zeros(capacity, dtype=np.int16)
+        self._start = 0
+        self._size = 0
+        self._lock = threading.Lock()
+        self.overruns = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, samples: np.ndarray):
+        capacity = len(self._data)
+        with self._lock:
+            if len(samples) > capacity:
+                self.overruns += len(samples) - capacity
+                samples = samples[-capacity:]
+            overflow = self._size + len(samples) - capacity
+            if overflow > 0:
+                self.overruns += overflow
+                self._start = (self._start + overflow) % capacity
+                self._size -= overflow
+            end = (self._start + self._size) % capacity
+            first = min(len(samples), capacity - end)
+            self._data[end:end + first] = samples[:first]
+            self._data[:len(samples) - first] = samples[first:]
+            self._size += len(samples)
+
+    def read(self) -> np.ndarray:
+        """Removes and returns every buffered sample, oldest first."""
+        with self._lock:
+            indices = (self._start + np.arange(self._size)) % len(self._data)
+            samples = self._data[indices]
+            self._start = (self._start + self._size) % len(self._data)
+            self._size = 0
+        return samples
@@ -0,0 +1,188 @@
+import json
+import os
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait, FIRST_COMPLETED
+import numpy as np
+from src.config import BATCH_CONCURRENCY, BATCH_OUTPUT_PATH, BATCH_PROGRESS_EVERY
+from prompts.llm_analyzer import analyze_with_llama3, analysis_failed
+from src.tracing import TRACER
+
+# One archived call: either a transcript (`text`) or a recording to transcribe (`audio`, a WAV path).
+BatchItem = namedtuple("BatchItem", ["id", "text", "audio"])
+
+
+def iter_batch_items(input_path: str):
+    """
+    Yields the calls to analyze from a directory or a JSONL file, without loading them all.
+
+    A directory contributes every .wav recording and .txt transcript below it (ids are the
+    relative paths). A JSONL file holds one object per line with "text" or "audio" (a WAV path,
+    relative to the file) and optionally "id" (defaults to the line number).
+    """
+    if os.path.isdir(input_path):
+        for root, dirs, files in os.walk(input_path):
+            dirs.sort()
+            for name in sorted(files):
+                path = os.path.join(root, name)
+                item_id = os.path.relpath(path, input_path)
+                if name.lower().endswith(".wav"):
+                    yield BatchItem(item_id, None, path)
+                elif name.lower().endswith(".txt"):
+                    with open(path, encoding="utf-8") as f:
+                        yield BatchItem(item_id, f.read().strip(), None)
+        return
+
+    base_dir = os.path.dirname(os.path.abspath(input_path))
+    with open(input_path, encoding="utf-8") as f:
+        for line_number, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                print(f"Skipping malformed line {line_number} of {input_path}.")
+                continue
+            if not isinstance(record, dict):
+                print(f"Skipping line {line_number} of {input_path}: expected a JSON object.")
+                continue
+            audio = record.get("audio")
+            if audio and not os.path.isabs(audio):
+                audio = os.path.join(base_dir, audio)
+            yield BatchItem(str(record.get("id", line_number)), record.get("text"), audio)
+
+
+def load_checkpoint(output_path: str) -> set:
+    """
+    Reads the ids already analyzed successfully from an earlier (possibly interrupted) run.
+    A partially written last line, left by a crash mid-write, is cut off so appending can resume.
+    """
+    if not os.path.exists(output_path):
+        return set()
+    with open(output_path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    done = set()
+    for line in data.splitlines():
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict) and record.get("ok"):
+            done.add(record["id"])
+    return done
+
+
+def analyze_item(item: BatchItem, analyze=analyze_with_llama3) -> dict:
+    """Transcribes (if needed) and analyzes one call, returning its result record."""
+    started = time.perf_counter()
+    record = {"id": item.id, "ok": False}
+    try:
+        with TRACER.session(item.id), TRACER.span("batch.call"):
+            _analyze_into(record, item, analyze)
+    except Exception as e:
+        # One bad call must not stop the whole run; it is recorded and retried on the next one.
+        record["error"] = f"{type(e).__name__}: {e}"
+    record["latency_ms"] = round((time.perf_counter() - started) * 1000, 1)
+    return record
+
+
+def _analyze_into(record: dict, item: BatchItem, analyze):
+    text = item.text
+    if not text and item.audio:
+        from speech_to_text.stt_transcriber import transcribe_audio  # Audio stack is only needed for recordings.
+
+        text = transcribe_audio(item.audio)
+        record["transcript"] = text
+    if not text:
+        record["error"] = "Transcription failed or no speech detected." if item.audio else "Empty input."
+    else:
+        reply = analyze(text)
+        record["reply"] = reply
+        record["ok"] = not analysis_failed(reply)
+
+
+def run_batch(input_path: str,
+              output_path: str = BATCH_OUTPUT_PATH,
+              concurrency: int = BATCH_CONCURRENCY,
+              analyze=analyze_with_llama3) -> dict:
+    """
+    Analyzes an archive of calls with bounded concurrency and no speech output.
+
+    Results are appended to `output_path` as JSON lines as soon as each call finishes, and that
+    file is the checkpoint: running again with the same output skips calls that already
+    succeeded and retries the ones that failed (a retried call gets a new line; the last
+    line for an id is its current result). On Ctrl+C, queued calls are cancelled and the
+    calls that already finished are written before KeyboardInterrupt propagates.
+    Returns:
+        dict: Summary counts, elapsed time, throughput and latency percentiles.
+    """
+    done = load_checkpoint(output_path)
+    if done:
+        print(f"Resuming: {len(done)} calls in {output_path} are already analyzed.")
+    os.makedirs(os.path.dirname(output_path) or ".", exist_ok=True)
+
+    started = time.perf_counter()
+    latencies = []
+    counts = {"succeeded": 0, "failed": 0, "skipped": 0}
+
+    def write(future, out):
+        record = future.result()
+        out.write(json.dumps(record, ensure_ascii=False) + "\n")
+        out.flush()
+        latencies.append(record["latency_ms"])
+        counts["succeeded" if record["ok"] else "failed"] += 1
+        processed = counts["succeeded"] + counts["failed"]
+        if processed % BATCH_PROGRESS_EVERY == 0:
+            os.fsync(out.fileno())
+            elapsed = time.perf_counter() - started
+            print(f"[batch] {processed} calls analyzed ({counts['failed']} failed), {processed / elapsed:.2f} calls/s.")
+
+    pool = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="batch")
+    # Futures submitted but not yet written; each one leaves the set right after its line is written.
+    pending = set()
+    with open(output_path, "a", encoding="utf-8") as out:
+        try:
+            for item in iter_batch_items(input_path):
+                if item.id in done:
+                    counts["skipped"] += 1
+                    continue
+                # Keep only a small window of work in flight so huge archives are streamed, not loaded.
+                if len(pending) >= 2 * concurrency:
+                    finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in finished:
+                        write(future, out)
+                        pending.discard(future)
+                pending.add(pool.submit(analyze_item, item, analyze))
+            for future in as_completed(pending):
+                write(future, out)
+                pending.discard(future)
+        except KeyboardInterrupt:
+            # Queued calls are dropped instead of waited for (their results would never be written),
+            # but every call that already finished is checkpointed so the next run skips it.
+            pool.shutdown(wait=False, cancel_futures=True)
+            finished = [future for future in pending if future.done() and not future.cancelled()]
+            for future in finished:
+                write(future, out)
+            print(f"[batch] Interrupted: wrote {len(finished)} finished calls, "
+                  f"dropped {len(pending) - len(finished)} queued or running ones.")
+            raise
+        finally:
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    elapsed = time.perf_counter() - started
+    processed = counts["succeeded"] + counts["failed"]
+    summary = {
+        **counts,
+        "elapsed_seconds": round(elapsed, 2),
+        "calls_per_second": round(processed / elapsed, 2) if elapsed else None,
+        "latency_ms": {f"p{p}": round(float(np.percentile(latencies, p)), 1) for p in (50, 95, 99)} if latencies else {},
+    }
+    print(f"[batch] Finished: {processed} calls analyzed in {elapsed:.1f} s "
+          f"({summary['calls_per_second']} calls/s), {counts['failed']} failed, {counts['skipped']} already done. "
+          f"Results in {output_path}.")
+    if TRACER.enabled:
+        TRACER.print_summary()
+    return summary
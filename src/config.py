@@ -7,10 +7,34 @@ load_dotenv() # This line should be at the very top of config.py
 # --- Audio Recording Configuration ---
 RECORD_DURATION_SECONDS = 10  # How long to record customer's voice
 SAMPLE_RATE = 16000           # Standard sample rate for speech
-AUDIO_FILE_NAME = "customer_recording.wav" # Temporary file to store recording
+AUDIO_DEBUG_DIR = os.getenv("AUDIO_DEBUG_DIR") # Set to a directory to keep a WAV copy of every recording (debug only)
+PIPELINE_QUEUE_SIZE = 2       # Utterances buffered between pipeline stages before upstream stages wait
+
+# --- Voice Activity Detection Configuration ---
+VAD_ENABLED = True            # Stream from the microphone and cut utterances at pauses instead of fixed-length recordings
+VAD_FRAME_MS = 30             # Analysis frame length; also the microphone callback block size
+VAD_ENERGY_THRESHOLD_DB = -45 # Minimum frame energy (dBFS) to count as speech
+VAD_NOISE_MARGIN_DB = 10      # Speech must also be this far above the tracked background noise floor
+VAD_MAX_ZERO_CROSSING_RATE = 0.35 # Quieter frames crossing zero more often than this are treated as hiss, not voice
+VAD_SPEECH_START_MS = 90      # Consecutive speech needed to start an utterance
+VAD_END_SILENCE_MS = 800      # Silence that ends an utterance
+VAD_PRE_ROLL_MS = 300         # Audio kept from before the detected start so word onsets aren't clipped
+VAD_MIN_UTTERANCE_MS = 250    # Shorter bursts (coughs, clicks) are dropped
+VAD_MAX_UTTERANCE_SECONDS = 30 # Utterances are cut at this length even if the customer keeps talking
+VAD_RING_BUFFER_SECONDS = 10  # Capture buffered between the audio callback and the detector
+VAD_MUTE_WHILE_SPEAKING = True # Ignore the microphone while a reply plays so speaker output isn't heard as the customer (disable with a headset to talk over replies)
 
 # --- Speech-to-Text Configuration ---
+STT_BACKEND = os.getenv("STT_BACKEND", "google") # 'google' (Google Web Speech API, needs network) or 'whisper' (local, offline)
 WHISPER_MODEL = "base"        # 'tiny', 'base', 'small', 'medium', 'large'. 'base' is a good balance.
+STT_LANGUAGE = "en"           # Language hint for the local model
+STT_BATCH_SIZE = 4            # Queued utterances decoded together by the local backend (also how many recordings may wait for transcription)
+
+# --- Text-to-Speech Configuration ---
+TTS_SYNTHESIZE_TO_BUFFER = False # Render replies to audio buffers (cached and replayed) instead of speaking them directly; not every pyttsx3 driver can render to a file
+TTS_CACHE_MAX_ENTRIES = 64    # Synthesized phrases kept for instant replay (LRU eviction beyond this)
+TTS_AUDIO_SINK = os.getenv("TTS_AUDIO_SINK", "device") # 'device' (speakers), 'null' (discard) or 'file' (write WAVs, for headless runs)
+TTS_OUTPUT_DIR = os.path.join("data", "tts_output") # Where the 'file' sink writes replies
 
 # --- Together AI (Llama 3) Configuration ---
 # Get your Together AI API key from environment variable or replace with your actual key
@@ -22,14 +46,68 @@ if not TOGETHER_API_KEY:
     # Fallback for demonstration, but strongy recommend using environment variable
     TOGETHER_API_KEY = "YOUR_TOGETHER_API_KEY_HERE" # <<< IMPORTANT: Replace with your actual key if not using env var
 
-TOGETHER_API_URL = "https://api.together.ai/v1/chat/completions"
+TOGETHER_API_URL = os.getenv("TOGETHER_API_URL", "https://api.together.ai/v1/chat/completions") # Override to use a local stand-in server
 # Use "meta-llama/Llama-3-8b-chat-hf" or "meta-llama/Llama-3-70b-chat-hf"
 LLAMA_MODEL = "meta-llama/Llama-3-8b-chat-hf" 
 LLM_MAX_TOKENS = 500
 LLM_TEMPERATURE = 0.7
 LLM_MAX_TOOL_CALL_TURNS = 3 # Max turns for tool calls to prevent infinite loops
+LLM_STREAM_RESPONSES = True # Stream responses and start speaking each sentence as soon as it is generated
+LLM_CONTEXT_BUDGET_TOKENS = 3000    # Approximate prompt size allowed per request; older tool output is dropped beyond it
+LLM_HISTORY_BUDGET_TOKENS = 1500    # Conversation history beyond this is folded into truncated excerpts
+LLM_TOOL_OUTPUT_MAX_TOKENS = 400    # Longest tool output passed back to the model
+LLM_SELECT_RELEVANT_TOOLS = False   # Only send tool schemas whose keywords the request mentions (may hide the tool for unusual phrasings)
+LLM_CONNECT_TIMEOUT_SECONDS = 5     # Time allowed to establish a connection to the API
+LLM_READ_TIMEOUT_SECONDS = 60       # Time allowed between bytes of the API response
+LLM_MAX_RETRIES = 3                 # Retries for 429/5xx responses and connection failures
+LLM_RETRY_BACKOFF_SECONDS = 0.5     # Base delay for jittered exponential backoff between retries
+LLM_RETRY_MAX_BACKOFF_SECONDS = 8   # Upper bound for a single backoff delay
+LLM_HTTP_POOL_SIZE = 10             # Keep-alive connections kept open to the API
+
+# --- Tool Execution Configuration ---
+TOOL_MAX_PARALLEL_CALLS = 8         # Tool calls from one LLM turn (and across sessions) run concurrently up to this many
+TOOL_CALL_TIMEOUT_SECONDS = 10      # Default time a tool may take, once started, before the LLM is told it timed out
+TOOL_QUEUE_TIMEOUT_SECONDS = 30     # Time a tool call may wait for a free worker before it is reported as failed
+
+# --- Tracing Configuration ---
+TRACE_ENABLED = os.getenv("TRACE_ENABLED", "").lower() in ("1", "true", "yes") # Record per-stage latency spans
+TRACE_EXPORT_PATH = os.getenv("TRACE_EXPORT_PATH", os.path.join("data", "traces.jsonl")) # JSON lines span export; set empty to keep spans in memory only
+
+# --- Server Mode Configuration ---
+SERVER_HOST = "127.0.0.1"           # Interface the session API listens on
+SERVER_PORT = 8080                  # Port the session API listens on
+SERVER_MAX_CONCURRENT_REQUESTS = 8  # Customer turns analyzed at the same time (keep <= LLM_HTTP_POOL_SIZE)
+SERVER_MAX_SESSIONS = 1000          # Open sessions allowed at once
+SERVER_SESSION_IDLE_SECONDS = 1800  # Sessions idle for longer than this are dropped
+SERVER_QUEUE_TIMEOUT_SECONDS = 30   # How long a turn may wait for a free slot before getting a 503
+SERVER_MAX_CONCURRENT_TRANSCRIPTIONS = 2 # Uploaded audio turns transcribed at the same time (each keeps a CPU core busy)
+SERVER_MAX_BODY_BYTES = 10 * 1024 * 1024 # Largest request body accepted, about 5 minutes of 16 kHz mono WAV
+
+# --- Batch Mode Configuration ---
+BATCH_CONCURRENCY = 8               # Archived calls analyzed at the same time (keep <= LLM_HTTP_POOL_SIZE)
+BATCH_OUTPUT_PATH = os.path.join("data", "batch_results.jsonl") # Results (and resume checkpoint) of batch runs
+BATCH_PROGRESS_EVERY = 50           # Print throughput after this many calls
+
+# --- Benchmark Configuration ---
+BENCHMARK_DIR = os.path.join("data", "benchmarks") # Synthetic catalogs, fixture WAVs and results of benchmark runs
+BENCHMARK_CATALOG_ROWS = (1000, 100000, 1000000) # Synthetic catalog sizes searched by the benchmark suite
+BENCHMARK_SEED = 7                  # Seed for synthetic catalogs, fixture audio and simulated API latency
+BENCHMARK_REGRESSION_TOLERANCE = 0.2 # p95 latency growth (or throughput drop) against a baseline that counts as a regression
+
+# --- Tool Result Cache Configuration ---
+TOOL_CACHE_MAX_ENTRIES = 512   # Distinct tool calls kept in memory (LRU eviction beyond this)
+TOOL_CACHE_TTL_SECONDS = 600   # Cached tool results expire after this many seconds
+
+# --- Response Cache Configuration ---
+RESPONSE_CACHE_ENABLED = True        # Answer near-duplicate questions from earlier answers without calling the LLM
+RESPONSE_CACHE_MAX_ENTRIES = 256     # Answers kept in memory (least recently used evicted beyond this)
+RESPONSE_CACHE_TTL_SECONDS = 3600    # Cached answers expire after this many seconds
+RESPONSE_CACHE_SIMILARITY_THRESHOLD = 0.85 # Minimum cosine similarity between questions for a cache hit
 
 # --- Data Search Configuration ---
-DATA_DIR = "data"
+DATA_DIR = "data"             # Generated artifacts (normalized catalog, etc.)
+DATASET_DIR = "dataset"       # Raw datasets shipped with the repository
 MOBILES_CSV_FILE = "mobiles.csv"
-MOBILES_CSV_PATH = os.path.join(DATA_DIR, MOBILES_CSV_FILE)
+MOBILES_CSV_PATH = os.path.join(DATASET_DIR, MOBILES_CSV_FILE)
+MOBILES_CATALOG_FILE = "mobiles_catalog.bin" # Compiled columnar catalog built from MOBILES_CSV_PATH
+MOBILES_CATALOG_PATH = os.path.join(DATA_DIR, MOBILES_CATALOG_FILE)
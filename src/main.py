@@ -1,17 +1,59 @@
 import os
 import argparse
-from src.config import AUDIO_FILE_NAME, DATA_DIR
-from speech_to_text.audio_recorder import record_audio
-from speech_to_text.stt_transcriber import transcribe_audio
-from prompts.llm_analyzer import analyze_with_llama3
-from text_to_speech.tts_speaker import text_to_speech_and_play
+import uuid
+import asyncio
+from src.config import DATA_DIR, LLM_STREAM_RESPONSES, SERVER_HOST, SERVER_PORT, BATCH_OUTPUT_PATH, BATCH_CONCURRENCY
+from src.pipeline import AgentPipeline
+from src.server import serve
+from src.batch import run_batch
+from prompts.llm_analyzer import analyze_with_llama3, analysis_failed
+from search.catalog import get_catalog
+from speech_to_text.stt_transcriber import get_transcriber
+from text_to_speech.tts_speaker import text_to_speech_and_play, SpeechQueue
+from src.tracing import TRACER
 
-def run_automation(mode: str, voice_option: str):
+def respond(text: str, voice_option: str, speech: SpeechQueue = None) -> bool:
+    """
+    Analyzes customer input and speaks the reply.
+    With a speech queue the reply is streamed, and each sentence starts playing while the rest
+    is still being generated; otherwise the complete reply is spoken once it is available.
+    Returns:
+        bool: False if the analysis failed and nothing (further) should be spoken.
+    """
+    queued = []
+
+    def queue_sentence(sentence: str):
+        queued.append(sentence)
+        speech.put(sentence)
+
+    with TRACER.span("analyze"):
+        llama_analysis = analyze_with_llama3(text, on_sentence=queue_sentence if speech else None)
+    if analysis_failed(llama_analysis):
+        print(f"Llama 3 analysis failed: {llama_analysis}.")
+        return False
+
+    if speech:
+        # Replies that were not generated by the model (e.g. API errors) are never streamed.
+        if not queued:
+            speech.put(llama_analysis)
+        speech.wait()
+    else:
+        text_to_speech_and_play(llama_analysis, voice_option)
+    return True
+
+def run_automation(mode: str, voice_option: str, host: str = SERVER_HOST, port: int = SERVER_PORT,
+                   batch_input: str = None, batch_output: str = BATCH_OUTPUT_PATH, concurrency: int = BATCH_CONCURRENCY):
     """
     Main function to run the AI automation workflow.
     Args:
-        mode (str): Determines the input method. 'record' for audio recording, 'query' for text input.
+        mode (str): Determines the input method. 'record' for audio recording, 'query' for text input,
+                    'serve' to serve many concurrent sessions over HTTP, 'batch' to analyze an archive of calls.
         voice_option (str): Option for TTS voice. 'male', 'female', 'list', or 'default'.
+        host (str): Interface to listen on in 'serve' mode.
+        port (int): Port to listen on in 'serve' mode.
+        batch_input (str): Directory or JSONL file of calls to analyze in 'batch' mode.
+        batch_output (str): JSONL file receiving the results (and acting as the resume checkpoint) in 'batch' mode.
+        concurrency (int): Calls analyzed at the same time in 'batch' mode.
     """
     print("--- Starting AI Customer Feedback Agent ---")
 
@@ -25,33 +67,30 @@ def run_automation(mode: str, voice_option: str):
     os.makedirs(DATA_DIR, exist_ok=True)
     print(f"Ensured data directory '{DATA_DIR}' exists.")
 
+    # Load the mobiles catalog once up front so the first tool call doesn't pay for it.
+    try:
+        get_catalog().table()
+    except Exception as e:
+        print(f"Could not preload mobiles catalog: {e}")
+
     if mode == "record":
         print("\n--- Record Mode: Recording will start automatically. Press Ctrl+C to stop at any time. ---")
-        while True:
-            if not record_audio(AUDIO_FILE_NAME):
-                print("Audio recording failed. Please ensure your microphone is connected and working. Trying again...")
-                continue
-
-            transcribed_text = transcribe_audio(AUDIO_FILE_NAME)
-
-            if os.path.exists(AUDIO_FILE_NAME):
-                os.remove(AUDIO_FILE_NAME)
-                print(f"Cleaned up {AUDIO_FILE_NAME}")
-
-            if not transcribed_text:
-                print("Transcription failed or no speech detected. Please try recording again.")
-                continue
-            print(f"Transcribed Text: {transcribed_text}")
-
-            llama_analysis = analyze_with_llama3(transcribed_text)
-            if llama_analysis.startswith("Error:") or llama_analysis.startswith("No analysis"):
-                print(f"Llama 3 analysis failed: {llama_analysis}. Continuing with next recording.")
-                continue
-
-            text_to_speech_and_play(llama_analysis, voice_option)
+        # Load the speech-to-text model before listening so the first utterance isn't delayed by it.
+        try:
+            get_transcriber().load()
+        except Exception as e:
+            print(f"Could not preload the speech-to-text backend: {e}")
+        # Stages run concurrently: the next utterance is recorded while the previous one is analyzed and spoken.
+        pipeline = AgentPipeline(voice_option)
+        try:
+            asyncio.run(pipeline.run())
+        except KeyboardInterrupt:
+            print("\nStopping the agent...")
 
     elif mode == "query":
         print("\n--- Query Mode: Enter your feedback. Type 'exit' or 'quit' to end the session. ---")
+        speech = SpeechQueue(voice_option) if LLM_STREAM_RESPONSES else None
+        session_id = uuid.uuid4().hex
         while True:
             transcribed_text = input("Please enter your query: ")
             if not transcribed_text:
@@ -61,16 +100,27 @@ def run_automation(mode: str, voice_option: str):
                 print("Exiting query mode. Goodbye!")
                 break
 
-            llama_analysis = analyze_with_llama3(transcribed_text)
-            if llama_analysis.startswith("Error:") or llama_analysis.startswith("No analysis"):
-                print(f"Llama 3 analysis failed: {llama_analysis}. Continuing with next query.")
-                continue
-
-            text_to_speech_and_play(llama_analysis, voice_option)
+            with TRACER.session(session_id), TRACER.span("turn"):
+                answered = respond(transcribed_text, voice_option, speech)
+            if not answered:
+                print("Continuing with next query.")
+    elif mode == "serve":
+        serve(host, port)
+    elif mode == "batch":
+        if not batch_input or not os.path.exists(batch_input):
+            print(f"Batch input '{batch_input}' not found. Pass a directory or JSONL file with --input. Exiting.")
+            return
+        print(f"\n--- Batch Mode: Analyzing '{batch_input}' without speech output. ---")
+        try:
+            run_batch(batch_input, batch_output, concurrency)
+        except KeyboardInterrupt:
+            print(f"\nStopped. Run again with the same --output to resume from {batch_output}.")
     else:
-        print(f"Invalid mode: {mode}. Please use 'record' or 'query'. Exiting.")
+        print(f"Invalid mode: {mode}. Please use 'record', 'query', 'serve' or 'batch'. Exiting.")
         return
 
+    if TRACER.enabled and mode != "batch":
+        TRACER.print_summary()
     print("--- AI Customer Feedback Agent Finished ---")
 
 if __name__ == "__main__":
@@ -78,9 +128,9 @@ if __name__ == "__main__":
     parser.add_argument(
         "--mode",
         type=str,
-        choices=["record", "query"],
+        choices=["record", "query", "serve", "batch"],
         default="record",
-        help="Specify the input mode: 'record' for audio recording, 'query' for direct text input."
+        help="Specify the input mode: 'record' for audio recording, 'query' for direct text input, 'serve' for the multi-session HTTP API, 'batch' to analyze archived calls."
     )
     parser.add_argument(
         "--voice-option",
@@ -89,6 +139,11 @@ if __name__ == "__main__":
         default="default",
         help="Specify TTS voice: 'male', 'female', 'list' (to show available options and exit), or 'default'."
     )
+    parser.add_argument("--host", type=str, default=SERVER_HOST, help="Interface to listen on in 'serve' mode.")
+    parser.add_argument("--port", type=int, default=SERVER_PORT, help="Port to listen on in 'serve' mode.")
+    parser.add_argument("--input", type=str, help="Directory (.wav/.txt files) or JSONL file of calls for 'batch' mode.")
+    parser.add_argument("--output", type=str, default=BATCH_OUTPUT_PATH, help="JSONL results file for 'batch' mode; rerun with the same file to resume.")
+    parser.add_argument("--concurrency", type=int, default=BATCH_CONCURRENCY, help="Calls analyzed at once in 'batch' mode.")
     args = parser.parse_args()
 
-    run_automation(args.mode, args.voice_option)
+    run_automation(args.mode, args.voice_option, args.host, args.port, args.input, args.output, args.concurrency)
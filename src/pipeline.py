@@ -0,0 +1,191 @@
+import asyncio
+import threading
+import uuid
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from src.config import PIPELINE_QUEUE_SIZE, LLM_STREAM_RESPONSES, VAD_ENABLED, VAD_MUTE_WHILE_SPEAKING, STT_BATCH_SIZE
+from speech_to_text.audio_recorder import (record_audio, record_utterance, stop_recording, pause_recording,
+                                           resume_recording)
+from speech_to_text.stt_transcriber import transcribe_audio, transcribe_audio_batch
+from prompts.llm_analyzer import analyze_with_llama3, analysis_failed
+from text_to_speech.tts_speaker import text_to_speech_and_play
+from src.tracing import TRACER
+
+_END = object()  # Marks the end of the stream on every queue.
+_END_OF_REPLY = object()  # Follows the last sentence of each turn's reply on the replies queue.
+
+
+class AgentPipeline:
+    """
+    Runs record -> transcribe -> analyze -> speak as concurrent asyncio stages.
+
+    Stages are connected by bounded queues: while one utterance is being analyzed or spoken the
+    next one is already being recorded, and a slow downstream stage makes the upstream ones wait
+    once its queue is full (backpressure). The stage callables are blocking functions executed
+    in worker threads, so they can be swapped for stand-ins in benchmarks.
+
+    Capture is paused (`pause_recording`/`resume_recording`) from the first sentence of a reply
+    until the reply's last one has been spoken, so the microphone doesn't pick up the agent's
+    own voice from the speakers and isn't toggled between the sentences of a streamed reply.
+    """
+
+    def __init__(self,
+                 voice_option: str = None,
+                 record=record_utterance if VAD_ENABLED else record_audio,
+                 transcribe=transcribe_audio,
+                 analyze=analyze_with_llama3,
+                 speak=text_to_speech_and_play,
+                 queue_size: int = PIPELINE_QUEUE_SIZE,
+                 stream_responses: bool = LLM_STREAM_RESPONSES,
+                 max_utterances: int = None,
+                 stop_recording=stop_recording,
+                 pause_recording=pause_recording if VAD_MUTE_WHILE_SPEAKING else None,
+                 resume_recording=resume_recording if VAD_MUTE_WHILE_SPEAKING else None,
+                 transcribe_batch=None,
+                 batch_size: int = STT_BATCH_SIZE):
+        self.voice_option = voice_option
+        self.record = record
+        self.transcribe = transcribe
+        self.analyze = analyze
+        self.speak = speak
+        self.queue_size = queue_size
+        self.stream_responses = stream_responses
+        self.max_utterances = max_utterances
+        self.stop_recording = stop_recording
+        self.pause_recording = pause_recording
+        self.resume_recording = resume_recording
+        if transcribe_batch is None and transcribe is transcribe_audio:
+            transcribe_batch = transcribe_audio_batch
+        self.transcribe_batch = transcribe_batch
+        self.batch_size = batch_size
+        self.session_id = uuid.uuid4().hex  # Tags the latency spans of this run.
+        self.utterances_recorded = 0
+        self.replies_spoken = 0
+        self._stopping = threading.Event()
+
+    async def run(self):
+        """Runs until `max_utterances` have been handled, or forever until cancelled (Ctrl+C)."""
+        self._stopping.clear()
+        # Room for a full batch of recordings, so the transcriber can actually reach batch_size.
+        self._recordings = asyncio.Queue(max(self.queue_size, self.batch_size))
+        self._transcripts = asyncio.Queue(self.queue_size)
+        self._replies = asyncio.Queue(self.queue_size)
+        # Tasks copy the current context when created, so every stage's spans carry the session id.
+        with TRACER.session(self.session_id):
+            tasks = [
+                asyncio.create_task(self._record_stage(), name="record"),
+                asyncio.create_task(self._transcribe_stage(), name="transcribe"),
+                asyncio.create_task(self._analyze_stage(), name="analyze"),
+                asyncio.create_task(self._speak_stage(), name="speak"),
+            ]
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            # Worker threads check this flag, so none of them stays blocked on a queue nobody drains.
+            self._stopping.set()
+            # Release a record call still blocked waiting for speech before cancelling the stages.
+            if self.stop_recording is not None:
+                self.stop_recording()
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _record_stage(self):
+        while self.max_utterances is None or self.utterances_recorded < self.max_utterances:
+            # Recordings stay in memory; each clip owns its buffer, so stages can overlap freely.
+            with TRACER.span("record") as span:
+                clip = await asyncio.to_thread(self.record)
+                span.set(audio_seconds=round(clip.duration_seconds, 2) if clip is not None else None)
+            if clip is None:
+                print("Audio recording failed. Please ensure your microphone is connected and working. Trying again...")
+                continue
+            self.utterances_recorded += 1
+            await self._recordings.put(clip)
+        await self._recordings.put(_END)
+
+    async def _transcribe_stage(self):
+        finished = False
+        while not finished:
+            # Decode everything that queued up while the previous batch was being transcribed.
+            clips = [await self._recordings.get()]
+            while len(clips) < self.batch_size and not self._recordings.empty():
+                clips.append(self._recordings.get_nowait())
+            if clips[-1] is _END:
+                clips.pop()
+                finished = True
+            if not clips:
+                break
+            with TRACER.span("transcribe", clips=len(clips)):
+                if self.transcribe_batch is not None:
+                    texts = await asyncio.to_thread(self.transcribe_batch, clips)
+                else:
+                    texts = [await asyncio.to_thread(self.transcribe, clip) for clip in clips]
+            for transcribed_text in texts:
+                if not transcribed_text:
+                    print("Transcription failed or no speech detected.")
+                    continue
+                print(f"Transcribed Text: {transcribed_text}")
+                await self._transcripts.put(transcribed_text)
+        await self._transcripts.put(_END)
+
+    async def _analyze_stage(self):
+        loop = asyncio.get_running_loop()
+        while (text := await self._transcripts.get()) is not _END:
+            queued = []
+
+            def on_sentence(sentence: str):
+                # Called from the analysis thread; blocks it while the speak queue is full.
+                queued.append(sentence)
+                self._put_from_thread(self._replies, sentence, loop)
+
+            with TRACER.span("analyze"):
+                llama_analysis = await asyncio.to_thread(self.analyze, text, on_sentence if self.stream_responses else None)
+            if analysis_failed(llama_analysis):
+                print(f"Llama 3 analysis failed: {llama_analysis}. Continuing with next recording.")
+            elif not queued:
+                await self._replies.put(llama_analysis)
+            # Sent even after a failure: sentences streamed before it may have paused the microphone.
+            await self._replies.put(_END_OF_REPLY)
+        await self._replies.put(_END)
+
+    def _put_from_thread(self, queue: asyncio.Queue, item, loop: asyncio.AbstractEventLoop):
+        """Puts an item on a stage queue from a worker thread, giving up once the pipeline stops."""
+        if self._stopping.is_set() or loop.is_closed():
+            return
+        future = asyncio.run_coroutine_threadsafe(queue.put(item), loop)
+        while True:
+            try:
+                future.result(timeout=0.5)
+                return
+            except FutureTimeoutError:
+                if self._stopping.is_set():
+                    # The consuming stage is gone; drop the item rather than wait forever.
+                    future.cancel()
+                    return
+
+    async def _speak_stage(self):
+        muted = False
+        try:
+            while (text := await self._replies.get()) is not _END:
+                if text is _END_OF_REPLY:
+                    muted = self._set_muted(muted, False)
+                    continue
+                # Paused once per reply, so the microphone doesn't flap between streamed sentences.
+                muted = self._set_muted(muted, True)
+                with TRACER.span("speak", characters=len(text)):
+                    await asyncio.to_thread(self.speak, text, self.voice_option)
+                self.replies_spoken += 1
+        finally:
+            # Never leave the microphone paused when the pipeline stops mid-reply.
+            self._set_muted(muted, False)
+
+    def _set_muted(self, muted: bool, mute: bool) -> bool:
+        """Pauses or resumes capture if that changes the current state; returns the new state."""
+        if mute == muted:
+            return muted
+        if mute:
+            if self.pause_recording is None:
+                return False
+            self.pause_recording()
+        elif self.resume_recording is not None:
+            self.resume_recording()
+        return mute
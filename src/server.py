@@ -0,0 +1,300 @@
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from src.config import (SERVER_HOST, SERVER_PORT, SERVER_MAX_CONCURRENT_REQUESTS, SERVER_MAX_SESSIONS,
+                        SERVER_SESSION_IDLE_SECONDS, SERVER_QUEUE_TIMEOUT_SECONDS,
+                        SERVER_MAX_CONCURRENT_TRANSCRIPTIONS, SERVER_MAX_BODY_BYTES)
+from prompts.llm_analyzer import analyze_with_llama3, analysis_failed, TOOL_RESULT_CACHE, TOKEN_METER, RESPONSE_CACHE
+from speech_to_text.audio_frames import AudioClip
+from src.tracing import TRACER, LatencyHistogram
+
+_SESSION_PATH_RE = re.compile(r"^/sessions/([0-9a-f]{32})(/messages)?$")
+
+
+class Session:
+    """One caller's conversation: message history plus per-turn latency."""
+
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.history = []
+        self.latency = LatencyHistogram()
+        self.last_latency_ms = None
+        self.created_at = time.time()
+        self.last_active = time.monotonic()
+        # Turns of one conversation are answered in order; different sessions run concurrently.
+        self.lock = threading.Lock()
+
+    def stats(self) -> dict:
+        return {
+            "session_id": self.id,
+            "turns": self.latency.count,
+            "latency_ms": {"last": self.last_latency_ms, **_latency_summary(self.latency)},
+        }
+
+
+def _latency_summary(histogram: LatencyHistogram) -> dict:
+    """Percentiles of a latency histogram, or None for each before the first turn."""
+    if not histogram.count:
+        return {"p50": None, "p95": None, "p99": None, "max": None}
+    summary = histogram.summary()
+    return {"p50": summary["p50_ms"], "p95": summary["p95_ms"], "p99": summary["p99_ms"], "max": summary["max_ms"]}
+
+
+def transcribe_upload(audio_bytes: bytes) -> str | None:
+    """Transcribes an uploaded WAV file entirely in memory."""
+    from speech_to_text.stt_transcriber import transcribe_audio  # Audio stack is only needed for audio sessions.
+
+    try:
+        clip = AudioClip.from_wav_bytes(audio_bytes)
+    except Exception as e:
+        print(f"Could not decode uploaded audio: {e}")
+        return None
+    return transcribe_audio(clip)
+
+
+class AgentService:
+    """
+    Serves many concurrent conversations from one process.
+
+    Every session has its own history, while the mobiles catalog, the Together connection pool
+    and the tool result cache are the process-wide instances shared by all of them. At most
+    `max_concurrent` turns are analyzed and `max_transcriptions` audio uploads transcribed at
+    once; further requests wait up to `queue_timeout` seconds. Idle sessions are dropped on the
+    next request that looks sessions up.
+    """
+
+    def __init__(self,
+                 analyze=analyze_with_llama3,
+                 max_concurrent: int = SERVER_MAX_CONCURRENT_REQUESTS,
+                 max_sessions: int = SERVER_MAX_SESSIONS,
+                 idle_seconds: float = SERVER_SESSION_IDLE_SECONDS,
+                 queue_timeout: float = SERVER_QUEUE_TIMEOUT_SECONDS,
+                 transcribe=transcribe_upload,
+                 max_transcriptions: int = SERVER_MAX_CONCURRENT_TRANSCRIPTIONS,
+                 max_body_bytes: int = SERVER_MAX_BODY_BYTES):
+        self.analyze = analyze
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        self.queue_timeout = queue_timeout
+        self.max_body_bytes = max_body_bytes
+        self._transcribe = transcribe
+        self._slots = threading.BoundedSemaphore(max_concurrent)
+        self._transcription_slots = threading.BoundedSemaphore(max_transcriptions)
+        self._sessions = {}
+        self._lock = threading.Lock()
+        # Constant memory however long the server runs, and cheap to summarize on every /stats.
+        self._latency = LatencyHistogram()
+
+    def create_session(self) -> Session:
+        with self._lock:
+            self._expire_idle_sessions()
+            if len(self._sessions) >= self.max_sessions:
+                raise OverflowError("Too many active sessions.")
+            session = Session()
+            self._sessions[session.id] = session
+        print(f"[session {session.id}] opened ({len(self._sessions)} active).")
+        return session
+
+    def get_session(self, session_id: str) -> Session:
+        with self._lock:
+            self._expire_idle_sessions()
+            return self._sessions.get(session_id)
+
+    def close_session(self, session_id: str) -> Session:
+        with self._lock:
+            return self._sessions.pop(session_id, None)
+
+    def reply(self, session: Session, text: str) -> dict:
+        """
+        Answers one customer turn within a session.
+
+        The session's own lock is taken before a global analysis slot, so extra turns sent to a
+        busy session wait without holding slots that other sessions could use. The turn's span
+        starts before either is acquired, and the wait is traced as "turn.queue_wait".
+        Raises:
+            TimeoutError: If the session's previous turn or a free analysis slot takes longer
+                          than the queue timeout.
+        """
+        started = time.perf_counter()
+        session.last_active = time.monotonic()  # A turn waiting in the queue is not idle.
+        with TRACER.session(session.id), TRACER.span("turn"):
+            with TRACER.span("turn.queue_wait"):
+                self._acquire(session, started)
+            try:
+                try:
+                    analysis = self.analyze(text, history=session.history)
+                finally:
+                    self._slots.release()
+                latency_ms = round((time.perf_counter() - started) * 1000, 1)
+                session.last_active = time.monotonic()
+                session.last_latency_ms = latency_ms
+                session.latency.add(latency_ms)
+                turn = session.latency.count
+            finally:
+                session.lock.release()
+
+        with self._lock:
+            self._latency.add(latency_ms)
+        print(f"[session {session.id}] turn {turn} answered in {latency_ms} ms.")
+        return {"session_id": session.id, "reply": analysis, "ok": not analysis_failed(analysis), "latency_ms": latency_ms}
+
+    def transcribe(self, audio_bytes: bytes) -> str | None:
+        """
+        Transcribes an uploaded audio turn, at most `max_transcriptions` at a time.
+        Raises:
+            TimeoutError: If no transcription slot frees up within the queue timeout.
+        """
+        if not self._transcription_slots.acquire(timeout=self.queue_timeout):
+            raise TimeoutError("Server is busy transcribing other calls, please retry.")
+        try:
+            return self._transcribe(audio_bytes)
+        finally:
+            self._transcription_slots.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            self._expire_idle_sessions()
+            active = len(self._sessions)
+            turns = self._latency.count
+            latency = _latency_summary(self._latency)
+        return {
+            "active_sessions": active,
+            "turns": turns,
+            "latency_ms": latency,
+            "tool_cache": TOOL_RESULT_CACHE.stats(),
+            "response_cache": RESPONSE_CACHE.stats(),
+            "tokens": TOKEN_METER.stats(),
+            **({"stages": TRACER.summary()} if TRACER.enabled else {}),
+        }
+
+    def _acquire(self, session: Session, started: float):
+        """Takes the session's lock and then an analysis slot, within the queue timeout."""
+        if not session.lock.acquire(timeout=self.queue_timeout):
+            raise TimeoutError("An earlier turn of this session is still being answered, please retry.")
+        remaining = max(0.0, self.queue_timeout - (time.perf_counter() - started))
+        if not self._slots.acquire(timeout=remaining):
+            session.lock.release()
+            raise TimeoutError("Server is at capacity, please retry.")
+
+    def _expire_idle_sessions(self):
+        cutoff = time.monotonic() - self.idle_seconds
+        for session_id in [sid for sid, s in self._sessions.items() if s.last_active < cutoff]:
+            del self._sessions[session_id]
+            print(f"[session {session_id}] expired after {self.idle_seconds:g} s idle.")
+
+
+def make_handler(service: AgentService):
+    """Builds the HTTP request handler for the JSON API around `service`."""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            pass
+
+        def do_GET(self):
+            if self.path == "/stats":
+                return self._send(200, service.stats())
+            match = _SESSION_PATH_RE.match(self.path)
+            session = service.get_session(match.group(1)) if match and not match.group(2) else None
+            if session is None:
+                return self._send(404, {"error": "Not found."})
+            self._send(200, session.stats())
+
+        def do_POST(self):
+            # Opening a session needs no body; turns must declare theirs.
+            body = self._read_body(required=self.path != "/sessions")
+            if body is None:
+                return
+            if self.path == "/sessions":
+                try:
+                    return self._send(201, {"session_id": service.create_session().id})
+                except OverflowError as e:
+                    return self._send(503, {"error": str(e)})
+
+            match = _SESSION_PATH_RE.match(self.path)
+            session = service.get_session(match.group(1)) if match and match.group(2) else None
+            if session is None:
+                return self._send(404, {"error": "Unknown session."})
+
+            # Text turns are JSON {"text": "..."}; audio turns are a raw WAV body.
+            if self.headers.get("Content-Type", "").startswith("audio/"):
+                try:
+                    text = service.transcribe(body)
+                except TimeoutError as e:
+                    return self._send(503, {"error": str(e)})
+                if not text:
+                    return self._send(422, {"error": "Transcription failed or no speech detected."})
+            else:
+                try:
+                    payload = json.loads(body or b"{}")
+                except ValueError:
+                    payload = None
+                text = payload.get("text") if isinstance(payload, dict) else None
+                text = text.strip() if isinstance(text, str) else ""
+                if not text:
+                    return self._send(400, {"error": "Expected a JSON body with a non-empty 'text' field."})
+
+            try:
+                self._send(200, service.reply(session, text))
+            except TimeoutError as e:
+                self._send(503, {"error": str(e)})
+
+        def do_DELETE(self):
+            match = _SESSION_PATH_RE.match(self.path)
+            session = service.close_session(match.group(1)) if match and not match.group(2) else None
+            if session is None:
+                return self._send(404, {"error": "Unknown session."})
+            self._send(200, session.stats())
+
+        def _read_body(self, required: bool) -> bytes | None:
+            """Reads the request body, or answers 400/413 and returns None if its length is unusable."""
+            length = self.headers.get("Content-Length")
+            if length is None and not required:
+                return b""
+            if length is None or not (length.isascii() and length.isdigit()):
+                error = (400, {"error": "A numeric Content-Length header is required."})
+            elif int(length) > service.max_body_bytes:
+                error = (413, {"error": f"Request body is larger than {service.max_body_bytes} bytes."})
+            else:
+                return self.rfile.read(int(length))
+            # The unread body would be parsed as the next request, so this connection cannot be reused.
+            self.close_connection = True
+            self._send(*error)
+            return None
+
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+    return Handler
+
+
+def serve(host: str = SERVER_HOST, port: int = SERVER_PORT, service: AgentService = None):
+    """
+    Runs the multi-session HTTP API until interrupted.
+
+    Endpoints:
+        POST   /sessions                -> {"session_id"}
+        POST   /sessions/<id>/messages  JSON {"text": "..."} or an audio/wav body -> {"reply", "latency_ms", ...}
+        GET    /sessions/<id>           -> per-session latency stats
+        DELETE /sessions/<id>           -> closes the session
+        GET    /stats                   -> server-wide latency and tool cache stats
+    """
+    service = service or AgentService()
+    httpd = ThreadingHTTPServer((host, port), make_handler(service))
+    httpd.daemon_threads = True
+    print(f"Serving the AI Customer Feedback Agent on http://{host}:{port} (Ctrl+C to stop).")
+    try:
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\nStopping the server...")
+    finally:
+        httpd.server_close()
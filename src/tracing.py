@@ -0,0 +1,212 @@
+import contextvars
+import itertools
+import json
+import math
+import os
+import threading
+import time
+import uuid
+from src.config import TRACE_ENABLED, TRACE_EXPORT_PATH
+
+_current_span = contextvars.ContextVar("current_span", default=None)
+_current_session = contextvars.ContextVar("current_session", default=None)
+_span_ids = itertools.count(1)  # Cheaper than random ids; unique within a process.
+_RUN_ID = uuid.uuid4().hex[:8]  # Tells runs apart when several append to the same export file.
+
+
+class LatencyHistogram:
+    """
+    Fixed-size log-bucketed histogram of durations in milliseconds.
+
+    Buckets grow by 5%, so percentiles are accurate to within about 5% at constant memory,
+    however many spans are recorded.
+    """
+
+    MIN_MS = 0.01
+    GROWTH = 1.05
+    BUCKETS = 440  # Covers 0.01 ms up to about 5.5 hours; longer durations share the last bucket.
+
+    def __init__(self):
+        self.counts = [0] * self.BUCKETS
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, duration_ms: float):
+        index = 0 if duration_ms <= self.MIN_MS else int(math.log(duration_ms / self.MIN_MS, self.GROWTH)) + 1
+        self.counts[min(index, self.BUCKETS - 1)] += 1
+        self.count += 1
+        self.total_ms += duration_ms
+        self.max_ms = max(self.max_ms, duration_ms)
+
+    def percentile(self, p: float) -> float:
+        """Upper bound of the bucket holding the p-th percentile."""
+        rank = max(1, math.ceil(self.count * p / 100))
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank:
+                if index == self.BUCKETS - 1:
+                    return self.max_ms  # The last bucket also holds everything longer than its bound.
+                return min(self.MIN_MS * self.GROWTH ** index, self.max_ms)
+        return self.max_ms
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "mean_ms": round(self.total_ms / self.count, 3) if self.count else None,
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3),
+        }
+
+
+class Span:
+    """One timed stage. Use as a context manager; `set` adds attributes while it runs."""
+
+    __slots__ = ("tracer", "name", "attrs", "span_id", "parent_id", "session_id", "start", "started_at", "_token")
+
+    def __init__(self, tracer: "Tracer", name: str, attrs: dict):
+        self.tracer = tracer
+        self.name = name
+        self.attrs = attrs
+
+    def set(self, **attrs):
+        self.attrs.update(attrs)
+
+    def __enter__(self):
+        parent = _current_span.get()
+        self.span_id = f"{_RUN_ID}-{next(_span_ids):x}"
+        self.parent_id = parent.span_id if parent else None
+        self.session_id = _current_session.get()
+        self._token = _current_span.set(self)
+        self.started_at = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        duration_ms = (time.perf_counter() - self.start) * 1000
+        _current_span.reset(self._token)
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.tracer.finish(self, duration_ms)
+        return False
+
+
+class _NoopSpan:
+    """Returned when tracing is disabled, so instrumented code costs one attribute check."""
+
+    __slots__ = ()
+
+    def set(self, **attrs):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _SessionScope:
+    __slots__ = ("session_id", "_token")
+
+    def __init__(self, session_id):
+        self.session_id = session_id
+
+    def __enter__(self):
+        self._token = _current_session.set(self.session_id)
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        _current_session.reset(self._token)
+        return False
+
+
+class Tracer:
+    """
+    Records latency spans for the agent's stages.
+
+    Finished spans go to an in-process histogram per span name and, when `export_path` is set,
+    to a JSON lines file (one object per span, with its session id and parent span). Spans
+    opened in worker threads stay attached to their session as long as the thread was started
+    with the caller's context (asyncio.to_thread does this; see `run_in_context`).
+    """
+
+    def __init__(self, enabled: bool = TRACE_ENABLED, export_path: str = TRACE_EXPORT_PATH):
+        self.enabled = enabled
+        self.export_path = export_path
+        self._histograms = {}
+        self._lock = threading.Lock()
+        self._export_file = None
+
+    def span(self, name: str, **attrs):
+        """Times the enclosed block as a span called `name`."""
+        if not self.enabled:
+            return _NOOP_SPAN
+        return Span(self, name, attrs)
+
+    def session(self, session_id: str):
+        """Attaches every span opened in the enclosed block to `session_id`."""
+        return _SessionScope(session_id)
+
+    def finish(self, span: Span, duration_ms: float):
+        with self._lock:
+            histogram = self._histograms.get(span.name)
+            if histogram is None:
+                histogram = self._histograms[span.name] = LatencyHistogram()
+            histogram.add(duration_ms)
+            if self.export_path:
+                if self._export_file is None:
+                    os.makedirs(os.path.dirname(self.export_path) or ".", exist_ok=True)
+                    self._export_file = open(self.export_path, "a", encoding="utf-8", buffering=1)
+                self._export_file.write(json.dumps({
+                    "name": span.name,
+                    "session_id": span.session_id,
+                    "span_id": span.span_id,
+                    "parent_id": span.parent_id,
+                    "start": round(span.started_at, 6),
+                    "duration_ms": round(duration_ms, 3),
+                    **({"attrs": span.attrs} if span.attrs else {}),
+                }, default=str) + "\n")
+
+    def summary(self) -> dict:
+        """Latency percentiles per span name."""
+        with self._lock:
+            return {name: histogram.summary() for name, histogram in sorted(self._histograms.items())}
+
+    def print_summary(self):
+        summary = self.summary()
+        if not summary:
+            return
+        print("\n--- Stage latency (ms) ---")
+        print(f"  {'stage':<24}{'count':>7}{'p50':>11}{'p95':>11}{'p99':>11}{'max':>11}")
+        for name, stats in summary.items():
+            print(f"  {name:<24}{stats['count']:>7}{stats['p50_ms']:>11.1f}{stats['p95_ms']:>11.1f}"
+                  f"{stats['p99_ms']:>11.1f}{stats['max_ms']:>11.1f}")
+        if self.export_path:
+            print(f"Spans exported to {self.export_path}")
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+
+    def close(self):
+        with self._lock:
+            if self._export_file is not None:
+                self._export_file.close()
+                self._export_file = None
+
+
+def run_in_context(func):
+    """Wraps `func` to run in the caller's tracing context when handed to another thread."""
+    context = contextvars.copy_context()
+    return lambda *args, **kwargs: context.run(func, *args, **kwargs)
+
+
+# Process-wide tracer; disabled unless TRACE_ENABLED is set.
+TRACER = Tracer()
@@ -0,0 +1,64 @@
+import io
+import wave
+import numpy as np
+import pytest
+from speech_to_text.audio_frames import AudioClip, SAMPLE_WIDTH_BYTES
+
+
+def _wav_bytes(samples: np.ndarray, sample_rate: int, channels: int = 1, sample_width: int = SAMPLE_WIDTH_BYTES) -> bytes:
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as writer:
+        writer.setnchannels(channels)
+        writer.setsampwidth(sample_width)
+        writer.setframerate(sample_rate)
+        writer.writeframes(samples.tobytes())
+    return buffer.getvalue()
+
+
+def test_wav_file_round_trip(tmp_path):
+    samples = np.array([0, 1, -1, 32767, -32768, 1234], dtype=np.int16)
+    path = str(tmp_path / "clip.wav")
+
+    AudioClip(samples, 8000).write_wav(path)
+    clip = AudioClip.from_wav_file(path)
+
+    assert clip.sample_rate == 8000
+    assert clip.samples.dtype == np.int16
+    assert clip.samples.tolist() == samples.tolist()
+
+
+def test_wav_bytes_keep_the_first_channel_of_stereo():
+    stereo = np.array([[1, 100], [2, 200], [3, 300]], dtype=np.int16)
+
+    clip = AudioClip.from_wav_bytes(_wav_bytes(stereo, 16000, channels=2))
+
+    assert clip.samples.tolist() == [1, 2, 3]
+
+
+def test_only_16_bit_wavs_are_accepted():
+    with pytest.raises(ValueError):
+        AudioClip.from_wav_bytes(_wav_bytes(np.zeros(4, dtype=np.uint8), 16000, sample_width=1))
+
+
+def test_duration_in_seconds():
+    assert AudioClip(np.zeros(24000, dtype=np.int16), 16000).duration_seconds == 1.5
+    assert AudioClip(np.zeros(0, dtype=np.int16), 16000).duration_seconds == 0.0
+
+
+def test_device_buffers_are_converted_to_contiguous_int16():
+    recorded = np.array([[10, 0], [20, 0], [30, 0]], dtype=np.int32)  # (frames, channels), as sd.rec returns.
+
+    clip = AudioClip(recorded, 16000)
+
+    assert clip.samples.dtype == np.int16 and clip.samples.flags["C_CONTIGUOUS"]
+    assert clip.samples.tolist() == [10, 20, 30]
+
+
+def test_pcm_is_a_view_of_the_samples():
+    clip = AudioClip(np.array([1, -2], dtype=np.int16), 16000)
+
+    pcm = clip.pcm
+    clip.samples[0] = 3
+
+    assert bytes(pcm) == np.array([3, -2], dtype="<i2").tobytes()
+    assert len(pcm) == 2 * SAMPLE_WIDTH_BYTES
@@ -0,0 +1,58 @@
+import json
+import threading
+import time
+import pytest
+import src.batch as batch_module
+from src.batch import BatchItem, iter_batch_items, load_checkpoint, run_batch
+
+
+def test_non_object_lines_are_skipped(tmp_path, capsys):
+    calls = tmp_path / "calls.jsonl"
+    calls.write_text('{"id": "a", "text": "hello"}\n[1, 2]\n"just text"\nnot json\n{"text": "bye"}\n', encoding="utf-8")
+
+    items = list(iter_batch_items(str(calls)))
+
+    assert [(item.id, item.text) for item in items] == [("a", "hello"), ("5", "bye")]
+    assert "Skipping line 2" in capsys.readouterr().out
+
+
+def test_checkpoint_ignores_non_object_lines(tmp_path):
+    results = tmp_path / "results.jsonl"
+    results.write_text(json.dumps({"id": "a", "ok": True}) + "\n[]\n" + json.dumps({"id": "b", "ok": False}) + "\n",
+                       encoding="utf-8")
+
+    assert load_checkpoint(str(results)) == {"a"}
+
+
+def test_interrupt_cancels_queued_calls_and_writes_finished_ones(tmp_path, monkeypatch):
+    release = threading.Event()
+    started = []
+
+    def analyze(text):
+        started.append(text)
+        if text.startswith("block"):
+            release.wait(timeout=10)
+        return f"Reply to {text}"
+
+    def items(input_path):
+        # Two quick calls finish, three block every worker, one more waits in the queue...
+        for text in ("a", "b", "block1", "block2", "block3", "queued"):
+            yield BatchItem(text, text, None)
+        while len(started) < 5:
+            time.sleep(0.01)
+        time.sleep(0.05)
+        raise KeyboardInterrupt  # ...when Ctrl+C arrives.
+
+    monkeypatch.setattr(batch_module, "iter_batch_items", items)
+    output = tmp_path / "results.jsonl"
+    began = time.perf_counter()
+    try:
+        with pytest.raises(KeyboardInterrupt):
+            run_batch("calls", str(output), concurrency=3, analyze=analyze)
+        elapsed = time.perf_counter() - began
+    finally:
+        release.set()
+
+    assert elapsed < 5  # Did not wait for the blocked calls.
+    assert "queued" not in started
+    assert load_checkpoint(str(output)) == {"a", "b"}
@@ -0,0 +1,116 @@
+import os
+import threading
+from benchmarks.fixtures import synthetic_mobiles_frame
+from search.catalog import MobileCatalog
+
+
+def write_csv(path, rows, seed, mtime_ns):
+    # Replaced atomically, as a dataset update should be, with an explicit mtime so reloads
+    # never depend on the filesystem's timestamp resolution.
+    synthetic_mobiles_frame(rows, seed).to_csv(path + ".tmp", index=False)
+    os.utime(path + ".tmp", ns=(mtime_ns, mtime_ns))
+    os.replace(path + ".tmp", path)
+
+
+def make_catalog(tmp_path, rows=50):
+    csv_path = str(tmp_path / "mobiles.csv")
+    write_csv(csv_path, rows, seed=1, mtime_ns=1_000_000_000_000_000_000)
+    return MobileCatalog(csv_path, str(tmp_path / "mobiles_catalog.bin"))
+
+
+def assert_consistent(snapshot):
+    assert snapshot.text_index.table is snapshot.table
+    assert snapshot.numeric_index.table is snapshot.table
+    rows = snapshot.table.rows
+    assert snapshot.numeric_index.range("price").max() < rows
+    assert len(snapshot.text_index.prefix("brand", "")) == rows
+
+
+def test_snapshot_is_reused_while_csv_is_unchanged(tmp_path):
+    catalog = make_catalog(tmp_path)
+    assert catalog.version == 0
+    first = catalog.snapshot()
+    assert first.version == 1 and first.table.rows == 50
+    assert catalog.snapshot() is first
+
+
+def test_catalog_reloads_when_csv_mtime_changes(tmp_path):
+    catalog = make_catalog(tmp_path)
+    first = catalog.snapshot()
+    write_csv(catalog.csv_path, 80, seed=2, mtime_ns=1_000_000_001_000_000_000)
+
+    second = catalog.snapshot()
+    assert second.version == 2
+    assert second.table.rows == 80
+    assert second.numeric_index.count("price") == 80
+    assert catalog.snapshot() is second
+    assert first.table.rows == 50
+
+
+def test_mtime_change_alone_triggers_reload(tmp_path):
+    catalog = make_catalog(tmp_path)
+    catalog.snapshot()
+    os.utime(catalog.csv_path, ns=(1_000_000_002_000_000_000,) * 2)
+    assert catalog.snapshot().version == 2
+
+
+def test_csv_restored_with_older_mtime_rebuilds_artifact(tmp_path):
+    catalog = make_catalog(tmp_path)
+    catalog.snapshot()
+    write_csv(catalog.csv_path, 80, seed=2, mtime_ns=999_000_000_000_000_000)
+    assert catalog.snapshot().table.rows == 80
+
+
+def test_fresh_artifact_is_reused_by_a_new_process(tmp_path):
+    catalog = make_catalog(tmp_path)
+    catalog.snapshot()
+    built = os.stat(catalog.artifact_path).st_mtime_ns
+    restarted = MobileCatalog(catalog.csv_path, catalog.artifact_path)
+    assert restarted.snapshot().table.rows == 50
+    assert os.stat(catalog.artifact_path).st_mtime_ns == built
+
+
+def test_held_snapshot_stays_consistent_across_reload(tmp_path):
+    catalog = make_catalog(tmp_path)
+    old = catalog.snapshot()
+    old_titles = [old.table.value("title", row) for row in range(old.table.rows)]
+    write_csv(catalog.csv_path, 80, seed=2, mtime_ns=1_000_000_001_000_000_000)
+
+    new = catalog.snapshot()
+    assert new is not old
+    # The old mapping still reads the data it was loaded with, not the rebuilt artifact.
+    assert old.table.rows == 50
+    assert [old.table.value("title", row) for row in range(old.table.rows)] == old_titles
+    assert_consistent(old)
+    assert_consistent(new)
+
+
+def test_concurrent_readers_see_whole_snapshots_during_reloads(tmp_path):
+    catalog = make_catalog(tmp_path)
+    catalog.snapshot()
+    stop = threading.Event()
+    errors = []
+
+    def read():
+        try:
+            while not stop.is_set():
+                snapshot = catalog.snapshot()
+                assert snapshot.table.rows in (50, 80)
+                assert_consistent(snapshot)
+        except Exception as e:
+            errors.append(e)
+
+    readers = [threading.Thread(target=read) for _ in range(4)]
+    for reader in readers:
+        reader.start()
+    try:
+        for reload in range(1, 7):
+            rows = 80 if reload % 2 else 50
+            write_csv(catalog.csv_path, rows, seed=1 + reload % 2, mtime_ns=1_000_000_000_000_000_000 + reload * 10**9)
+            assert catalog.snapshot().table.rows == rows
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+    assert not errors
+    assert catalog.version == 7
@@ -0,0 +1,146 @@
+import json
+import math
+import struct
+import numpy as np
+import pandas as pd
+import pytest
+from search.columnar import MAGIC, NA_CODE, ColumnarTable, write_columnar
+from search.ingest import CATALOG_SCHEMA, build_catalog, load_catalog
+
+PRICES = [12999.0, np.nan, 0.5, -1.0]
+BRANDS = ["Samsung", None, "Samsung", "Nokia"]
+TITLES = ["Galaxy ₹ (Blue)", "", None, "3310"]
+
+
+@pytest.fixture
+def table_path(tmp_path):
+    path = str(tmp_path / "table.bin")
+    write_columnar(path, {"price": PRICES}, {"brand": BRANDS, "title": TITLES})
+    return path
+
+
+def header_of(path):
+    with open(path, "rb") as f:
+        data = f.read()
+    (length,) = struct.unpack_from("<I", data, len(MAGIC))
+    start = len(MAGIC) + 4
+    return data, start, json.loads(data[start:start + length])
+
+
+def rewrite_header(path, edit):
+    # Keeps the header length unchanged so only the edited field is wrong.
+    data, start, header = header_of(path)
+    edit(header)
+    encoded = json.dumps(header, separators=(",", ":")).encode("utf-8")
+    length = struct.unpack_from("<I", data, len(MAGIC))[0]
+    assert len(encoded) <= length
+    with open(path, "wb") as f:
+        f.write(data[:start] + encoded.ljust(length) + data[start + length:])
+
+
+def test_round_trip(table_path):
+    table = ColumnarTable(table_path)
+
+    assert table.rows == 4
+    assert table.column_names == ["price", "brand", "title"]
+    price = table.numeric("price")
+    assert price.dtype == np.float64
+    np.testing.assert_array_equal(price, PRICES)
+    assert math.isnan(table.value("price", 1))
+    assert [table.value("brand", row) for row in range(4)] == BRANDS
+    assert [table.value("title", row) for row in range(4)] == TITLES
+
+
+def test_string_columns_share_one_dictionary(table_path):
+    table = ColumnarTable(table_path)
+
+    brand_codes = table.codes("brand")
+    assert brand_codes.dtype == np.int32
+    assert brand_codes[0] == brand_codes[2] and brand_codes[1] == NA_CODE
+    assert table.codes("title")[2] == NA_CODE
+    assert sorted(table.strings.values()) == sorted({"Samsung", "Nokia", "Galaxy ₹ (Blue)", "", "3310"})
+    assert sorted(table.distinct_codes("brand")) == sorted({int(brand_codes[0]), int(brand_codes[3])})
+
+
+def test_columns_are_views_onto_the_mapping(table_path):
+    table = ColumnarTable(table_path)
+    assert not table.numeric("price").flags.owndata
+    assert not table.numeric("price").flags.writeable
+
+
+def test_column_kind_is_checked(table_path):
+    table = ColumnarTable(table_path)
+    with pytest.raises(KeyError):
+        table.numeric("brand")
+    with pytest.raises(KeyError):
+        table.codes("price")
+
+
+def test_empty_table(tmp_path):
+    path = str(tmp_path / "empty.bin")
+    write_columnar(path, {"price": []}, {"brand": []})
+    table = ColumnarTable(path)
+    assert table.rows == 0 and len(table.numeric("price")) == 0 and len(table.strings) == 0
+
+
+def test_mismatched_column_lengths_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_columnar(str(tmp_path / "bad.bin"), {"price": [1.0, 2.0]}, {"brand": ["A"]})
+
+
+def test_csv_to_catalog_round_trip(tmp_path):
+    csv_path = str(tmp_path / "mobiles.csv")
+    pd.DataFrame({
+        "Brand": ["SAMSUNG", "APPLE"],
+        "Title": ["SAMSUNG Galaxy A14 (Black, 64 GB)", "APPLE iPhone 13 (Pink, 128 GB)"],
+        "Price": [13999, np.nan],
+        "Rating": [4.2, 4.7],
+        "Internal Storage": ["64 GB", "128 GB"],
+    }).to_csv(csv_path, index=False)
+
+    frame = build_catalog(csv_path, str(tmp_path / "mobiles_catalog.bin"))
+    table = load_catalog(str(tmp_path / "mobiles_catalog.bin"))
+
+    assert sorted(table.column_names) == sorted(CATALOG_SCHEMA)
+    for name, dtype in CATALOG_SCHEMA.items():
+        if dtype == "string":
+            expected = [None if pd.isna(value) else value for value in frame[name]]
+            assert [table.value(name, row) for row in range(table.rows)] == expected
+        else:
+            np.testing.assert_array_equal(table.numeric(name), frame[name].to_numpy(dtype=np.float64))
+    assert math.isnan(table.value("price", 1)) and table.value("storage_gb", 1) == 128
+
+
+def test_bad_magic_is_rejected(table_path):
+    with open(table_path, "r+b") as f:
+        f.write(b"NOTACAT!")
+    with pytest.raises(ValueError, match="not a mobiles catalog"):
+        ColumnarTable(table_path)
+
+
+@pytest.mark.parametrize("edit", [
+    lambda header: header.pop("rows"),
+    lambda header: header.update(rows=10**6),
+    lambda header: header["columns"]["price"].update(offset=10**6),
+    lambda header: header["columns"]["price"].update(dtype="|O"),
+    lambda header: header["columns"]["brand"].update(kind="blob"),
+    lambda header: header["strings"].update(blob_length=10**6),
+    lambda header: header["strings"].update(count=10**6),
+])
+def test_inconsistent_header_is_rejected(table_path, edit):
+    rewrite_header(table_path, edit)
+    with pytest.raises(ValueError, match="corrupt catalog header"):
+        ColumnarTable(table_path)
+
+
+def test_garbled_or_truncated_header_is_rejected(table_path):
+    data, start, _ = header_of(table_path)
+    with open(table_path, "wb") as f:
+        f.write(data[:start] + b"{not json" + data[start + 9:])
+    with pytest.raises(ValueError, match="corrupt catalog header"):
+        ColumnarTable(table_path)
+
+    with open(table_path, "wb") as f:
+        f.write(data[:start + 4])
+    with pytest.raises(ValueError, match="corrupt catalog header"):
+        ColumnarTable(table_path)
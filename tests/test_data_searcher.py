@@ -0,0 +1,75 @@
+import re
+import pandas as pd
+import pytest
+from benchmarks.fixtures import make_synthetic_catalog
+from search import catalog as catalog_module
+from search.data_searcher import search_mobiles
+from search.ingest import normalize_mobiles
+
+QUERIES = [
+    {},
+    {"brand": "Samsung"},
+    {"brand": "apple", "max_price": 30000},
+    {"title": "Galaxy", "min_storage_gb": 128},
+    {"title": "Pro", "min_price": 10000, "max_price": 20000, "min_rating": 4.2},
+    {"min_storage_gb": 64, "max_storage_gb": 128},
+    {"min_rating": 4.8},
+    {"brand": "OnePlus", "title": "5G"},
+    {"max_price": 2500},
+    {"brand": "Sony"},
+]
+
+
+@pytest.fixture
+def synthetic_catalog(tmp_path, monkeypatch):
+    catalog = make_synthetic_catalog(2000, directory=str(tmp_path), seed=3)
+    monkeypatch.setattr(catalog_module, "_shared_catalog", catalog)
+    return catalog
+
+
+def test_numeric_string_bounds_match_numbers(synthetic_catalog):
+    assert (search_mobiles(min_price="8000", max_price="20000", min_rating="4")
+            == search_mobiles(min_price=8000, max_price=20000, min_rating=4))
+    assert (synthetic_catalog.snapshot().numeric_index.count("price", "8000", "20000")
+            == synthetic_catalog.snapshot().numeric_index.count("price", 8000, 20000))
+
+
+def test_non_numeric_bound_is_rejected(synthetic_catalog):
+    with pytest.raises(ValueError):
+        search_mobiles(max_price="cheap")
+
+
+def _reference_search(frame: pd.DataFrame, min_price=None, max_price=None, brand=None, title=None,
+                      min_storage_gb=None, max_storage_gb=None, min_rating=None) -> pd.DataFrame:
+    """The original pandas implementation of search_mobiles, over the normalized catalog."""
+    if min_price is not None:
+        frame = frame[frame['price'] >= min_price]
+    if max_price is not None:
+        frame = frame[frame['price'] <= max_price]
+    if brand:
+        frame = frame[frame['brand'].str.contains(brand, case=False, na=False)]
+    if title:
+        frame = frame[frame['title'].str.contains(title, case=False, na=False)]
+    if min_storage_gb is not None:
+        frame = frame[frame['storage_gb'] >= min_storage_gb]
+    if max_storage_gb is not None:
+        frame = frame[frame['storage_gb'] <= max_storage_gb]
+    if min_rating is not None:
+        frame = frame[frame['rating'] >= min_rating]
+    return frame
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_search_matches_pandas_reference(synthetic_catalog, query):
+    frame = normalize_mobiles(pd.read_csv(synthetic_catalog.csv_path))
+    expected = _reference_search(frame, **query)
+
+    summary = search_mobiles(**query)
+
+    if expected.empty:
+        assert summary.startswith("No mobile phones found")
+        return
+    assert int(re.match(r"Found (\d+) matching phones", summary).group(1)) == len(expected)
+    listed = [re.match(r"(.*) \([^()]*\): \$", line).group(1) for line in summary.splitlines()[1:6]
+              if not line.startswith("...")]
+    assert listed == expected['title'].head(5).tolist()
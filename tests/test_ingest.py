@@ -0,0 +1,67 @@
+import math
+import numpy as np
+import pandas as pd
+import pytest
+from search.ingest import (CATALOG_SCHEMA, normalize_mobiles, parse_battery_mah, parse_camera_mp, parse_number,
+                           parse_ram_gb, parse_storage_gb)
+
+
+def assert_parsed(value, expected):
+    if expected is None:
+        assert math.isnan(value)
+    else:
+        assert value == pytest.approx(expected)
+
+
+@pytest.mark.parametrize("cell, expected", [
+    ("128 GB", 128), ("128GB", 128), ("32 MB", 1 / 32), ("1 TB", 1024), ("32+3 GB", 35), ("0.5 gb", 0.5),
+    ("", None), ("NA", None), ("Expandable", None), ("128", None), (None, None), (np.nan, None), (128, None),
+])
+def test_parse_storage_gb(cell, expected):
+    assert_parsed(parse_storage_gb(cell), expected)
+
+
+@pytest.mark.parametrize("cell, expected", [
+    (12999, 12999), (4.5, 4.5), ("12999", 12999), ("₹12,999", 12999), ("Rs. 1,29,999", 129999),
+    ("4.5 out of 5", 4.5), ("", None), ("N/A", None), ("not rated", None), (None, None), (np.nan, None),
+])
+def test_parse_number(cell, expected):
+    assert_parsed(parse_number(cell), expected)
+
+
+@pytest.mark.parametrize("cell, expected", [
+    ("8 GB RAM", 8), ("Memory, Storage & SIM: 8 GB RAM (+ RAM expansion up to 5GB)", 8),
+    ("13GB RAM (8GB LPDDR4x RAM + Up to 5GB Extended RAM)", 8), ("32 MB RAM", 1 / 32),
+    ("1 GB Turbo RAM", None), ("Dual RAM Channel, RAM Frequency: 1800 MHz", None), ("", None), (None, None),
+])
+def test_parse_ram_gb(cell, expected):
+    assert_parsed(parse_ram_gb(cell), expected)
+
+
+def test_parse_battery_and_camera():
+    assert parse_battery_mah("5000 mAh") == 5000
+    assert math.isnan(parse_battery_mah("Non-removable"))
+    assert parse_camera_mp("50MP (OIS) + 8MP + 2MP") == 50
+    assert math.isnan(parse_camera_mp("Yes"))
+
+
+def test_normalize_mobiles_coerces_malformed_cells():
+    raw = pd.DataFrame({
+        "Title": ["Phone A (Blue, 64 GB)", "Phone B", "Phone C"],
+        "Brand": ["A", "B", None],
+        "Price": ["₹9,999", "call for price", None],
+        "Rating": ["4.2", "", "not rated"],
+        "Internal Storage": ["64 GB", "Expandable", None],
+        "Other Features": ["6 GB RAM 128 ROM", None, "2 GB Turbo RAM"],
+    })
+
+    df = normalize_mobiles(raw)
+
+    assert list(df.columns) == list(CATALOG_SCHEMA)
+    assert df.dtypes.astype(str).to_dict() == CATALOG_SCHEMA
+    assert df["price"].tolist()[0] == 9999 and df["price"].isna().tolist()[1:] == [True, True]
+    assert df["rating"].tolist()[0] == 4.2 and df["rating"].isna().tolist()[1:] == [True, True]
+    assert df["storage_gb"].tolist()[0] == 64 and df["storage_gb"].isna().tolist()[1:] == [True, True]
+    assert df["ram_gb"].tolist()[0] == 6 and df["ram_gb"].isna().tolist()[1:] == [True, True]
+    # Columns absent from the raw frame come out as all-missing rather than failing.
+    assert df["battery_mah"].isna().all() and df["model_name"].isna().all()
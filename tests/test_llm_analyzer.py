@@ -0,0 +1,164 @@
+import json
+import time
+from concurrent.futures import ThreadPoolExecutor
+import pytest
+import prompts.llm_analyzer as llm_analyzer
+from prompts.context_budget import CHARS_PER_TOKEN
+from src.config import LLM_TOOL_OUTPUT_MAX_TOKENS
+
+
+def _tool_call(name: str = "search_mobiles", arguments: dict = None) -> dict:
+    return {"id": "call_0", "type": "function",
+            "function": {"name": name, "arguments": json.dumps(arguments or {})}}
+
+
+def test_oversized_tool_output_is_truncated(monkeypatch):
+    huge = "\n".join(f"Phone {i} (Brand): $100, 64GB, Rating: 4" for i in range(2000))
+    monkeypatch.setitem(llm_analyzer.AVAILABLE_TOOLS, "search_mobiles", lambda **kwargs: huge)
+    llm_analyzer.TOOL_RESULT_CACHE.clear()
+
+    message = llm_analyzer.execute_tool_call(_tool_call(arguments={"brand": "Oversized"}))
+
+    assert message["role"] == "tool"
+    assert message["content"].startswith("Phone 0 (Brand)")
+    assert "[truncated" in message["content"]
+    assert len(message["content"]) < LLM_TOOL_OUTPUT_MAX_TOKENS * CHARS_PER_TOKEN + 100
+
+
+def test_small_tool_output_is_passed_through(monkeypatch):
+    monkeypatch.setitem(llm_analyzer.AVAILABLE_TOOLS, "search_mobiles", lambda **kwargs: "Found 1 matching phone.")
+    llm_analyzer.TOOL_RESULT_CACHE.clear()
+
+    message = llm_analyzer.execute_tool_call(_tool_call(arguments={"brand": "Small"}))
+
+    assert message["content"] == "Found 1 matching phone."
+
+
+def _capture_requests(monkeypatch) -> list:
+    """Answers every non-streamed API call with a plain reply, recording what was sent."""
+    requests_sent = []
+
+    def fake_call(messages, tools=None):
+        requests_sent.append({"messages": [dict(m) for m in messages], "tools": tools})
+        return {"choices": [{"message": {"role": "assistant", "content": "Happy to help."}}]}
+
+    monkeypatch.setattr(llm_analyzer, "call_together_api", fake_call)
+    monkeypatch.setattr(llm_analyzer, "RESPONSE_CACHE_ENABLED", False)
+    return requests_sent
+
+
+def test_search_tool_is_sent_for_questions_without_keywords(monkeypatch):
+    requests_sent = _capture_requests(monkeypatch)
+
+    llm_analyzer.analyze_with_llama3("any Sony Xperia?")
+
+    assert [tool["function"]["name"] for tool in requests_sent[0]["tools"]] == ["search_mobiles"]
+
+
+def test_history_excerpts_are_folded_into_the_system_prompt(monkeypatch):
+    requests_sent = _capture_requests(monkeypatch)
+    monkeypatch.setattr(llm_analyzer, "LLM_HISTORY_BUDGET_TOKENS", 200)
+    history = []
+    for turn in range(8):
+        history.append({"role": "user", "content": f"Question {turn} " + "about phones " * 20})
+        history.append({"role": "assistant", "content": f"Answer {turn} " + "with details " * 20})
+
+    llm_analyzer.analyze_with_llama3("And the cheapest one?", history=history)
+
+    messages = requests_sent[0]["messages"]
+    assert [m["role"] for m in messages].count("system") == 1
+    assert messages[0]["content"].startswith(llm_analyzer.SYSTEM_PROMPT)
+    assert "Truncated excerpts of the earlier conversation:" in messages[0]["content"]
+    assert messages[-1]["content"] == 'Customer feedback: "And the cheapest one?"'
+
+
+@pytest.mark.parametrize("reply", [
+    "Error contacting Together API: 503 Server Error",
+    "Configuration Error: TOGETHER_API_KEY is not set.",
+    "An unexpected error occurred during analysis.",
+    "Maximum tool call turns reached without a final answer. Please try again.",
+    "No analysis or valid response could be generated.",
+])
+def test_every_failure_reply_counts_as_failed(reply):
+    assert llm_analyzer.analysis_failed(reply)
+
+
+def test_an_answer_is_not_a_failure():
+    assert not llm_analyzer.analysis_failed("Errors like that are covered by the warranty.")
+
+
+def test_tool_timeout_does_not_count_time_queued_for_a_worker(monkeypatch):
+    def slow_tool(**kwargs):
+        time.sleep(0.3)
+        return "done"
+
+    executor = ThreadPoolExecutor(max_workers=1)
+    monkeypatch.setattr(llm_analyzer, "_TOOL_EXECUTOR", executor)
+    monkeypatch.setitem(llm_analyzer.AVAILABLE_TOOLS, "slow_tool", slow_tool)
+    monkeypatch.setitem(llm_analyzer.TOOL_TIMEOUTS, "slow_tool", 0.5)
+    llm_analyzer.TOOL_RESULT_CACHE.clear()
+
+    calls = [_tool_call("slow_tool", {"n": n}) for n in range(2)]
+    results = llm_analyzer.execute_tool_calls(calls)
+    executor.shutdown()
+
+    assert [result["content"] for result in results] == ["done", "done"]
+
+
+@pytest.fixture
+def tools(monkeypatch):
+    """Registers stand-in tools on a private worker pool."""
+    executor = ThreadPoolExecutor(max_workers=4)
+    monkeypatch.setattr(llm_analyzer, "_TOOL_EXECUTOR", executor)
+    llm_analyzer.TOOL_RESULT_CACHE.clear()
+
+    def register(name: str, func, timeout: float = None):
+        monkeypatch.setitem(llm_analyzer.AVAILABLE_TOOLS, name, func)
+        if timeout is not None:
+            monkeypatch.setitem(llm_analyzer.TOOL_TIMEOUTS, name, timeout)
+
+    yield register
+    executor.shutdown(wait=True)
+
+
+def _numbered_calls(names: list) -> list:
+    return [{**_tool_call(name, {"n": n}), "id": f"call_{n}"} for n, name in enumerate(names)]
+
+
+def test_results_follow_the_requested_order(tools):
+    def sleepy(n):
+        time.sleep(0.2 - 0.05 * n)  # Later calls finish first.
+        return f"result {n}"
+
+    tools("sleepy", sleepy)
+
+    results = llm_analyzer.execute_tool_calls(_numbered_calls(["sleepy"] * 4))
+
+    assert [r["tool_call_id"] for r in results] == ["call_0", "call_1", "call_2", "call_3"]
+    assert [r["content"] for r in results] == ["result 0", "result 1", "result 2", "result 3"]
+
+
+def test_a_failing_tool_does_not_lose_the_other_results(tools):
+    def broken(n):
+        raise RuntimeError("catalog unavailable")
+
+    tools("ok", lambda n: f"ok {n}")
+    tools("broken", broken)
+
+    results = llm_analyzer.execute_tool_calls(_numbered_calls(["ok", "broken", "ok"]))
+
+    assert results[0]["content"] == "ok 0" and results[2]["content"] == "ok 2"
+    assert results[1]["tool_call_id"] == "call_1"
+    assert "catalog unavailable" in results[1]["content"]
+
+
+def test_per_tool_timeout_is_reported_to_the_model(tools):
+    tools("stuck", lambda n: time.sleep(0.5) or "too late", timeout=0.1)
+    tools("ok", lambda n: f"ok {n}")
+
+    started = time.monotonic()
+    results = llm_analyzer.execute_tool_calls(_numbered_calls(["stuck", "ok"]))
+
+    assert time.monotonic() - started < 0.4
+    assert results[0]["content"] == "Error: Tool 'stuck' timed out after 0.1 seconds."
+    assert results[1]["content"] == "ok 1"
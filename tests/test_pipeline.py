@@ -0,0 +1,184 @@
+import asyncio
+import contextlib
+import threading
+import time
+import numpy as np
+import pytest
+
+pytest.importorskip("sounddevice")
+pytest.importorskip("pyttsx3")
+
+from src.pipeline import AgentPipeline
+from speech_to_text.audio_frames import AudioClip
+from src.config import STT_BATCH_SIZE
+
+
+def _clip() -> AudioClip:
+    return AudioClip(np.zeros(1600, dtype=np.int16), 16000)
+
+
+def _run_in_thread(coroutine_factory) -> threading.Thread:
+    thread = threading.Thread(target=lambda: asyncio.run(coroutine_factory()), daemon=True)
+    thread.start()
+    return thread
+
+
+def test_pipeline_handles_every_utterance():
+    spoken = []
+    pipeline = AgentPipeline(None,
+                             record=_clip,
+                             transcribe=lambda clip: "hello",
+                             analyze=lambda text, on_sentence=None: "Hi there.",
+                             speak=lambda text, voice_option: spoken.append(text),
+                             stream_responses=False,
+                             max_utterances=3,
+                             stop_recording=None)
+
+    asyncio.run(pipeline.run())
+
+    assert spoken == ["Hi there."] * 3
+
+
+def test_cancelled_pipeline_does_not_hang_on_a_full_reply_queue():
+    def analyze(text, on_sentence=None):
+        time.sleep(0.6)  # Still waiting for the model when the pipeline is cancelled.
+        for i in range(50):
+            on_sentence(f"Sentence {i}.")
+        return "done"
+
+    pipeline = AgentPipeline(None,
+                             record=_clip,
+                             transcribe=lambda clip: "hello",
+                             analyze=analyze,
+                             speak=lambda text, voice_option: time.sleep(0.1),
+                             queue_size=1,
+                             stream_responses=True,
+                             max_utterances=1,
+                             stop_recording=None)
+
+    async def run_then_cancel():
+        task = asyncio.create_task(pipeline.run())
+        await asyncio.sleep(0.3)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    thread = _run_in_thread(run_then_cancel)
+    thread.join(timeout=5)
+
+    assert not thread.is_alive()
+
+
+def test_microphone_is_paused_while_a_reply_plays():
+    events = []
+    pipeline = AgentPipeline(None,
+                             record=_clip,
+                             transcribe=lambda clip: "hello",
+                             analyze=lambda text, on_sentence=None: "Hi there.",
+                             speak=lambda text, voice_option: events.append("speak"),
+                             stream_responses=False,
+                             max_utterances=2,
+                             stop_recording=None,
+                             pause_recording=lambda: events.append("pause"),
+                             resume_recording=lambda: events.append("resume"))
+
+    asyncio.run(pipeline.run())
+
+    assert events == ["pause", "speak", "resume"] * 2
+
+
+def test_microphone_is_paused_once_per_streamed_reply():
+    events = []
+
+    def analyze(text, on_sentence=None):
+        for sentence in ("One.", "Two.", "Three."):
+            time.sleep(0.02)  # The speak stage catches up between sentences.
+            on_sentence(sentence)
+        return "One. Two. Three."
+
+    pipeline = AgentPipeline(None,
+                             record=_clip,
+                             transcribe=lambda clip: "hello",
+                             analyze=analyze,
+                             speak=lambda text, voice_option: events.append(text),
+                             stream_responses=True,
+                             max_utterances=2,
+                             stop_recording=None,
+                             pause_recording=lambda: events.append("pause"),
+                             resume_recording=lambda: events.append("resume"))
+
+    asyncio.run(pipeline.run())
+
+    assert events == ["pause", "One.", "Two.", "Three.", "resume"] * 2
+
+
+def test_microphone_is_resumed_when_a_streamed_reply_fails():
+    events = []
+
+    def analyze(text, on_sentence=None):
+        on_sentence("Let me check.")
+        return "Error: the model stopped responding."
+
+    pipeline = AgentPipeline(None,
+                             record=_clip,
+                             transcribe=lambda clip: "hello",
+                             analyze=analyze,
+                             speak=lambda text, voice_option: events.append("speak"),
+                             stream_responses=True,
+                             max_utterances=1,
+                             stop_recording=None,
+                             pause_recording=lambda: events.append("pause"),
+                             resume_recording=lambda: events.append("resume"))
+
+    asyncio.run(pipeline.run())
+
+    assert events == ["pause", "speak", "resume"]
+
+
+def test_microphone_is_resumed_when_cancelled_mid_reply():
+    events = []
+    pipeline = AgentPipeline(None,
+                             record=_clip,
+                             transcribe=lambda clip: "hello",
+                             analyze=lambda text, on_sentence=None: "Hi there.",
+                             speak=lambda text, voice_option: time.sleep(0.5),
+                             stream_responses=False,
+                             max_utterances=1,
+                             stop_recording=None,
+                             pause_recording=lambda: events.append("pause"),
+                             resume_recording=lambda: events.append("resume"))
+
+    async def run_then_cancel():
+        task = asyncio.create_task(pipeline.run())
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+
+    thread = _run_in_thread(run_then_cancel)
+    thread.join(timeout=5)
+
+    assert events == ["pause", "resume"]
+
+
+def test_default_batch_size_is_reachable():
+    batches = []
+
+    def transcribe_batch(clips):
+        batches.append(len(clips))
+        time.sleep(0.1)  # Recordings pile up while a batch is being decoded.
+        return ["hello"] * len(clips)
+
+    pipeline = AgentPipeline(None,
+                             record=_clip,
+                             transcribe_batch=transcribe_batch,
+                             analyze=lambda text, on_sentence=None: "Hi there.",
+                             speak=lambda text, voice_option: None,
+                             stream_responses=False,
+                             max_utterances=10,
+                             stop_recording=None)
+
+    asyncio.run(pipeline.run())
+
+    assert max(batches) == STT_BATCH_SIZE
+    assert sum(batches) == 10
@@ -0,0 +1,80 @@
+import time
+import pytest
+import prompts.llm_analyzer as llm_analyzer
+from benchmarks.fixtures import make_synthetic_catalog
+from prompts.response_cache import SemanticResponseCache
+from search import catalog as catalog_module
+from src.config import RESPONSE_CACHE_SIMILARITY_THRESHOLD
+
+QUESTION = "Do you have any cheap Samsung phones under 20000?"
+ANSWER = "Yes, the Galaxy 12 costs 15000."
+
+
+def _cache(**options) -> SemanticResponseCache:
+    cache = SemanticResponseCache(lambda: 1, **options)
+    cache.store(QUESTION, ANSWER)
+    return cache
+
+
+def test_paraphrase_is_answered_from_the_cache():
+    cache = _cache(threshold=RESPONSE_CACHE_SIMILARITY_THRESHOLD)
+
+    assert cache.lookup("Looking for affordable Samsung mobiles under 20000 please") == ANSWER
+    assert cache.stats()["hits"] == 1
+
+
+@pytest.mark.parametrize("question", [
+    "Do you have any cheap Apple phones under 20000?",      # Different brand.
+    "Do you have any cheap Samsung phones under 10000?",    # Different number.
+    "Do you have any cheap Samsung phones under 20000 5G?",  # Extra number.
+    "Do you have any Samsung phones not under 20000?",      # Negation.
+    "What is the battery life of the Pixel?",               # Unrelated.
+])
+def test_changed_meaning_is_a_miss(question):
+    cache = _cache()
+
+    assert cache.lookup(question) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_entries_expire_after_the_ttl():
+    cache = _cache(ttl_seconds=0.05)
+    time.sleep(0.1)
+
+    assert cache.lookup(QUESTION) is None
+    assert cache.stats()["expirations"] == 1
+
+
+def test_least_recently_used_answer_is_evicted():
+    cache = _cache(max_entries=2)
+    cache.store("Which Pixel phones are in stock?", "The Pixel 8.")
+    cache.lookup(QUESTION)  # The Pixel answer is now the least recently used.
+    cache.store("What is the cheapest 5G phone?", "The Redmi 5G.")
+
+    assert cache.lookup(QUESTION) == ANSWER
+    assert cache.lookup("Which Pixel phones are in stock?") is None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_a_new_version_flushes_every_answer():
+    version = [1]
+    cache = SemanticResponseCache(lambda: version[0])
+    cache.store(QUESTION, ANSWER)
+
+    version[0] = 2
+
+    assert cache.lookup(QUESTION) is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_swapping_in_another_catalog_changes_the_version(tmp_path, monkeypatch):
+    first = make_synthetic_catalog(50, directory=str(tmp_path), seed=1)
+    second = make_synthetic_catalog(50, directory=str(tmp_path), seed=2)
+    monkeypatch.setattr(catalog_module, "_shared_catalog", first)
+    before = llm_analyzer._catalog_version()
+
+    monkeypatch.setattr(catalog_module, "_shared_catalog", second)
+    after = llm_analyzer._catalog_version()
+
+    assert first.version == second.version == 1
+    assert after != before
@@ -0,0 +1,250 @@
+import json
+import threading
+import time
+import http.client
+from http.server import ThreadingHTTPServer
+import pytest
+import src.server as server_module
+from src.server import AgentService, make_handler
+from src.tracing import Tracer
+
+
+@pytest.fixture
+def server():
+    """Runs the session API on a free local port around a stand-in analyzer."""
+    started = []
+
+    def start(analyze=lambda text, history=None: f"You said: {text}", **service_options):
+        service = AgentService(analyze=analyze, **service_options)
+        httpd = ThreadingHTTPServer(("127.0.0.1", 0), make_handler(service))
+        httpd.daemon_threads = True
+        threading.Thread(target=httpd.serve_forever, daemon=True).start()
+        started.append(httpd)
+        return service, httpd.server_address[1]
+
+    yield start
+    for httpd in started:
+        httpd.shutdown()
+        httpd.server_close()
+
+
+def request(port: int, method: str, path: str, body: bytes = None, content_type: str = "application/json"):
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.request(method, path, body=body, headers={"Content-Type": content_type})
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+def open_session(port: int) -> str:
+    status, payload = request(port, "POST", "/sessions")
+    assert status == 201
+    return payload["session_id"]
+
+
+def test_text_turn_is_answered(server):
+    _, port = server()
+    session_id = open_session(port)
+
+    status, payload = request(port, "POST", f"/sessions/{session_id}/messages", json.dumps({"text": "hello"}).encode())
+
+    assert status == 200
+    assert payload["reply"] == "You said: hello"
+    assert payload["ok"] is True
+
+
+@pytest.mark.parametrize("body", [b'"hi"', b"[1]", b"3", b"null", b'{"text": 5}', b"{not json", b'{"text": "  "}'])
+def test_malformed_text_turn_gets_400(server, body):
+    _, port = server()
+    session_id = open_session(port)
+
+    status, payload = request(port, "POST", f"/sessions/{session_id}/messages", body)
+
+    assert status == 400
+    assert "text" in payload["error"]
+
+
+def test_busy_session_does_not_take_slots_from_other_sessions(server):
+    release = threading.Event()
+
+    def analyze(text, history=None):
+        if text.startswith("slow"):
+            release.wait(timeout=10)
+        return f"You said: {text}"
+
+    _, port = server(analyze, max_concurrent=2, queue_timeout=5)
+    busy, other = open_session(port), open_session(port)
+    # Three turns to one session: one is analyzed, two wait for that session's lock.
+    turns = [threading.Thread(target=request, args=(port, "POST", f"/sessions/{busy}/messages",
+                                                     json.dumps({"text": f"slow {i}"}).encode()))
+             for i in range(3)]
+    for turn in turns:
+        turn.start()
+    time.sleep(0.2)  # Let the busy session's turns reach the service first.
+    try:
+        status, payload = request(port, "POST", f"/sessions/{other}/messages", json.dumps({"text": "hi"}).encode())
+    finally:
+        release.set()
+        for turn in turns:
+            turn.join()
+
+    assert status == 200
+    assert payload["reply"] == "You said: hi"
+
+
+def test_stats_summarize_latency_in_constant_memory(server):
+    service, port = server()
+    session_id = open_session(port)
+    for i in range(5):
+        request(port, "POST", f"/sessions/{session_id}/messages", json.dumps({"text": f"turn {i}"}).encode())
+
+    status, stats = request(port, "GET", "/stats")
+    _, session_stats = request(port, "GET", f"/sessions/{session_id}")
+
+    assert status == 200
+    assert stats["turns"] == 5
+    assert set(stats["latency_ms"]) == {"p50", "p95", "p99", "max"}
+    assert stats["latency_ms"]["p50"] <= stats["latency_ms"]["max"]
+    assert session_stats["turns"] == 5
+    assert session_stats["latency_ms"]["last"] is not None
+    assert len(service._latency.counts) == service._latency.BUCKETS
+
+
+def test_turn_span_includes_the_wait_for_a_slot(monkeypatch):
+    tracer = Tracer(enabled=True, export_path=None)
+    monkeypatch.setattr(server_module, "TRACER", tracer)
+    service = AgentService(analyze=lambda text, history=None: time.sleep(0.2) or "ok", max_concurrent=1)
+    sessions = [service.create_session() for _ in range(2)]
+
+    threads = [threading.Thread(target=service.reply, args=(session, "hi")) for session in sessions]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    summary = tracer.summary()
+    assert summary["turn"]["count"] == summary["turn.queue_wait"]["count"] == 2
+    assert summary["turn.queue_wait"]["max_ms"] >= 150
+    assert summary["turn"]["max_ms"] >= 350
+
+
+def test_capacity_timeout_releases_the_session():
+    service = AgentService(analyze=lambda text, history=None: time.sleep(0.5) or "ok", max_concurrent=1, queue_timeout=0.1)
+    busy, waiting = service.create_session(), service.create_session()
+    thread = threading.Thread(target=service.reply, args=(busy, "hi"))
+    thread.start()
+    time.sleep(0.05)
+
+    with pytest.raises(TimeoutError):
+        service.reply(waiting, "hi")
+    thread.join()
+
+    assert waiting.lock.acquire(blocking=False)
+
+
+def post_with_headers(port: int, path: str, headers: dict, body: bytes = b""):
+    """Sends a POST with exactly these headers (http.client would add its own Content-Length)."""
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=10)
+    try:
+        connection.putrequest("POST", path)
+        for name, value in headers.items():
+            connection.putheader(name, value)
+        connection.endheaders(body)
+        response = connection.getresponse()
+        return response.status, json.loads(response.read())
+    finally:
+        connection.close()
+
+
+@pytest.mark.parametrize("length", [None, "abc", "-1", "1e3", "²"])
+def test_missing_or_invalid_content_length_gets_400(server, length):
+    _, port = server()
+    session_id = open_session(port)
+    headers = {"Content-Type": "application/json"}
+    if length is not None:
+        headers["Content-Length"] = length
+
+    status, payload = post_with_headers(port, f"/sessions/{session_id}/messages", headers)
+
+    assert status == 400
+    assert "Content-Length" in payload["error"]
+
+
+def test_oversized_body_gets_413_without_being_read(server):
+    _, port = server(max_body_bytes=64)
+    session_id = open_session(port)
+    # The declared body is never sent: the server must answer from the header alone.
+    headers = {"Content-Type": "audio/wav", "Content-Length": str(10 ** 9)}
+
+    status, payload = post_with_headers(port, f"/sessions/{session_id}/messages", headers)
+
+    assert status == 413
+    body = json.dumps({"text": "x" * 40}).encode()
+    assert request(port, "POST", f"/sessions/{session_id}/messages", body)[0] == 200
+
+
+def test_session_can_be_opened_without_a_body(server):
+    _, port = server()
+    status, payload = post_with_headers(port, "/sessions", {})
+    assert status == 201 and payload["session_id"]
+
+
+def test_transcriptions_are_bounded():
+    release = threading.Event()
+    running, peak = [0], [0]
+    lock = threading.Lock()
+
+    def transcribe(audio_bytes):
+        with lock:
+            running[0] += 1
+            peak[0] = max(peak[0], running[0])
+        release.wait(timeout=10)
+        with lock:
+            running[0] -= 1
+        return "hello"
+
+    service = AgentService(transcribe=transcribe, max_transcriptions=2, queue_timeout=5)
+    threads = [threading.Thread(target=service.transcribe, args=(b"wav",)) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.2)
+    assert running[0] == 2
+    release.set()
+    for thread in threads:
+        thread.join()
+    assert peak[0] == 2
+
+
+def test_audio_turn_gets_503_when_transcription_is_saturated(server):
+    release = threading.Event()
+    service, port = server(transcribe=lambda audio: release.wait(timeout=10) and "hello",
+                           max_transcriptions=1, queue_timeout=0.2)
+    session_id = open_session(port)
+    busy = threading.Thread(target=service.transcribe, args=(b"wav",))
+    busy.start()
+    time.sleep(0.05)
+    try:
+        status, payload = request(port, "POST", f"/sessions/{session_id}/messages", b"RIFF", content_type="audio/wav")
+    finally:
+        release.set()
+        busy.join()
+
+    assert status == 503
+    status, payload = request(port, "POST", f"/sessions/{session_id}/messages", b"RIFF", content_type="audio/wav")
+    assert status == 200 and payload["reply"] == "You said: hello"
+
+
+def test_idle_sessions_expire_on_any_request(server):
+    service, port = server(idle_seconds=0.2)
+    idle, active = open_session(port), open_session(port)
+    time.sleep(0.15)
+    request(port, "POST", f"/sessions/{active}/messages", json.dumps({"text": "still here"}).encode())
+    time.sleep(0.1)
+
+    status, stats = request(port, "GET", "/stats")
+
+    assert stats["active_sessions"] == 1
+    assert request(port, "GET", f"/sessions/{idle}")[0] == 404
+    assert request(port, "GET", f"/sessions/{active}")[0] == 200
@@ -0,0 +1,37 @@
+import numpy as np
+import pytest
+from benchmarks.fixtures import synthetic_call
+from speech_to_text.stream_recorder import StreamingRecorder
+
+
+@pytest.mark.parametrize("drained_before_pause", [True, False])
+def test_pause_ignores_new_audio_but_keeps_the_utterance_in_progress(drained_before_pause):
+    clip = synthetic_call(np.random.default_rng(0), utterances=1)
+    half = len(clip.samples) // 2
+    recorder = StreamingRecorder(clip.sample_rate)
+
+    recorder.feed(clip.samples[:half])  # Customer starts talking...
+    if drained_before_pause:
+        recorder._drain()
+    recorder.pause()                     # ...then a reply starts playing.
+    recorder.feed(clip.samples[half:])
+    recorder._drain()
+    recorder.resume()
+
+    kept = list(recorder._ready)
+    assert len(kept) == 1
+    assert 0 < len(kept[0].samples) <= half
+    assert recorder.segmenter.flush() == []
+
+
+def test_recorder_listens_again_after_resume():
+    clip = synthetic_call(np.random.default_rng(0), utterances=1)
+    recorder = StreamingRecorder(clip.sample_rate)
+
+    recorder.pause()
+    recorder.feed(clip.samples)
+    recorder._drain()
+    assert not recorder._ready
+
+    recorder.resume()
+    assert len(recorder.process_clip(clip)) == 1
@@ -0,0 +1,74 @@
+import json
+import pytest
+import requests
+from prompts.fake_together_server import FakeTogetherServer
+from prompts.streaming import SentenceSplitter, StreamedMessage, iter_sse_events
+from prompts.together_client import TogetherClient
+
+
+class _Lines:
+    """Just enough of a requests.Response for iter_sse_events."""
+
+    def __init__(self, lines: list):
+        self.lines = lines
+        self.read = 0
+
+    def iter_lines(self, decode_unicode=False):
+        for line in self.lines:
+            self.read += 1
+            yield line
+
+
+def _event(content: str) -> str:
+    return "data: " + json.dumps({"choices": [{"delta": {"content": content}}]})
+
+
+def test_splitter_releases_whole_sentences_as_they_complete():
+    splitter = SentenceSplitter()
+    text = "The Galaxy costs $1.299 and is rated 4.5 stars. Want it? Great! I'll add"
+    sentences = []
+    for word in text.split(" "):
+        sentences += splitter.feed(word + " ")
+
+    assert sentences == ["The Galaxy costs $1.299 and is rated 4.5 stars.", "Want it?", "Great!"]
+    assert splitter.flush() == "I'll add"
+    assert splitter.flush() == ""
+
+
+def test_splitter_keeps_closing_quotes_with_their_sentence():
+    splitter = SentenceSplitter()
+
+    assert splitter.feed('She said "sold out." Then ') == ['She said "sold out."']
+    assert splitter.flush() == "Then"
+
+
+def test_sse_events_skip_comments_and_read_past_done():
+    response = _Lines([": keep-alive", "", _event("Hi"), "event: ping", _event(" there"), "data: [DONE]", "", "trailer"])
+
+    events = list(iter_sse_events(response))
+
+    assert [event["choices"][0]["delta"]["content"] for event in events] == ["Hi", " there"]
+    assert response.read == len(response.lines)
+
+
+def test_sse_error_event_raises():
+    response = _Lines([_event("Hi"), 'data: {"error": {"message": "overloaded"}}'])
+
+    with pytest.raises(requests.exceptions.RequestException):
+        list(iter_sse_events(response))
+
+
+def test_streamed_tool_call_is_reassembled_from_fake_api():
+    script = [{"tool_calls": [{"name": "search_mobiles", "arguments": {"brand": "Samsung", "max_price": 20000}}]}]
+    with FakeTogetherServer(script) as fake:
+        client = TogetherClient(api_url=fake.url, api_key="test")
+        message = StreamedMessage()
+        with client.post({"messages": [{"role": "user", "content": "Hi"}], "stream": True}, stream=True) as response:
+            for event in iter_sse_events(response):
+                message.add(event)
+        client.close()
+
+    call = message.message()["tool_calls"][0]
+    assert call["function"]["name"] == "search_mobiles"
+    assert json.loads(call["function"]["arguments"]) == {"brand": "Samsung", "max_price": 20000}
+    assert message.finish_reason == "tool_calls" and message.usage["total_tokens"] > 0
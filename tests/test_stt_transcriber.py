@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+from benchmarks.fixtures import FixtureTranscriber
+from speech_to_text import stt_transcriber
+from speech_to_text.audio_frames import AudioClip
+from speech_to_text.stt_transcriber import Transcriber, transcribe_audio_batch
+
+
+class _EchoTranscriber(Transcriber):
+    """Transcribes a clip as its length in samples; empty clips are unrecognized, `bad` ones raise."""
+
+    name = "echo"
+
+    def __init__(self, bad_length: int = None):
+        super().__init__()
+        self.bad_length = bad_length
+        self.batches = []
+
+    def _decode(self, clips: list) -> list:
+        self.batches.append(len(clips))
+        if any(len(clip.samples) == self.bad_length for clip in clips):
+            raise RuntimeError("corrupt clip")
+        return [str(len(clip.samples)) if len(clip.samples) else None for clip in clips]
+
+
+def _clip(samples: int) -> AudioClip:
+    return AudioClip(np.ones(samples, dtype=np.int16), 16000)
+
+
+@pytest.fixture
+def use_transcriber(monkeypatch):
+    return lambda transcriber: monkeypatch.setattr(stt_transcriber, "_transcriber", transcriber)
+
+
+def test_backends_must_implement_decode():
+    class Incomplete(Transcriber):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Transcriber()
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_batch_keeps_clip_order(use_transcriber):
+    transcriber = _EchoTranscriber()
+    use_transcriber(transcriber)
+
+    assert transcribe_audio_batch([_clip(3200), _clip(800), _clip(1600)]) == ["3200", "800", "1600"]
+    assert transcriber.batches == [3]
+
+
+def test_empty_clip_is_unrecognized_without_affecting_the_batch(use_transcriber):
+    use_transcriber(_EchoTranscriber())
+
+    assert transcribe_audio_batch([_clip(800), _clip(0), _clip(1600)]) == ["800", None, "1600"]
+
+
+def test_failed_clip_is_retried_alone(use_transcriber):
+    transcriber = _EchoTranscriber(bad_length=1234)
+    use_transcriber(transcriber)
+
+    assert transcribe_audio_batch([_clip(800), _clip(1234), _clip(1600)]) == ["800", None, "1600"]
+    assert transcriber.batches == [3, 1, 1, 1]
+
+
+def test_real_time_factor_is_reported(use_transcriber, capsys):
+    transcriber = FixtureTranscriber(transcripts=("hello",), real_time_factor=0.1)
+    use_transcriber(transcriber)
+
+    transcribe_audio_batch([_clip(16000), _clip(32000)])
+
+    stats = transcriber.stats()
+    assert (stats["backend"], stats["utterances"], stats["audio_seconds"]) == ("fixture", 2, 3.0)
+    assert stats["real_time_factor"] == pytest.approx(0.1, abs=0.05)
+    output = capsys.readouterr().out
+    assert output.count("batch of 2") == 2 and "real-time factor 0.1" in output
+
+
+def test_google_backend_gets_the_clip_buffer_without_a_copy(monkeypatch):
+    transcriber = stt_transcriber.GoogleTranscriber()
+    received = []
+    monkeypatch.setattr(transcriber.recognizer, "recognize_google", lambda audio: received.append(audio) or "hello")
+    clip = _clip(1600)
+
+    assert transcriber.transcribe(clip) == "hello"
+    assert np.shares_memory(np.frombuffer(received[0].frame_data, dtype=np.int16), clip.samples)
+    assert received[0].get_raw_data() == clip.samples.tobytes()
@@ -0,0 +1,99 @@
+import re
+import numpy as np
+import pytest
+from search.columnar import ColumnarTable, write_columnar
+from search.text_index import TextIndex, ngrams, normalize_text, tokenize
+
+TITLES = [
+    "SAMSUNG Galaxy S24 Ultra (Titanium Black, 256 GB)",
+    "APPLE iPhone 15 Pro Max (Blue, 512 GB)",
+    None,
+    "samsung galaxy a14 5G (Black, 64 GB)",
+    "SAMSUNG Galaxy S24 Ultra (Titanium Black, 256 GB)",
+    "Nokia 105 Single Sim",
+    "İPHONE 12 (Refurbished)",
+    "ΟΔΟΣ Phone",
+    "Redmi Note 13 Pro+ 5G",
+]
+
+
+@pytest.fixture
+def index(tmp_path):
+    path = str(tmp_path / "titles.bin")
+    write_columnar(path, {}, {"title": TITLES, "brand": [None] * len(TITLES)})
+    return TextIndex(ColumnarTable(path))
+
+
+def reference(pattern):
+    return [row for row, value in enumerate(TITLES) if value is not None and re.search(pattern, value, re.IGNORECASE)]
+
+
+def rows(array):
+    assert np.all(np.diff(array) > 0), "row ids must be sorted and unique"
+    return array.tolist()
+
+
+def test_normalization_helpers():
+    assert normalize_text("GaLaXy") == "galaxy"
+    assert tokenize("Galaxy S24-Ultra (5G)") == ["galaxy", "s24", "ultra", "5g"]
+    assert ngrams("Galaxy") == {"gal", "ala", "lax", "axy"}
+    assert ngrams("ab") == set()
+
+
+@pytest.mark.parametrize("pattern", ["galaxy", "GALAXY", "gAlAxY", "xy S2", "256 GB", "Titanium Black"])
+def test_literal_trigram_match_ignores_case(index, pattern):
+    assert rows(index.contains("title", pattern)) == reference(pattern)
+    assert rows(index.contains("title", pattern)) == rows(index.contains("title", pattern.swapcase()))
+
+
+def test_repeated_values_map_to_every_row(index):
+    assert rows(index.contains("title", "s24 ultra")) == [0, 4]
+
+
+@pytest.mark.parametrize("pattern", ["5g", "S2", "a", ""])
+def test_patterns_shorter_than_a_trigram(index, pattern):
+    assert rows(index.contains("title", pattern)) == reference(pattern)
+
+
+def test_literal_with_missing_trigram_matches_nothing(index):
+    assert len(index.contains("title", "pixel")) == 0
+    # Every trigram exists, but never together in one value.
+    assert len(index.contains("title", "galaxy 105")) == 0
+
+
+@pytest.mark.parametrize("pattern", [r"^apple", r"pro|max", r"s2\d", r"note \d+ pro\+", r"\(blue"])
+def test_regex_patterns(index, pattern):
+    assert rows(index.contains("title", pattern)) == reference(pattern)
+
+
+@pytest.mark.parametrize("pattern", ["iphone", "IPHONE 12", "οδοσ", "ΟΔΟΣ PHONE"])
+def test_case_folding_agrees_with_re(index, pattern):
+    # 'İ' and final sigma lower-case differently from what re.IGNORECASE matches.
+    expected = reference(pattern)
+    assert expected
+    assert rows(index.contains("title", pattern)) == expected
+
+
+def test_missing_values_never_match(index):
+    assert 2 not in rows(index.contains("title", ""))
+    assert len(index.contains("brand", "")) == 0
+
+
+@pytest.mark.parametrize("prefix, expected", [
+    ("galax", [0, 3, 4]),
+    ("GALAX", [0, 3, 4]),
+    ("s2", [0, 4]),
+    ("iph", [1, 6]),
+    ("galaxy", [0, 3, 4]),
+    ("laxy", []),
+    ("galaxys", []),
+])
+def test_prefix_matches_token_starts(index, prefix, expected):
+    assert index.prefix("title", prefix).tolist() == expected
+
+
+def test_unindexed_column_is_rejected(index):
+    with pytest.raises(KeyError):
+        index.contains("price", "x")
+    with pytest.raises(KeyError):
+        index.prefix("model_name", "x")
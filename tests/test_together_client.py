@@ -0,0 +1,55 @@
+import socket
+import pytest
+import requests
+from prompts.fake_together_server import FakeTogetherServer
+from prompts.together_client import TogetherClient
+
+PAYLOAD = {"model": "test", "messages": [{"role": "user", "content": "Hi"}]}
+
+
+def _client(url: str, **options) -> TogetherClient:
+    options.setdefault("backoff_seconds", 0)
+    return TogetherClient(api_url=url, api_key="test", **options)
+
+
+def test_rate_limits_and_server_errors_are_retried():
+    with FakeTogetherServer(error_statuses=[503, 429]) as fake:
+        response = _client(fake.url, max_retries=3).post(PAYLOAD)
+
+        assert response.json()["choices"][0]["message"]["content"]
+        assert fake.requests_served == 3
+
+
+def test_retries_are_bounded():
+    with FakeTogetherServer(error_statuses=[503] * 5) as fake:
+        with pytest.raises(requests.exceptions.HTTPError):
+            _client(fake.url, max_retries=2).post(PAYLOAD)
+
+        assert fake.requests_served == 3
+
+
+def test_client_errors_are_not_retried():
+    with FakeTogetherServer(error_statuses=[400]) as fake:
+        with pytest.raises(requests.exceptions.HTTPError):
+            _client(fake.url, max_retries=3).post(PAYLOAD)
+
+        assert fake.requests_served == 1
+
+
+def test_read_timeout_is_not_retried():
+    with FakeTogetherServer(latency_seconds=0.5) as fake:
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            _client(fake.url, read_timeout=0.1, max_retries=3).post(PAYLOAD)
+
+        assert fake.requests_served == 1
+
+
+def test_connection_failures_are_retried_then_raised(capsys):
+    with socket.socket() as unused:
+        unused.bind(("127.0.0.1", 0))
+        port = unused.getsockname()[1]
+
+    with pytest.raises(requests.exceptions.ConnectionError):
+        _client(f"http://127.0.0.1:{port}/v1/chat/completions", max_retries=2).post(PAYLOAD)
+
+    assert capsys.readouterr().out.count("retrying") == 2
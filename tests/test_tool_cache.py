@@ -0,0 +1,114 @@
+import time
+import pytest
+from prompts.tool_cache import ToolResultCache, canonicalize_tool_args
+
+PROPERTIES = {"min_price": {"type": "number"}, "min_storage_gb": {"type": "integer"}, "brand": {"type": "string"}}
+
+
+class _Recorder:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, **kwargs):
+        self.calls.append(kwargs)
+        return f"result {len(self.calls)}"
+
+
+def test_canonical_args_are_decoded_coerced_and_keep_their_case():
+    canonical = canonicalize_tool_args('{"brand": " Samsung ", "min_price": "800", "min_storage_gb": "128.0", '
+                                       '"title": "null", "max_price": ""}', PROPERTIES)
+
+    assert canonical == {"brand": "Samsung", "min_price": 800.0, "min_storage_gb": 128}
+    assert isinstance(canonical["min_storage_gb"], int)
+
+
+@pytest.mark.parametrize("arguments", ['[1, 2]', '"Samsung"', '{"min_price": "cheap"}'])
+def test_invalid_arguments_are_rejected(arguments):
+    with pytest.raises(ValueError):
+        canonicalize_tool_args(arguments, PROPERTIES)
+
+
+def test_key_ignores_case_but_not_regex_escapes():
+    assert ToolResultCache.make_key("t", {"brand": "Samsung"}) == ToolResultCache.make_key("t", {"brand": "SAMSUNG"})
+    assert ToolResultCache.make_key("t", {"title": r"\W"}) != ToolResultCache.make_key("t", {"title": r"\w"})
+    assert ToolResultCache.make_key("t", {"title": "Straße"}) != ToolResultCache.make_key("t", {"title": "strasse"})
+
+
+def test_tool_receives_the_arguments_as_sent():
+    tool = _Recorder()
+    cache = ToolResultCache(lambda: 1)
+
+    cache.call("search", tool, canonicalize_tool_args({"title": r"Galaxy\D"}))
+    result, hit = cache.call("search", tool, canonicalize_tool_args({"title": r"Galaxy\D"}))
+
+    assert tool.calls == [{"title": r"Galaxy\D"}]
+    assert (result, hit) == ("result 1", True)
+
+
+def test_case_variants_share_one_entry():
+    tool = _Recorder()
+    cache = ToolResultCache(lambda: 1)
+
+    cache.call("search", tool, {"brand": "Samsung"})
+    _, hit = cache.call("search", tool, {"brand": "samsung"})
+
+    assert hit and len(tool.calls) == 1
+
+
+def test_entries_expire_after_the_ttl():
+    tool = _Recorder()
+    cache = ToolResultCache(lambda: 1, ttl_seconds=0.05)
+
+    cache.call("search", tool, {"brand": "a"})
+    time.sleep(0.1)
+    _, hit = cache.call("search", tool, {"brand": "a"})
+
+    assert not hit and len(tool.calls) == 2
+
+
+def test_least_recently_used_entry_is_evicted():
+    tool = _Recorder()
+    cache = ToolResultCache(lambda: 1, max_entries=2)
+
+    cache.call("search", tool, {"brand": "a"})
+    cache.call("search", tool, {"brand": "b"})
+    cache.call("search", tool, {"brand": "a"})  # "b" is now the least recently used.
+    cache.call("search", tool, {"brand": "c"})
+
+    assert cache.call("search", tool, {"brand": "a"})[1]
+    assert not cache.call("search", tool, {"brand": "b"})[1]
+    assert cache.stats()["evictions"] == 2
+
+
+def test_a_new_data_version_flushes_the_cache():
+    version = [1]
+    tool = _Recorder()
+    cache = ToolResultCache(lambda: version[0])
+
+    cache.call("search", tool, {"brand": "a"})
+    version[0] = 2
+    result, hit = cache.call("search", tool, {"brand": "a"})
+
+    assert (result, hit) == ("result 2", False)
+
+
+def test_unavailable_data_and_errors_are_not_cached():
+    cache = ToolResultCache(lambda: None)
+    tool = _Recorder()
+    cache.call("search", tool, {"brand": "a"})
+    cache.call("search", tool, {"brand": "a"})
+    assert len(tool.calls) == 2
+
+    cache = ToolResultCache(lambda: 1)
+    failing = lambda **kwargs: "Error reading mobiles dataset: boom"
+    cache.call("search", failing, {})
+    assert cache.stats()["entries"] == 0
+
+
+def test_stats_count_hits_and_misses():
+    cache = ToolResultCache(lambda: 1)
+    tool = _Recorder()
+    for brand in ("a", "a", "b", "a"):
+        cache.call("search", tool, {"brand": brand})
+
+    assert cache.stats() == {"entries": 2, "hits": 2, "misses": 2, "evictions": 0, "hit_rate": 0.5}
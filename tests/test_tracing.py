@@ -0,0 +1,35 @@
+import numpy as np
+import pytest
+from src.tracing import LatencyHistogram
+
+
+@pytest.mark.parametrize("p", [50, 90, 95, 99])
+def test_percentiles_are_within_one_bucket_of_exact(p):
+    durations = np.random.default_rng(0).lognormal(np.log(120), 1.0, size=5000)
+    histogram = LatencyHistogram()
+    for duration in durations:
+        histogram.add(duration)
+
+    exact = np.percentile(durations, p, method="inverted_cdf")
+
+    assert exact <= histogram.percentile(p) <= exact * LatencyHistogram.GROWTH
+
+
+def test_single_value_and_max_are_exact():
+    histogram = LatencyHistogram()
+    histogram.add(42.0)
+
+    assert histogram.percentile(50) == histogram.percentile(99) == 42.0
+    assert histogram.summary()["max_ms"] == 42.0
+
+
+def test_tiny_and_huge_durations_stay_in_range():
+    histogram = LatencyHistogram()
+    histogram.add(0.0)
+    histogram.add(5 * 3600 * 1000.0)   # Five hours still has its own bucket.
+    histogram.add(48 * 3600 * 1000.0)  # Beyond the last bucket; reported through max_ms.
+
+    assert histogram.percentile(1) <= LatencyHistogram.MIN_MS
+    assert 5 * 3600 * 1000.0 <= histogram.percentile(66) <= 5 * 3600 * 1000.0 * LatencyHistogram.GROWTH
+    assert histogram.percentile(100) == 48 * 3600 * 1000.0
+    assert histogram.count == 3 and len(histogram.counts) == LatencyHistogram.BUCKETS
@@ -0,0 +1,98 @@
+import os
+import sys
+import threading
+import types
+import pytest
+
+pytest.importorskip("pyttsx3")
+
+from text_to_speech import tts_speaker
+from text_to_speech.tts_speaker import Speaker, NullSink, FileSink, resolve_voice_id, text_to_speech_and_play
+from benchmarks.fixtures import SilentEngine
+from speech_to_text.audio_frames import AudioClip
+
+VOICES = [types.SimpleNamespace(id="zira", name="Microsoft Zira Desktop - English (United States)"),
+          types.SimpleNamespace(id="david", name="Microsoft David Desktop - English (United States)"),
+          types.SimpleNamespace(id="eva", name="Eva (female)")]
+
+
+def test_failed_engine_init_is_not_retried(monkeypatch):
+    attempts = []
+
+    def broken_speaker(*args, **kwargs):
+        attempts.append(args)
+        raise OSError("No TTS driver")
+
+    monkeypatch.setattr(tts_speaker, "Speaker", broken_speaker)
+    monkeypatch.setattr(tts_speaker, "_speakers", {})
+    monkeypatch.setattr(tts_speaker, "_speaker_errors", {})
+
+    text_to_speech_and_play("Hello.")
+    text_to_speech_and_play("Hello again.")
+
+    assert len(attempts) == 1
+
+
+def test_engine_thread_initializes_com_on_windows(monkeypatch):
+    initialized = []
+    pythoncom = types.SimpleNamespace(CoInitialize=lambda: initialized.append(threading.current_thread().name))
+    monkeypatch.setattr(sys, "platform", "win32")
+    monkeypatch.setitem(sys.modules, "pythoncom", pythoncom)
+
+    speaker = Speaker(sink=NullSink(), engine_factory=SilentEngine)
+    speaker.synthesize("Hello.")
+    speaker.close()
+
+    assert len(initialized) == 1 and initialized[0].startswith("tts-engine")
+
+
+@pytest.mark.parametrize("option, expected", [
+    ("male", "david"), ("MALE", "david"), ("female", "zira"), (None, None), ("robot", None),
+])
+def test_voice_is_resolved_by_name(option, expected):
+    assert resolve_voice_id(VOICES, option) == expected
+
+
+def test_female_voice_is_never_picked_for_male():
+    assert resolve_voice_id([VOICES[2]], "male") is None
+
+
+def test_synthesized_phrases_are_cached_per_text_and_voice():
+    speaker = Speaker(sink=NullSink(), cache_size=2, engine_factory=SilentEngine)
+    for text in ("One.", "Two.", "One.", "Three."):  # "Two." is evicted by "Three.".
+        speaker.synthesize(text)
+    speaker.synthesize("One.")
+    speaker.synthesize("Two.")
+    speaker.voice_id = "other"
+    speaker.synthesize("Two.")
+    speaker.close()
+
+    assert (speaker.cache_hits, speaker.cache_misses) == (2, 5)
+    assert speaker.stats()["cached_phrases"] == 2
+
+
+def test_null_sink_receives_the_synthesized_audio():
+    sink = NullSink()
+    speaker = Speaker(sink=sink, engine_factory=SilentEngine)
+
+    speaker.speak("Five words are spoken here.")
+    speaker.close()
+
+    assert sink.clips_played == 1
+    assert sink.seconds_played == pytest.approx(2.0, abs=0.01)  # SilentEngine says 2.5 words per second.
+
+
+def test_file_sink_keeps_replies_from_earlier_runs(tmp_path):
+    first = Speaker(sink=FileSink(str(tmp_path)), engine_factory=SilentEngine)
+    first.speak("Hello there.")
+    first.close()
+    earlier = (tmp_path / "reply_00000.wav").read_bytes()
+
+    second_sink = FileSink(str(tmp_path))
+    second = Speaker(sink=second_sink, engine_factory=SilentEngine)
+    second.speak("A longer reply than before.")
+    second.close()
+
+    assert (tmp_path / "reply_00000.wav").read_bytes() == earlier
+    assert [os.path.basename(p) for p in second_sink.paths] == ["reply_00001.wav"]
+    assert AudioClip.from_wav_file(second_sink.paths[0]).duration_seconds == pytest.approx(2.0, abs=0.01)
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from benchmarks.fixtures import synthetic_call
+from speech_to_text.audio_frames import AudioClip
+from speech_to_text.stream_recorder import StreamingRecorder
+from speech_to_text.vad import RingBuffer, UtteranceSegmenter
+from src.config import SAMPLE_RATE, VAD_END_SILENCE_MS, VAD_PRE_ROLL_MS
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_each_utterance_of_a_synthetic_call_is_found(seed):
+    clip = synthetic_call(np.random.default_rng(seed), utterances=3)
+
+    utterances = StreamingRecorder(clip.sample_rate).process_clip(clip)
+
+    assert len(utterances) == 3
+    longest = 3.5 + (VAD_END_SILENCE_MS + VAD_PRE_ROLL_MS) / 1000
+    assert all(1.5 <= u.duration_seconds <= longest for u in utterances)
+
+
+def test_background_noise_alone_is_not_an_utterance():
+    noise = np.random.default_rng(0).normal(0, 60, 5 * SAMPLE_RATE).astype(np.int16)
+    clip = AudioClip(noise, SAMPLE_RATE)
+
+    assert StreamingRecorder(SAMPLE_RATE).process_clip(clip) == []
+
+
+def test_long_speech_is_cut_at_the_maximum_length():
+    clip = synthetic_call(np.random.default_rng(1), utterances=3)
+    segmenter = UtteranceSegmenter(clip.sample_rate, max_utterance_seconds=1)
+
+    utterances = segmenter.process(clip.samples) + segmenter.flush()
+
+    assert len(utterances) > 3
+    assert all(u.duration_seconds <= 1.0 for u in utterances)
+
+
+def test_block_size_does_not_change_the_segmentation():
+    clip = synthetic_call(np.random.default_rng(2), utterances=2)
+    whole = UtteranceSegmenter(clip.sample_rate)
+    expected = whole.process(clip.samples) + whole.flush()
+
+    blocks = UtteranceSegmenter(clip.sample_rate)
+    actual = []
+    for start in range(0, len(clip.samples), 777):
+        actual += blocks.process(clip.samples[start:start + 777])
+    actual += blocks.flush()
+
+    assert [len(u.samples) for u in actual] == [len(u.samples) for u in expected]
+
+
+def test_ring_buffer_wraps_and_drops_the_oldest_samples():
+    ring = RingBuffer(8)
+    ring.write(np.arange(5, dtype=np.int16))
+    assert ring.read().tolist() == [0, 1, 2, 3, 4]
+
+    ring.write(np.arange(10, 20, dtype=np.int16))
+
+    assert ring.read().tolist() == list(range(12, 20))
+    assert ring.overruns == 2
+    assert len(ring) == 0
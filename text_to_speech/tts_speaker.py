@@ -1,4 +1,242 @@
+import os
+import queue
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 import pyttsx3
+from src.config import TTS_SYNTHESIZE_TO_BUFFER, TTS_CACHE_MAX_ENTRIES, TTS_AUDIO_SINK, TTS_OUTPUT_DIR
+from speech_to_text.audio_frames import AudioClip
+from src.tracing import TRACER, run_in_context
+
+MALE_VOICE_HINTS = ('male', 'david', 'alex')
+FEMALE_VOICE_HINTS = ('female', 'zira', 'helen', 'eva')
+
+
+def resolve_voice_id(voices: list, voice_option: str = None) -> str | None:
+    """
+    Picks the installed voice matching 'male' or 'female' by name.
+    Returns:
+        str | None: The voice id, or None to keep the system default.
+    """
+    if not voice_option or voice_option.lower() not in ['male', 'female']:
+        return None
+    target_gender = voice_option.lower()
+    print(f"Attempting to find a {target_gender} voice...")
+    for voice in voices:
+        voice_name_lower = voice.name.lower()
+        # 'female' contains 'male', so it must rule out the male match first.
+        if target_gender == 'male' and 'female' not in voice_name_lower and any(h in voice_name_lower for h in MALE_VOICE_HINTS):
+            return voice.id
+        if target_gender == 'female' and any(h in voice_name_lower for h in FEMALE_VOICE_HINTS):
+            return voice.id
+    return None
+
+
+def init_com_thread():
+    """
+    Initializes COM on the calling thread on Windows, where pyttsx3's SAPI5 driver needs it on
+    every thread that creates or drives an engine (only the main thread gets it automatically).
+    """
+    if sys.platform == "win32":
+        import pythoncom  # Installed with pyttsx3 on Windows (pywin32).
+
+        pythoncom.CoInitialize()
+
+
+class DeviceSink:
+    """Plays synthesized audio on the default output device."""
+
+    def play(self, clip: AudioClip):
+        import sounddevice as sd
+
+        sd.play(clip.samples, clip.sample_rate)
+        sd.wait()
+
+
+class NullSink:
+    """Discards audio, counting what would have been played (headless runs and benchmarks)."""
+
+    def __init__(self):
+        self.clips_played = 0
+        self.seconds_played = 0.0
+
+    def play(self, clip: AudioClip):
+        self.clips_played += 1
+        self.seconds_played += clip.duration_seconds
+
+
+class FileSink:
+    """
+    Writes every reply to a numbered WAV file instead of playing it. Numbers already used in the
+    directory (by an earlier run) are skipped, so earlier replies are never overwritten.
+    """
+
+    def __init__(self, directory: str = TTS_OUTPUT_DIR):
+        self.directory = directory
+        self.paths = []
+        self._next_number = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+    def play(self, clip: AudioClip):
+        with self._lock:
+            while True:
+                path = os.path.join(self.directory, f"reply_{self._next_number:05d}.wav")
+                self._next_number += 1
+                if not os.path.exists(path):
+                    break
+            self.paths.append(path)
+        clip.write_wav(path)
+
+
+AUDIO_SINKS = {"device": DeviceSink, "null": NullSink, "file": FileSink}
+
+
+class Speaker:
+    """
+    A TTS engine that is initialized, and has its voice resolved, once and is then reused.
+
+    pyttsx3 engines must not be driven from several threads, so every engine call runs on the
+    speaker's own engine thread regardless of which thread asks for speech. With a sink, replies
+    are rendered to audio buffers that are kept in an LRU cache keyed on (text, voice), so
+    repeated phrases are replayed without synthesizing them again. Without a sink the engine
+    speaks directly.
+    """
+
+    def __init__(self, voice_option: str = None, sink=None, cache_size: int = TTS_CACHE_MAX_ENTRIES, engine_factory=pyttsx3.init):
+        self.sink = sink
+        self.cache_size = cache_size
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._cache = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._engine_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix="tts-engine",
+                                                 initializer=init_com_thread)
+        try:
+            self.voice_id = self._on_engine_thread(self._init_engine, engine_factory, voice_option)
+        except Exception:
+            self.close()
+            raise
+
+    def speak(self, text: str):
+        """Speaks text, blocking until playback has finished."""
+        print("Converting analysis to speech and playing back...")
+        if self.sink is not None:
+            try:
+                clip = self.synthesize(text)
+            except Exception as e:
+                if not isinstance(self.sink, DeviceSink):
+                    raise
+                # Some engines (e.g. NSSpeechSynthesizer) don't render WAV; keep talking directly.
+                print(f"Could not synthesize speech to a buffer ({e}); speaking directly from now on.")
+                self.sink = None
+            else:
+                with TRACER.span("tts.playback", seconds=round(clip.duration_seconds, 2)):
+                    self.sink.play(clip)
+                print("Playback finished.")
+                return
+        with TRACER.span("tts.speak", characters=len(text)):
+            self._on_engine_thread(self._say, text)
+        print("Playback finished.")
+
+    def synthesize(self, text: str) -> AudioClip:
+        """Renders text to an in-memory clip, serving repeated phrases from the cache."""
+        key = (text, self.voice_id)
+        with self._cache_lock:
+            clip = self._cache.get(key)
+            if clip is not None:
+                self._cache.move_to_end(key)
+                self.cache_hits += 1
+                return clip
+            self.cache_misses += 1
+        with TRACER.span("tts.synthesize", characters=len(text)):
+            clip = self._on_engine_thread(self._render, text)
+        with self._cache_lock:
+            self._cache[key] = clip
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return clip
+
+    def stats(self) -> dict:
+        lookups = self.cache_hits + self.cache_misses
+        return {
+            "cached_phrases": len(self._cache),
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "cache_hit_rate": round(self.cache_hits / lookups, 3) if lookups else None,
+        }
+
+    def close(self):
+        self._engine_thread.shutdown(wait=False)
+
+    def _on_engine_thread(self, func, *args):
+        return self._engine_thread.submit(func, *args).result()
+
+    def _init_engine(self, engine_factory, voice_option: str):
+        self._engine = engine_factory()
+        voices = self._engine.getProperty('voices')
+        selected_voice_id = resolve_voice_id(voices, voice_option)
+        if selected_voice_id:
+            self._engine.setProperty('voice', selected_voice_id)
+            voice_name = next((v.name for v in voices if v.id == selected_voice_id), "Unknown Voice")
+            print(f"Set voice to: '{voice_name}' (ID: {selected_voice_id})")
+        elif voice_option and voice_option.lower() in ['male', 'female']:
+            print(f"Could not find a suitable '{voice_option}' voice. Using default system voice.")
+        else:
+            print("Using default system voice.")
+        return selected_voice_id
+
+    def _say(self, text: str):
+        self._engine.say(text)
+        self._engine.runAndWait()
+
+    def _render(self, text: str) -> AudioClip:
+        fd, path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
+        try:
+            self._engine.save_to_file(text, path)
+            self._engine.runAndWait()
+            return AudioClip.from_wav_file(path)
+        finally:
+            os.remove(path)
+
+
+_speakers = {}
+_speaker_errors = {}
+_speakers_lock = threading.Lock()
+
+def get_speaker(voice_option: str = None) -> Speaker:
+    """
+    Returns the process-wide Speaker for a voice option, creating it on first use.
+    A failed engine initialization is remembered, so later replies fail fast instead of
+    trying to load the TTS driver again for every sentence.
+    Raises:
+        RuntimeError: If the TTS engine could not be initialized.
+    """
+    key = voice_option.lower() if voice_option and voice_option.lower() in ['male', 'female'] else None
+    with _speakers_lock:
+        if key in _speaker_errors:
+            raise RuntimeError(f"TTS engine is unavailable ({_speaker_errors[key]}).")
+        if key not in _speakers:
+            sink = AUDIO_SINKS[TTS_AUDIO_SINK]() if TTS_SYNTHESIZE_TO_BUFFER or TTS_AUDIO_SINK != "device" else None
+            try:
+                _speakers[key] = Speaker(key, sink=sink)
+            except Exception as e:
+                _speaker_errors[key] = e
+                raise
+        return _speakers[key]
+
+def list_voices():
+    """Prints the TTS voices installed on this system."""
+    init_com_thread()
+    engine = pyttsx3.init()
+    voices = engine.getProperty('voices')
+    print("\nAvailable TTS Voices")
+    for i, voice in enumerate(voices):
+        print(f"  {i}: ID='{voice.id}', Name='{voice.name}', Lang='{voice.languages[0] if voice.languages else 'N/A'}'")
+    print("----------------------------\n")
 
 def text_to_speech_and_play(text: str, voice_option: str = None):
     """
@@ -10,46 +248,45 @@ def text_to_speech_and_play(text: str, voice_option: str = None):
                                       'list' to list available voices (no speech playback).
                                       Defaults to system default if None or not found.
     """
-    print("Converting analysis to speech and playing back...")
     try:
-        engine = pyttsx3.init()
-        voices = engine.getProperty('voices')
-
         if voice_option and voice_option.lower() == 'list':
-            print("\nAvailable TTS Voices")
-            for i, voice in enumerate(voices):
-                print(f"  {i}: ID='{voice.id}', Name='{voice.name}', Lang='{voice.languages[0] if voice.languages else 'N/A'}'")
-            print("----------------------------\n")
+            list_voices()
             return
-
-        selected_voice_id = None
-        if voice_option and voice_option.lower() in ['male', 'female']:
-            target_gender = voice_option.lower()
-            print(f"Attempting to find a {target_gender} voice...")
-            for voice in voices:
-                voice_name_lower = voice.name.lower()
-                if (target_gender == 'male' and ('male' in voice_name_lower or 'david' in voice_name_lower or 'alex' in voice_name_lower)) or \
-                   (target_gender == 'female' and ('female' in voice_name_lower or 'zira' in voice_name_lower or 'helen' in voice_name_lower or 'eva' in voice_name_lower)):
-                    selected_voice_id = voice.id
-                    break
-        
-        if selected_voice_id:
-            engine.setProperty('voice', selected_voice_id)
-            try:
-                current_voice_id = engine.getProperty('voice')
-                voice_name = next((v.name for v in voices if v.id == current_voice_id), "Unknown Voice")
-                print(f"Set voice to: '{voice_name}' (ID: {current_voice_id})")
-            except Exception:
-                print(f"Set voice to ID: {selected_voice_id}")
-        else:
-            if voice_option and voice_option.lower() in ['male', 'female']:
-                print(f"Could not find a suitable '{voice_option}' voice. Using default system voice.")
-            else:
-                print("Using default system voice.")
-
-        engine.say(text)
-        engine.runAndWait()
-        print("Playback finished.")
+        get_speaker(voice_option).speak(text)
     except Exception as e:
         print(f"Error during text-to-speech: {e}")
         print("Please ensure your system has a TTS engine installed (e.g., SAPI on Windows).")
+
+
+class SpeechQueue:
+    """
+    Speaks queued sentences in order on a background thread.
+
+    Used with streamed LLM responses: each sentence is queued as soon as it is generated and
+    playback starts while the rest of the response is still being produced.
+    """
+
+    def __init__(self, voice_option: str = None, speak=text_to_speech_and_play):
+        self.voice_option = voice_option
+        self._speak = speak
+        self._queue = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="speech-queue", daemon=True)
+        self._worker.start()
+
+    def put(self, text: str):
+        """Queues text for playback after everything queued before it."""
+        if text:
+            # Playback happens on the queue's thread but stays attached to the caller's session.
+            self._queue.put((text, run_in_context(self._speak)))
+
+    def wait(self):
+        """Blocks until every queued sentence has been spoken."""
+        self._queue.join()
+
+    def _run(self):
+        while True:
+            text, speak = self._queue.get()
+            try:
+                speak(text, self.voice_option)
+            finally:
+                self._queue.task_done()